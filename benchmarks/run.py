@@ -0,0 +1,258 @@
+"""
+벤치마크 스위트
+
+mining.synthetic.generate_pitches로 만든 합성 데이터(10k / 1M / 10M 투구)에 대해
+전처리 / 확률 계산 / 군집화 / metrics 단계와 end-to-end 파이프라인의 시간과 메모리를 측정하고,
+저장된 baseline과 비교합니다.
+
+사용 예:
+    python -m benchmarks.run --sizes 10k 1m
+    python -m benchmarks.run --sizes 10k --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --sizes 10k --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from mining import profiling
+
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+# import 시점에 로드되면 안 되는 무거운 의존성
+HEAVY_MODULES = ('pm4py', 'plotly', 'networkx', 'pyvis', 'google.cloud.bigquery', 'sklearn', 'matplotlib')
+
+DEFAULT_BASELINE = Path(__file__).with_name('baseline.json')
+
+
+def _run_once(func, trace_memory):
+    """func()를 한 번 실행하여 (결과, 측정값, 하위 계측 단계 기록) 반환"""
+    if trace_memory:
+        tracemalloc.start()
+
+    with profiling.profile(trace_memory=False) as report:
+        rss_before = profiling._peak_rss_mb()
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        result = func()
+        wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+        rss_after = profiling._peak_rss_mb()
+
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+
+    measured = {
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'tracemalloc_peak_mb': peak,
+        'rss_peak_delta_mb': None if rss_before is None else rss_after - rss_before,
+    }
+    return result, measured, report.records
+
+
+def measure(case, size, func, records, trace_memory=False, repeat=1):
+    """
+    func()를 repeat번 실행하여 가장 빠른 실행의 wall / CPU time, 메모리, 하위 계측 단계 기록을 records에 추가
+
+    Returns:
+        func의 결과 (마지막 실행)
+    """
+    best = None
+    for _ in range(repeat):
+        result, measured, stage_records = _run_once(func, trace_memory)
+        if best is None or measured['wall_s'] < best[0]['wall_s']:
+            best = (measured, stage_records)
+    measured, stage_records = best
+
+    records.append({'size': size, 'case': case, 'calls': 1, **measured})
+
+    # 같은 하위 단계가 여러 번 호출되면 (예: 그룹별 create_eventlog_from_dataFrame) 합산
+    stages = {}
+    for stage in stage_records:
+        total = stages.setdefault(stage['stage'], {'wall_s': 0.0, 'cpu_s': 0.0, 'calls': 0})
+        total['wall_s'] += stage['wall_s']
+        total['cpu_s'] += stage['cpu_s']
+        total['calls'] += 1
+    for stage, total in stages.items():
+        records.append({
+            'size': size,
+            'case': f"{case}/{stage}",
+            'tracemalloc_peak_mb': None,
+            'rss_peak_delta_mb': None,
+            **total,
+        })
+    return result
+
+
+def bench_import(records, repeat=1):
+    """import mining / clustering 시간과 무거운 의존성 로드 여부 (별도 프로세스에서 측정)"""
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        "import mining, clustering, metrics\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    root = Path(__file__).resolve().parent.parent
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root)
+        runs.append(json.loads(output.stdout))
+    result = min(runs, key=lambda run: run['seconds'])
+
+    records.append({
+        'size': '-',
+        'case': 'import',
+        'wall_s': result['seconds'],
+        'cpu_s': None,
+        'tracemalloc_peak_mb': None,
+        'rss_peak_delta_mb': None,
+        'calls': 1,
+        'traced': False,
+        'error': f"heavy modules loaded at import: {result['heavy']}" if result['heavy'] else None,
+    })
+
+
+def bench_size(label, n_pitches, records, trace_memory=False, cluster_cases=300, seed=0, repeat=1):
+    """하나의 데이터 크기에 대해 단계별 / end-to-end 벤치마크"""
+    from mining.synthetic import generate_pitches
+    from mining.preprocessing import define_at_bat_cases, add_node_and_preprocess, one_way_filter
+    from mining.pipeline import preprocessing_df
+    from mining.probability import BasedTraces
+    from clustering.distance import ClusteredTraces
+    from clustering.utils import clustered_dataframe
+    from metrics import p_per_pa, k_per_pa, fip
+
+    n_pitchers = max(1, n_pitches // 20_000)
+    df = measure('generate', label, lambda: generate_pitches(n_pitches, n_pitchers=n_pitchers, seed=seed),
+                 records, trace_memory, repeat)
+
+    # [1] 단계별
+    df_grouped = measure('define_at_bat_cases', label, lambda: define_at_bat_cases(df),
+                         records, trace_memory, repeat)
+    df_added = measure('add_node_and_preprocess', label,
+                       lambda: add_node_and_preprocess(df_grouped, 'start', 'end'), records, trace_memory, repeat)
+    measure('add_node_and_preprocess[out]', label,
+            lambda: add_node_and_preprocess(df_grouped, 'start', 'end', case_type='out'),
+            records, trace_memory, repeat)
+    df_filtered = measure('one_way_filter', label, lambda: one_way_filter(df_added),
+                          records, trace_memory, repeat)
+    measure('BasedTraces', label, lambda: BasedTraces(df_added)(), records, trace_memory, repeat)
+
+    # 군집화는 variant 수의 제곱에 비례하므로 앞쪽 cluster_cases개 타석만 사용
+    cases = df_filtered['processID'].drop_duplicates().iloc[:cluster_cases]
+    df_cluster = df_filtered[df_filtered['processID'].isin(cases)]
+    clustered = measure('ClusteredTraces', label, lambda: ClusteredTraces(df_cluster)(n_clusters=3),
+                        records, trace_memory, repeat)
+    measure('metrics', label,
+            lambda: [f(clustered_dataframe(clustered, df_cluster)) for f in (p_per_pa, k_per_pa, fip)],
+            records, trace_memory, repeat)
+    del df_grouped, df_added, df_filtered
+
+    # [2] end-to-end
+    for lean in (False, True):
+        name = 'pipeline[lean]' if lean else 'pipeline'
+
+        def run_pipeline():
+            df_preprocess = preprocessing_df(df, lean=lean)
+            result = BasedTraces(one_way_filter(df_preprocess))()
+            return result
+
+        measure(name, label, run_pipeline, records, trace_memory, repeat)
+
+
+def baseline_key(record):
+    """baseline JSON의 key (tracemalloc 측정은 느려지므로 별도 key로 비교)"""
+    suffix = '@traced' if record.get('traced') else ''
+    return f"{record['size']}:{record['case']}{suffix}"
+
+
+def compare(records, baseline, tolerance, min_seconds=0.1):
+    """
+    baseline 대비 wall time 비율과 상태(ok / regression / improved / new / error) 계산
+
+    - baseline과 이번 측정이 모두 min_seconds보다 짧은 단계는 측정 잡음이 크므로 ok로 처리
+    """
+    rows = []
+    for record in records:
+        reference = baseline.get(baseline_key(record))
+        ratio = None
+        status = 'new'
+        if record.get('error'):
+            status = 'error'
+        elif reference and reference.get('wall_s'):
+            ratio = record['wall_s'] / reference['wall_s']
+            if max(record['wall_s'], reference['wall_s']) < min_seconds:
+                status = 'ok'
+            else:
+                status = 'regression' if ratio > 1 + tolerance else 'improved' if ratio < 1 - tolerance else 'ok'
+        rows.append({**record, 'baseline_wall_s': reference.get('wall_s') if reference else None,
+                     'ratio': ratio, 'status': status})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Process mining benchmark suite')
+    parser.add_argument('--sizes', nargs='+', default=['10k'], choices=list(SIZES))
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='비교할 baseline JSON')
+    parser.add_argument('--save-baseline', default=None, help='이번 결과를 baseline JSON으로 저장')
+    parser.add_argument('--output', default=None, help='결과 JSON 저장 경로')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='허용 오차 비율 (0.5 = 50%% 느려지면 regression)')
+    parser.add_argument('--min-seconds', type=float, default=0.1, help='이보다 짧은 단계는 regression 판정 제외')
+    parser.add_argument('--trace-memory', action='store_true', help='tracemalloc peak 측정 (느려짐)')
+    parser.add_argument('--repeat', type=int, default=3, help='단계별 반복 횟수 (가장 빠른 실행을 기록)')
+    parser.add_argument('--cluster-cases', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings('ignore')
+    records = []
+    bench_import(records, args.repeat)
+    for label in args.sizes:
+        print(f"[benchmark] size={label}", flush=True)
+        bench_size(label, SIZES[label], records, trace_memory=args.trace_memory,
+                   cluster_cases=args.cluster_cases, seed=args.seed, repeat=args.repeat)
+    for record in records:
+        record.setdefault('traced', args.trace_memory)
+
+    baseline = {}
+    if args.baseline and Path(args.baseline).exists():
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+
+    table = compare(records, baseline, args.tolerance, args.min_seconds)
+    columns = ['size', 'case', 'wall_s', 'baseline_wall_s', 'ratio', 'status', 'cpu_s', 'calls',
+               'tracemalloc_peak_mb', 'rss_peak_delta_mb']
+    print(table[columns].dropna(axis=1, how='all').to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+    if args.output:
+        table.to_json(args.output, orient='records', indent=2)
+
+    if args.save_baseline:
+        merged = dict(baseline)
+        merged.update({baseline_key(r): {'wall_s': r['wall_s'],
+                                                    'tracemalloc_peak_mb': r['tracemalloc_peak_mb']}
+                       for r in records if not r.get('error')})
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                       'results': merged}, f, indent=2, sort_keys=True)
+
+    failed = table['status'].eq('error').any() or (
+        args.fail_on_regression and table['status'].eq('regression').any()
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
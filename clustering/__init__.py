@@ -1,11 +1,29 @@
-from .distance import ClusteredTraces
-from .visualizer import MDS
-from .visualizer import Dendrogram
-from .utils import clustered_dataframe
-
-__all__ = [
-    'ClusteredTraces',
-    'MDS',
-    'Dendrogram',
-    'clustered_dataframe'
-]
\ No newline at end of file
+# 공개 API는 처음 접근할 때 해당 모듈을 import (module-level __getattr__)
+# - sklearn, matplotlib, pm4py 등 무거운 의존성은 그 기능을 실제로 사용할 때만 로드됩니다.
+import importlib
+
+
+_LAZY_ATTRIBUTES = {
+    'ClusteredTraces': '.distance',
+    'MDS': '.visualizer',
+    'Dendrogram': '.visualizer',
+    'clustered_dataframe': '.utils',
+    'PitcherSimilarity': '.pitchers',
+    'conditional_divergence': '.pitchers',
+}
+
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
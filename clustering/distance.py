@@ -1,18 +1,115 @@
+import os
+
 import numpy as np
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 from mining.probability import prepare_eventLog
 from mining.probability import create_eventlog_from_dataFrame
+from mining.profiling import instrumented
+from mining.shared import SharedArrays, attach
 
 from sklearn.cluster import AgglomerativeClustering
 from pm4py.algo.filtering.log.variants.variants_filter import get_variants
+from rapidfuzz import process
 from rapidfuzz.distance import Levenshtein
 
 
+def agglomerative_clusters(matrix, n_clusters):
+    """거리 행렬(precomputed)에 대한 complete linkage 계층적 군집화"""
+    clustering_model = AgglomerativeClustering(
+        n_clusters=n_clusters,
+        metric='precomputed',
+        linkage='complete'
+    )
+    clusters = clustering_model.fit_predict(matrix)
+    return clusters
+
+
+def map_variant_cases_to_clusters(variant_case_ids, clusters):
+    """
+    variant별 processID 목록과 variant별 군집 라벨로 {cluster_label: [process_id, ...]} 생성
+    """
+    if len(variant_case_ids) != len(clusters):
+        raise ValueError(
+            f"variant 개수({len(variant_case_ids)})와 "
+            f"클러스터 길이({len(clusters)})가 다릅니다."
+        )
+
+    cluster_to_pids = defaultdict(list)
+
+    for idx, case_ids in enumerate(variant_case_ids):
+        cluster_to_pids[int(clusters[idx])].extend(case_ids)
+
+    return cluster_to_pids
+
+
+_WORKER = {}
+
+
+def _init_distance_worker(handle, vocabulary):
+    """worker : 공유 메모리의 variant code / offset으로 문자열을 한 번만 복원, 결과 행렬에 attach"""
+    arrays = attach(handle)
+    codes, offsets = arrays['codes'], arrays['offsets']
+    _WORKER['strings'] = [" ".join(vocabulary[c] for c in codes[offsets[i]:offsets[i + 1]])
+                          for i in range(len(offsets) - 1)]
+    _WORKER['distances'] = arrays['distances']
+
+
+def _distance_tile(bounds):
+    """행 [start, stop) 구간의 거리를 공유 결과 행렬에 바로 기록 (결과는 pickle로 돌려보내지 않음)"""
+    start, stop = bounds
+    strings = _WORKER['strings']
+    _WORKER['distances'][start:stop] = process.cdist(strings[start:stop], strings, scorer=Levenshtein.distance)
+
+
+def pairwise_levenshtein(sequences, n_jobs=1, tile_size=None):
+    """
+    activity 시퀀스 간 Levenshtein 거리 행렬 (공백으로 이은 문자열 기준)
+
+    - n_jobs > 1이면 행 단위 tile을 process pool에서 계산
+    - 시퀀스는 정수 code 배열로, 결과 행렬은 공유 메모리(SharedArrays)로 전달하여 worker별 복사 없음
+
+    Args:
+        sequences: [[activity, ...], ...]
+        n_jobs: worker process 수 (None이면 CPU 수)
+        tile_size: tile당 행 수 (None이면 worker당 4개 tile)
+    """
+    n = len(sequences)
+    if n_jobs == 1 or n < 2:
+        distance_matrix = np.zeros((n, n))
+        for i in range(n):
+            for j in range(i + 1, n):
+                dist = Levenshtein.distance(
+                    " ".join(sequences[i]),
+                    " ".join(sequences[j])
+                )
+                distance_matrix[i, j] = dist
+                distance_matrix[j, i] = dist
+        return distance_matrix
+
+    vocabulary = list(dict.fromkeys(label for sequence in sequences for label in sequence))
+    code = {label: i for i, label in enumerate(vocabulary)}
+    codes = np.fromiter((code[label] for sequence in sequences for label in sequence), dtype=np.int32)
+    offsets = np.r_[0, np.cumsum([len(sequence) for sequence in sequences])]
+
+    n_jobs = n_jobs or os.cpu_count()
+    tile_size = tile_size or max(1, -(-n // (n_jobs * 4)))
+    tiles = [(start, min(start + tile_size, n)) for start in range(0, n, tile_size)]
+
+    with SharedArrays({'codes': codes, 'offsets': offsets, 'distances': ((n, n), np.float64)}) as shared, \
+            ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_distance_worker,
+                                initargs=(shared.handle, vocabulary)) as executor:
+        list(executor.map(_distance_tile, tiles))
+        return np.array(shared['distances'])
+
+
 class ClusteredTraces:
     
-    def __init__(self, dataframe):
-        self.dataframe = dataframe.copy()
+    def __init__(self, dataframe, n_jobs=1):
+        # prepare_eventLog에서 필요한 컬럼만 복사하므로 원본은 참조만 유지
+        self.dataframe = dataframe
+        self.n_jobs = n_jobs
         
         self.event_log = self.preprocessing()
         self.sequences = self.achieve_trace_infomation()[1]
@@ -36,30 +133,20 @@ class ClusteredTraces:
 
         return (traces, trace_sequences, trace_labels)
 
+    @instrumented('ClusteredTraces.calculate_distance_matrix')
     def calculate_distance_matrix(self):
-        n = len(self.sequences)
-        distance_matrix = np.zeros((n, n))
-
-        for i in range(n):
-            for j in range(i + 1, n):
-                dist = Levenshtein.distance(
-                    " ".join(self.sequences[i]), 
-                    " ".join(self.sequences[j])
-                )
-                distance_matrix[i, j] = dist
-                distance_matrix[j, i] = dist
-
-        return distance_matrix
+        return pairwise_levenshtein(self.sequences, n_jobs=self.n_jobs)
 
     @property
     def clusetering_agglomerative(self):
-        clustering_model = AgglomerativeClustering(
-            n_clusters=self.n_clusters,
-            metric='precomputed',
-            linkage='complete'
-        )
-        clusters = clustering_model.fit_predict(self.matrix)
-        return clusters
+        return agglomerative_clusters(self.matrix, self.n_clusters)
+
+    def variant_case_ids(self):
+        """
+        variant 순서(achieve_trace_infomation의 순서)대로 각 variant에 속한 processID 목록
+        """
+        variants = get_variants(self.event_log)
+        return [[trace.attributes.get('concept:name') for trace in variants[v]] for v in variants]
 
     def map_process_ids_to_clusters(self, clusters=None):
         """
@@ -74,24 +161,7 @@ class ClusteredTraces:
         if clusters is None:
             clusters = self.clusetering_agglomerative
 
-        variants = get_variants(self.event_log)
-        ordered_variant_keys = list(variants.keys())
-
-        if len(ordered_variant_keys) != len(clusters):
-            raise ValueError(
-                f"variant 개수({len(ordered_variant_keys)})와 "
-                f"클러스터 길이({len(clusters)})가 다릅니다."
-            )
-
-        cluster_to_pids = defaultdict(list)
-
-        for idx, v in enumerate(ordered_variant_keys):
-            cluster_label = int(clusters[idx])
-            for trace in variants[v]:
-                pid = trace.attributes.get('concept:name')
-                cluster_to_pids[cluster_label].append(pid)
-
-        return cluster_to_pids
+        return map_variant_cases_to_clusters(self.variant_case_ids(), clusters)
 
     def __call__(self, n_clusters=None):
         if n_clusters is None:
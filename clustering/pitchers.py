@@ -0,0 +1,236 @@
+"""
+투수 간 전략(전이 분포) 유사도 / 군집화 모듈
+
+ClusteredTraces가 한 투수 안의 타석들을 군집화한다면, 이 모듈은 리그 전체 투수를 서로 비교합니다.
+
+- 투수 × (from, to) 전이 빈도를 sparse 행렬 하나로 집계 (공통 vocabulary에 한 번에 정렬)
+- 투수별 전이확률 행렬 P(next | current)의 상태별 Jensen-Shannon / Hellinger 거리를
+  두 투수의 상태 방문 비율 평균으로 가중합 (구종 사용 비율만 다르고 전이확률이 같으면 거리 0)
+  block 단위 행렬 연산으로 계산
+- 거리 행렬로 계층적 군집화
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import entr
+
+from mining.traces import EncodedTraces
+from mining.profiling import instrumented
+
+
+METRICS = ('js', 'hellinger')
+
+
+def pitcher_transition_matrix(dataframe, pitcher_key='pitcher'):
+    """
+    투수 × (from, to) 전이 빈도 sparse 행렬
+
+    Args:
+        dataframe: add_node_and_preprocess 결과 DataFrame (여러 투수 포함)
+        pitcher_key: 투수 구분 컬럼
+
+    Returns:
+        (pitchers, counts, vocabulary): 투수 id 배열, (투수 수, V * V) CSR 빈도 행렬, activity 라벨
+    """
+    traces = EncodedTraces.from_dataframe(dataframe, case_columns=(pitcher_key,))
+    pitcher_codes, pitchers = pd.factorize(traces.cases[pitcher_key], sort=True)
+
+    n = len(traces.vocabulary)
+    src, dst, index = traces.transitions()
+    rows = pitcher_codes[traces.case_index()[index]]
+    columns = src.astype(np.int64) * n + dst
+
+    counts = sparse.coo_matrix((np.ones(len(index)), (rows, columns)), shape=(len(pitchers), n * n)).tocsr()
+    counts.sum_duplicates()
+    return np.asarray(pitchers), counts, traces.vocabulary
+
+
+def conditional_distributions(counts, n_states, fallback=None, memory_mb=64):
+    """
+    투수별 전이확률 행렬과 상태(from) 방문 비율
+
+    - 상태별 합계 / 전체 합산 전이확률은 sparse 행렬에서 바로 계산하고,
+      전이확률은 투수 block 단위로 dense 변환하여 결과 배열에 채움 (전체 빈도 행렬을 dense로 만들지 않음)
+
+    Args:
+        counts: (n, V * V) 전이 빈도 (행마다 V개씩 from 상태 block)
+        n_states: V
+        fallback: (V * V,) 투수가 방문하지 않은 상태에 채울 전이확률 (None이면 전체 투수 합산 전이확률)
+        memory_mb: block 하나가 사용할 최대 메모리
+
+    Returns:
+        (conditional, weights): (n, V, V) 행별 합이 1인 전이확률, (n, V) 상태 방문 비율
+    """
+    counts = sparse.csr_matrix(counts)
+    n, V = counts.shape[0], n_states
+
+    # (V * V, V) from 상태 indicator : 빈도 행렬 @ indicator = 투수 × 상태 합계
+    state_of_column = np.repeat(np.arange(V), V)
+    by_state = sparse.csr_matrix((np.ones(V * V), (np.arange(V * V), state_of_column)), shape=(V * V, V))
+    row_totals = np.asarray((counts @ by_state).todense())
+    if fallback is None:
+        pooled = np.asarray(counts.sum(axis=0)).reshape(V, V)
+        fallback = pooled / np.maximum(pooled.sum(axis=1, keepdims=True), 1)
+    fallback = np.asarray(fallback, dtype=np.float64).reshape(V, V)
+
+    conditional = np.empty((n, V, V))
+    block = max(1, int(memory_mb * 1024 ** 2 / (8 * max(V * V, 1))))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        out = conditional[start:stop]
+        out[...] = counts[start:stop].toarray().reshape(-1, V, V)
+        totals = row_totals[start:stop]
+        visited = totals > 0
+        out[visited] /= totals[visited][:, None]
+        out[~visited] = fallback[np.nonzero(~visited)[1]]
+
+    weights = row_totals / np.maximum(row_totals.sum(axis=1, keepdims=True), 1)
+    return conditional, weights
+
+
+def conditional_divergence(conditional, weights, metric='js', memory_mb=64):
+    """
+    상태 가중 전이확률 거리
+
+    - 상태 a의 가중치 w_a = (π_p(a) + π_q(a)) / 2  (π : 투수별 상태 방문 비율)
+    - js        : sqrt(Σ_a w_a JS(P_a, Q_a))  (log2, 0 ~ 1)
+    - hellinger : sqrt(Σ_a w_a (1 - Σ_b sqrt(P_ab Q_ab)))
+
+    Args:
+        conditional: (n, V, V) 전이확률 (conditional_distributions)
+        weights: (n, V) 상태 방문 비율
+        memory_mb: block 계산에서 동시에 존재하는 임시 배열 전체의 최대 메모리
+                   (js : (block, n, V, V) 혼합분포 1개 + (block, n, V) 3개, hellinger : (block, n, V) 3개)
+
+    Returns:
+        ndarray: (n, n) 대칭 거리 행렬
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric은 {METRICS} 중 하나여야 합니다: {metric}")
+
+    n, V, _ = conditional.shape
+    result = np.zeros((n, n))
+    root = np.sqrt(conditional) if metric == 'hellinger' else None
+    entropy = entr(conditional).sum(axis=2)  # (n, V) 상태별 entropy
+
+    per_row = 8 * n * ((V * V if metric == 'js' else 0) + 3 * V)
+    block = max(1, int(memory_mb * 1024 ** 2 / max(per_row, 1)))
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        if metric == 'js':
+            # 혼합분포 배열 하나를 제자리에서 entropy로 바꾸고 상태별로 합침
+            mixture = conditional[start:stop, None] + conditional[None, start:]
+            mixture *= 0.5
+            per_state = entr(mixture, out=mixture).sum(axis=3)
+            del mixture
+            per_state -= (entropy[start:stop, None] + entropy[None, start:]) / 2
+            per_state /= np.log(2)
+        else:
+            per_state = np.einsum('iab,jab->ija', root[start:stop], root[start:])
+            np.subtract(1, per_state, out=per_state)
+
+        w = weights[start:stop, None, :] + weights[None, start:, :]
+        w *= 0.5
+        value = np.einsum('ija,ija->ij', w, per_state)
+
+        # 대칭이므로 j >= start 열만 계산
+        distance = np.sqrt(np.clip(value, 0, 1))
+        result[start:stop, start:] = distance
+        result[start:, start:stop] = distance.T
+    np.fill_diagonal(result, 0)
+    return result
+
+
+class PitcherSimilarity:
+    """
+    리그 전체 투수의 전이확률 유사도 / 전략 군집화
+
+    - 방문하지 않은 상태의 전이확률은 전체 투수 합산 전이확률로 채움 (그 상태의 가중치는 상대 투수 방문 비율의 절반)
+
+    Args:
+        dataframe: add_node_and_preprocess 결과 DataFrame (여러 투수 포함)
+        pitcher_key: 투수 구분 컬럼
+        metric: 'js' 또는 'hellinger'
+        min_transitions: 전이 수가 이보다 적은 투수는 제외 (분포가 불안정)
+    """
+
+    def __init__(self, dataframe, pitcher_key='pitcher', metric='js', min_transitions=50):
+        self.pitcher_key = pitcher_key
+        self.metric = metric
+        self.n_clusters = 0
+
+        pitchers, counts, self.vocabulary = pitcher_transition_matrix(dataframe, pitcher_key)
+        totals = np.asarray(counts.sum(axis=1)).ravel()
+        keep = totals >= min_transitions
+
+        self.pitchers = pitchers[keep]
+        self.counts = counts[keep]
+        self.distributions, self.state_weights = conditional_distributions(self.counts, len(self.vocabulary))
+        self.names = self._pitcher_names(dataframe)
+        self.matrix = self.calculate_distance_matrix()
+
+    def _pitcher_names(self, dataframe):
+        if 'pitcher_name' not in dataframe.columns:
+            return None
+        names = dataframe.drop_duplicates(self.pitcher_key).set_index(self.pitcher_key)['pitcher_name']
+        return names.reindex(self.pitchers).to_numpy()
+
+    @instrumented('PitcherSimilarity.calculate_distance_matrix')
+    def calculate_distance_matrix(self):
+        return conditional_divergence(self.distributions, self.state_weights, metric=self.metric)
+
+    @property
+    def clusetering_agglomerative(self):
+        from .distance import agglomerative_clusters
+        return agglomerative_clusters(self.matrix, self.n_clusters)
+
+    def nearest(self, pitcher, k=5):
+        """
+        가장 비슷한 투수 k명
+
+        Returns:
+            DataFrame: pitcher, (pitcher_name), distance
+        """
+        i = int(np.flatnonzero(self.pitchers == pitcher)[0])
+        order = [j for j in np.argsort(self.matrix[i], kind='stable') if j != i][:k]
+        df = pd.DataFrame({'pitcher': self.pitchers[order], 'distance': self.matrix[i, order]})
+        if self.names is not None:
+            df.insert(1, 'pitcher_name', self.names[order])
+        return df
+
+    def cluster_profiles(self, clusters):
+        """
+        군집별 평균 전략 (군집에 속한 투수들의 빈도를 합산한 전이확률)
+
+        Returns:
+            dict: {cluster_label: DataFrame(Source, Target, Variable)}
+        """
+        n = len(self.vocabulary)
+        profiles = {}
+        for label in np.unique(clusters):
+            summed = np.asarray(self.counts[clusters == label].sum(axis=0)).ravel().reshape(n, n)
+            src, dst = np.nonzero(summed)
+            profiles[int(label)] = pd.DataFrame({
+                'Source': [self.vocabulary[i] for i in src],
+                'Target': [self.vocabulary[i] for i in dst],
+                'Variable': summed[src, dst] / summed.sum(axis=1)[src],
+            })
+        return profiles
+
+    def __call__(self, n_clusters=None):
+        if n_clusters is None:
+            print("Error : 군집의 개수를 정해주세요!,  'n_clusters' argument is empty")
+        self.n_clusters = n_clusters
+
+        result = {}
+        result['pitchers'] = self.pitchers
+        result['names'] = self.names
+        result['vocabulary'] = self.vocabulary
+        result['distances'] = self.matrix
+        result['clusters'] = self.clusetering_agglomerative
+        result['n_clusters'] = self.n_clusters
+        result['cluster_map'] = {int(label): self.pitchers[result['clusters'] == label].tolist()
+                                 for label in np.unique(result['clusters'])}
+        result['profiles'] = self.cluster_profiles(result['clusters'])
+
+        return result
@@ -1,8 +1,14 @@
 import pandas as pd
 
-def clustered_dataframe(final_results, df_filtered):
-    
-    df_filtered = df_filtered.copy()
+def clustered_dataframe(final_results, df_filtered, copy=True):
+    """
+    ClusteredTraces 결과의 cluster_map을 DataFrame의 cluster 컬럼으로 매핑
+
+    Args:
+        copy: False이면 df_filtered에 cluster 컬럼을 직접 추가 (lean 모드에서 복사 생략)
+    """
+    if copy:
+        df_filtered = df_filtered.copy()
     cluster_map = final_results['cluster_map']
     mapping_to_cluster = {}
 
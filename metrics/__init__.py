@@ -1,9 +1,11 @@
 from .saber import p_per_pa
 from .saber import k_per_pa
 from .saber import fip
+from .predictability import predictability
 
 __all__ = [
     'p_per_pa',
     'k_per_pa',
-    'fip'
+    'fip',
+    'predictability'
 ]
\ No newline at end of file
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from mining.surprisal import PitchSurprisal
+
+
+def predictability(df_filtered, order=1, context=(), alpha=0.0, by=None):
+    """
+    투구 예측 가능성 지표 (surprisal / entropy, 단위 bit)
+
+    - surprisal/pitch : 실제 투구의 평균 -log2 p (낮을수록 예측하기 쉬운 투구 배합)
+    - entropy/pitch   : 투구 시점 다음 투구 분포의 평균 entropy
+    - surprisal/PA    : 타석당 누적 surprisal
+
+    Args:
+        df_filtered: add_node_and_preprocess 결과 DataFrame (cluster 컬럼이 있으면 cluster별로도 계산)
+        order, context, alpha: 전이 모델(CompiledMarkovModel) 설정 (전체 데이터로 한 번만 학습)
+        by: 그룹 컬럼 (None이면 cluster 컬럼이 있을 때 'cluster', 예: 'pitcher')
+    """
+    if by is None and 'cluster' in df_filtered.columns:
+        by = 'cluster'
+
+    scorer = PitchSurprisal(df_filtered, order=order, context=context, alpha=alpha,
+                            case_columns=(by,) if by is not None else ())
+    cases = scorer.case_table()
+
+    def summarize(unit, group):
+        pitches = group['pitches'].sum()
+        return {
+            "unit": unit,
+            "PA": len(group),
+            "pitches": pitches,
+            "surprisal/pitch": group['surprisal'].sum() / pitches,
+            "entropy/pitch": (group['mean_entropy'] * group['pitches']).sum() / pitches,
+            "surprisal/PA": group['surprisal'].mean(),
+        }
+
+    results = [summarize('all', cases)]
+    if by is not None:
+        for unit, group in cases.groupby(by, observed=True):
+            results.append(summarize(unit, group))
+
+    df_result = pd.DataFrame(results)
+    df_result["perplexity"] = np.power(2.0, df_result["surprisal/pitch"])
+    predictability_dict = {row["unit"]: row["surprisal/pitch"] for row in results}
+    return predictability_dict, df_result
@@ -3,40 +3,91 @@
 # __doc__= "discription"
 # 외부 파일에서 import 시에는 from <Directory> import ( <function>, <function>, ...)
 
+# 공개 API는 처음 접근할 때 해당 모듈을 import (module-level __getattr__)
+# - pm4py, plotly, networkx, pyvis, google-cloud-bigquery 등 무거운 의존성은
+#   그 기능을 실제로 사용할 때만 로드됩니다.
+import importlib
 
-from .preprocessing import define_at_bat_cases
-from .preprocessing import assign_group_index_two_pointer
-from .preprocessing import one_way_filter
 
-from .pipeline import preprocessing_df
-from .pipeline import one_step_EDA_from_bigquery
-from .pipeline import one_step_EDA_from_csv
+_LAZY_ATTRIBUTES = {
+    'define_at_bat_cases': '.preprocessing',
+    'assign_group_index_two_pointer': '.preprocessing',
+    'one_way_filter': '.preprocessing',
 
-from .probability import BasedTraces
-from .probability import prepare_eventLog
-from .probability import create_eventlog_from_dataFrame
+    'ActivityEncoder': '.activity',
+    'bin_zone': '.activity',
 
+    'preprocessing_df': '.pipeline',
+    'one_step_EDA_from_bigquery': '.pipeline',
+    'one_step_EDA_from_csv': '.pipeline',
 
-from .exploratory import ProcessEDA
+    'BasedTraces': '.probability',
+    'prepare_eventLog': '.probability',
+    'create_eventlog_from_dataFrame': '.probability',
 
-from .visualizer import sankey_visualizer
-from .visualizer import interactive_graph
+    'ProcessEDA': '.exploratory',
 
-from .utils import load_data_from_bigquery
+    'sankey_visualizer': '.visualizer',
+    'interactive_graph': '.visualizer',
 
+    'load_data_from_bigquery': '.utils',
 
-__all__ = [    
-    'define_at_bat_cases',
-    'assign_group_index_two_pointer',
-    'one_way_filter',
-    'preprocessing_df',
-    'one_step_EDA_from_bigquery',
-    'one_step_EDA_from_csv',
-    'BasedTraces',
-    'prepare_eventLog',
-    'create_eventlog_from_dataFrame',
-    'ProcessEDA',
-    'sankey_visualizer',
-    'interactive_graph',
-    'load_data_from_bigquery'
-]
+    'optimize_dtypes': '.memory',
+    'peak_memory_report': '.memory',
+
+    'StageCache': '.stages',
+    'StagePipeline': '.stages',
+    'analysis_pipeline': '.stages',
+
+    'generate_pitches': '.synthetic',
+
+    'EncodedTraces': '.traces',
+    'CompiledMarkovModel': '.markov',
+    'serve': '.service',
+
+    'VariantTrie': '.trie',
+
+    'ContextTransitionTensor': '.context',
+    'base_state': '.context',
+
+    'transition_intervals': '.uncertainty',
+
+    'compare_transitions': '.compare',
+    'compare_many': '.compare',
+    'transition_counts_by': '.compare',
+    'TransitionDrift': '.drift',
+    'VariantSketch': '.sketch',
+    'SpaceSaving': '.sketch',
+    'CountMinSketch': '.sketch',
+    'AbsorbingChain': '.absorbing',
+    'PitchSurprisal': '.surprisal',
+    'dfg_from_counts': '.dfg',
+    'prune_dfg': '.dfg',
+    'build_report': '.report',
+    'write_xes': '.eventlog_io',
+    'read_xes': '.eventlog_io',
+    'write_parquet': '.eventlog_io',
+    'read_parquet': '.eventlog_io',
+    'iter_parquet_cases': '.eventlog_io',
+    'SharedArrays': '.shared',
+    'SharedTraces': '.shared',
+    'attach_traces': '.shared',
+    'ConformanceChecker': '.conformance',
+    'StratifiedSample': '.sampling',
+}
+
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(_LAZY_ATTRIBUTES[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,229 @@
+"""
+흡수 마르코프 체인(absorbing Markov chain) 분석 모듈
+
+전이확률 행렬을 'end'(또는 타석 결과별 end_out / end_reach ...)를 흡수 상태로 갖는 마르코프 체인으로 보고
+sparse 선형방정식을 풀어 정확한 값을 계산합니다.
+
+    P = [[Q, R],       Q : 비흡수(transient) 상태 사이 전이, R : 비흡수 → 흡수 전이
+         [0, I]]       N = (I - Q)^-1 : 기본 행렬 (역행렬은 만들지 않고 LU 분해로 풂)
+
+- visits     : start에서 출발한 타석 하나가 각 상태를 방문하는 기대 횟수  (I - Q)^T v = e_start
+- flows      : 전이(edge)별 기대 통과량 v[from] × P[from, to]  (sankey 링크 값, edge 순서와 무관)
+- remaining  : 각 상태 이후 남은 기대 투구 수  (I - Q) t = c   (c : 투구 상태 1, start 0)
+- absorption : 각 상태에서 출발했을 때 흡수 상태(타석 결과)별 도달 확률  (I - Q) B = R
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from .traces import EncodedTraces
+from .preprocessing import CASE_RESULT_TAXONOMY
+from .profiling import instrumented
+
+
+class AbsorbingChain:
+    """
+    전이 빈도 / 확률로 만든 흡수 마르코프 체인
+
+    Args:
+        vocabulary: 상태 라벨
+        src, dst: 전이 (from, to) code 배열 (중복 없음, 입력 순서는 flows 결과 순서로 유지)
+        weight: 전이 빈도 또는 확률 (from 기준으로 다시 정규화)
+        start: 시작 상태 라벨
+    """
+
+    def __init__(self, vocabulary, src, dst, weight, start='start'):
+        self.vocabulary = list(vocabulary)
+        self.start = start
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        weight = np.asarray(weight, dtype=np.float64)
+
+        n = len(self.vocabulary)
+        row_total = np.bincount(self.src, weights=weight, minlength=n)
+        self.probability = weight / row_total[self.src]
+
+        # [1] 나가는 전이가 없는 상태 = 흡수 상태
+        self.is_transient = row_total > 0
+        self.transient = np.flatnonzero(self.is_transient)
+        self.absorbing = np.flatnonzero(~self.is_transient)
+        self.position = np.full(n, -1, dtype=np.int64)
+        self.position[self.transient] = np.arange(len(self.transient))
+        self.position[self.absorbing] = np.arange(len(self.absorbing))
+
+        # [2] Q, R 분리 후 (I - Q) LU 분해
+        to_transient = self.is_transient[self.dst]
+        rows = self.position[self.src]
+        m = len(self.transient)
+        Q = sparse.csr_matrix((self.probability[to_transient], (rows[to_transient], self.position[self.dst[to_transient]])),
+                              shape=(m, m))
+        self.R = sparse.csr_matrix((self.probability[~to_transient], (rows[~to_transient],
+                                                                       self.position[self.dst[~to_transient]])),
+                                   shape=(m, len(self.absorbing)))
+        self._lu = splu(sparse.csc_matrix(sparse.identity(m) - Q))
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_transitions(cls, df_transition, start='start'):
+        """
+        ProcessEDA / sankey_visualizer 형식 전이 표 (Source, Target, Variable)로 생성
+        """
+        vocabulary = list(pd.unique(df_transition[['Source', 'Target']].values.ravel('K')))
+        code = {label: i for i, label in enumerate(vocabulary)}
+        src = df_transition['Source'].map(code).to_numpy()
+        dst = df_transition['Target'].map(code).to_numpy()
+        return cls(vocabulary, src, dst, df_transition['Variable'].to_numpy(), start=start)
+
+    @classmethod
+    def from_counts(cls, counts, start='start'):
+        """BasedTraces counts / probs (중첩 dict)로 생성"""
+        df_transition = pd.DataFrame([{'Source': a, 'Target': b, 'Variable': v}
+                                      for a, to_dict in counts.items() for b, v in to_dict.items() if v > 0])
+        return cls.from_transitions(df_transition, start=start)
+
+    @classmethod
+    def from_traces(cls, traces, outcome=None, taxonomy=CASE_RESULT_TAXONOMY, default='other',
+                    start='start', end='end'):
+        """
+        EncodedTraces로 생성
+
+        Args:
+            outcome: case별 결과 배열 또는 traces.cases 컬럼 이름. 주면 end를 결과별 흡수 상태(end_out 등)로 나눔
+            taxonomy: 결과 값 → 범주 매핑 (None이면 결과 값을 그대로 사용)
+            default: taxonomy에 없는 결과의 범주
+        """
+        n = len(traces.vocabulary)
+        src, dst, index = traces.transitions()
+        src, dst = src.astype(np.int64), dst.astype(np.int64)
+        vocabulary = list(traces.vocabulary)
+
+        # [1] end로 가는 전이를 타석 결과별 흡수 상태로 분리
+        if outcome is not None:
+            values = traces.cases[outcome] if isinstance(outcome, str) else outcome
+            values = pd.Series(np.asarray(values, dtype=object))
+            if taxonomy is not None:
+                values = values.map(lambda v: taxonomy.get(v, default))
+            outcome_codes, uniques = pd.factorize(values.fillna(default), sort=True)
+
+            to_end = dst == traces.code_of(end)
+            dst = np.where(to_end, n + outcome_codes[traces.case_index()[index]], dst)
+            vocabulary += [f"{end}_{u}" for u in uniques]
+
+        # [2] (from, to) 빈도 후 사용된 상태만 남김
+        keys, count = np.unique(src * len(vocabulary) + dst, return_counts=True)
+        src, dst = keys // len(vocabulary), keys % len(vocabulary)
+        used, codes = np.unique(np.r_[src, dst], return_inverse=True)
+        return cls([vocabulary[i] for i in used], codes[:len(src)], codes[len(src):], count, start=start)
+
+    @classmethod
+    def from_dataframe(cls, df_event, outcome='events', taxonomy=CASE_RESULT_TAXONOMY, default='other',
+                       case_key='case:concept:name', activity_key='concept:name', start='start', end='end'):
+        """
+        add_node_and_preprocess 결과로 생성
+
+        Args:
+            outcome: case 결과 컬럼 (case 첫 row = 시작 노드 = 마지막 투구의 복사본). None이면 end 하나
+        """
+        case_columns = () if outcome is None else (outcome,)
+        traces = EncodedTraces.from_dataframe(df_event, case_key=case_key, activity_key=activity_key,
+                                              case_columns=case_columns)
+        return cls.from_traces(traces, outcome=outcome, taxonomy=taxonomy, default=default, start=start, end=end)
+
+    # ------------------------------------------------------------------
+    # 계산
+    # ------------------------------------------------------------------
+    def _labels(self, codes):
+        return [self.vocabulary[i] for i in codes]
+
+    def _start_position(self):
+        try:
+            start = self.vocabulary.index(self.start)
+        except ValueError:
+            raise ValueError(f"시작 상태 '{self.start}'가 전이 표에 없습니다.")
+        return self.position[start]
+
+    @instrumented('AbsorbingChain.visits')
+    def visits(self):
+        """
+        start에서 출발한 타석 하나의 상태별 기대 방문 횟수 (흡수 상태는 도달 확률)
+
+        Returns:
+            Series: 상태 라벨 index
+        """
+        rhs = np.zeros(len(self.transient))
+        rhs[self._start_position()] = 1.0
+        transient_visits = self._lu.solve(rhs, trans='T')
+
+        values = np.zeros(len(self.vocabulary))
+        values[self.transient] = transient_visits
+        values[self.absorbing] = self.R.T @ transient_visits
+        return pd.Series(values, index=self.vocabulary, name='visits')
+
+    def flows(self):
+        """
+        전이별 기대 통과량 (입력 전이 순서 유지)
+
+        Returns:
+            DataFrame: Source, Target, Variable(전이확률), flow
+        """
+        visits = self.visits().to_numpy()
+        return pd.DataFrame({
+            'Source': self._labels(self.src),
+            'Target': self._labels(self.dst),
+            'Variable': self.probability,
+            'flow': visits[self.src] * self.probability,
+        })
+
+    @instrumented('AbsorbingChain.expected_remaining')
+    def expected_remaining(self, cost=None):
+        """
+        각 비흡수 상태에 도달한 뒤 흡수될 때까지 남은 기대 투구 수
+
+        Args:
+            cost: 비흡수 상태별 비용 (None이면 start 0, 나머지 투구 상태 1)
+                  → start 값은 타석당 기대 투구 수 (P/PA)
+
+        Returns:
+            Series: 비흡수 상태 라벨 index
+        """
+        if cost is None:
+            cost = np.array([0.0 if label == self.start else 1.0 for label in self._labels(self.transient)])
+        total = self._lu.solve(np.asarray(cost, dtype=np.float64))
+        return pd.Series(total - cost, index=self._labels(self.transient), name='expected_remaining')
+
+    @instrumented('AbsorbingChain.absorption')
+    def absorption(self):
+        """
+        각 비흡수 상태에서 출발했을 때 흡수 상태별 도달 확률 (행 합 1)
+
+        Returns:
+            DataFrame: index 비흡수 상태, columns 흡수 상태
+        """
+        probabilities = self._lu.solve(self.R.toarray())
+        return pd.DataFrame(probabilities.reshape(len(self.transient), -1),
+                            index=self._labels(self.transient), columns=self._labels(self.absorbing))
+
+    def __call__(self):
+        result = {}
+        result['visits'] = self.visits()
+        result['flows'] = self.flows()
+        result['expected_remaining'] = self.expected_remaining()
+        result['absorption'] = self.absorption()
+        return result
+
+    def __repr__(self):
+        return (f"AbsorbingChain(states={len(self.vocabulary)}, transient={len(self.transient)}, "
+                f"absorbing={self._labels(self.absorbing)})")
+
+
+def edge_flows(df_transition, start='start'):
+    """
+    전이 표 (Source, Target, Variable)의 행별 기대 통과량 (sankey 링크 값)
+
+    Returns:
+        ndarray: df_transition 행 순서의 flow
+    """
+    return AbsorbingChain.from_transitions(df_transition, start=start).flows()['flow'].to_numpy()
@@ -0,0 +1,120 @@
+"""
+Activity(concept:name) 라벨 생성 모듈
+
+여러 categorical 차원(구종, 타석 결과, 그룹화된 description, 투구 위치 zone)을
+category code의 정수 연산(mixed-radix)으로 결합하여 compact한 categorical activity 컬럼을 만듭니다.
+라벨 문자열은 실제로 등장한 조합(vocabulary) 개수만큼만 생성되므로 행 수와 무관합니다.
+"""
+import numpy as np
+import pandas as pd
+
+
+# case_type 별 activity를 구성하는 차원
+# - out / reach 계열은 attach_case_result_to_pitch_type이 pitch_type에 결과를 이미 붙여 둔 상태를 사용
+ACTIVITY_SCHEMES = {
+    None: ('pitch_type',),
+    'out': ('pitch_type',),
+    'reach': ('pitch_type',),
+    'discription': ('pitch_type', 'grouped_description'),
+    'out+discription': ('pitch_type', 'grouped_description'),
+    'reach+discription': ('pitch_type', 'grouped_description'),
+    'zone': ('pitch_type', 'zone'),
+}
+
+# 스트라이크 존 기준 구간 경계 (단위: ft, 포수 시점)
+# - plate_x : 홈플레이트 폭(17 inch) + 공 반지름을 3등분, 바깥은 볼 영역
+# - plate_z : 일반적인 스트라이크 존 높이(1.5 ~ 3.5 ft)를 3등분, 바깥은 볼 영역
+ZONE_X_EDGES = (-0.83, -0.28, 0.28, 0.83)
+ZONE_Z_EDGES = (1.5, 2.17, 2.83, 3.5)
+
+
+def bin_zone(df_event, x_edges=ZONE_X_EDGES, z_edges=ZONE_Z_EDGES, missing='ZNA'):
+    """
+    plate_x / plate_z를 격자 구간으로 나눈 zone 범주 생성
+
+    Args:
+        df_event: plate_x, plate_z 컬럼을 가진 DataFrame
+        x_edges, z_edges: 구간 경계 (경계 개수 + 1 개의 구간이 생김)
+        missing: 위치 정보가 없는 투구의 zone 이름
+
+    Returns:
+        Categorical: 'Z{x구간}{z구간}' 형태의 zone (x는 왼쪽→오른쪽, z는 아래→위)
+    """
+    x_bin = np.digitize(df_event['plate_x'].to_numpy(dtype=float, na_value=np.nan), x_edges)
+    z_bin = np.digitize(df_event['plate_z'].to_numpy(dtype=float, na_value=np.nan), z_edges)
+
+    n_z = len(z_edges) + 1
+    categories = [f"Z{ix}{iz}" for ix in range(len(x_edges) + 1) for iz in range(n_z)]
+
+    codes = x_bin * n_z + z_bin
+    codes[df_event['plate_x'].isna().to_numpy() | df_event['plate_z'].isna().to_numpy()] = len(categories)
+    return pd.Categorical.from_codes(codes, categories=categories + [missing])
+
+
+class ActivityEncoder:
+    """
+    categorical 차원들을 결합해 activity 라벨(concept:name)을 만드는 인코더
+
+    Args:
+        dimensions: 결합할 컬럼 이름 (순서대로 '_'로 이어진 라벨이 됨).
+                    'zone'은 plate_x / plate_z에서 bin_zone으로 계산
+        sep: 라벨 구분자
+        reserved: vocabulary 앞쪽에 항상 포함할 라벨 (예: 시작/종료 노드)
+    """
+
+    def __init__(self, dimensions=('pitch_type',), sep='_', reserved=()):
+        if not dimensions:
+            raise ValueError("dimensions에 결합할 컬럼을 하나 이상 지정해 주세요.")
+        self.dimensions = tuple(dimensions)
+        self.sep = sep
+        self.reserved = tuple(reserved)
+        self.vocabulary = None
+
+    def _dimension(self, df_event, name):
+        """차원 하나를 Categorical로 변환 (이미 category면 그대로 사용)"""
+        if name == 'zone' and 'zone' not in df_event.columns:
+            return bin_zone(df_event)
+
+        column = df_event[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            return column.array
+        return pd.Categorical(column)
+
+    def fit_transform(self, df_event):
+        """
+        activity 컬럼 생성
+
+        Returns:
+            Categorical: 등장한 조합만 category로 가지는 activity (self.vocabulary에 라벨 저장)
+        """
+        # [1] 차원별 category code를 mixed-radix로 결합
+        combined = np.zeros(len(df_event), dtype=np.int64)
+        missing = np.zeros(len(df_event), dtype=bool)
+        categories = []
+        for name in self.dimensions:
+            dim = self._dimension(df_event, name)
+            codes = np.asarray(dim.codes, dtype=np.int64)
+            combined = combined * len(dim.categories) + codes
+            missing |= codes < 0
+            categories.append(dim.categories)
+
+        # [2] 실제로 등장한 조합만 vocabulary로 압축
+        used, compact = np.unique(combined[~missing], return_inverse=True)
+
+        # [3] 라벨 문자열은 vocabulary 크기만큼만 생성
+        labels = None
+        remainder = used
+        for dim_categories in reversed(categories):
+            names = np.array([str(c) for c in dim_categories], dtype=object)
+            part = names[remainder % len(dim_categories)]
+            labels = part if labels is None else part + self.sep + labels
+            remainder = remainder // len(dim_categories)
+
+        vocabulary = list(dict.fromkeys(list(self.reserved) + list(labels)))
+        label_index = pd.Index(vocabulary).get_indexer(labels)
+
+        codes = np.full(len(df_event), -1, dtype=np.int32)
+        codes[~missing] = label_index[compact]
+
+        self.vocabulary = vocabulary
+        return pd.Categorical.from_codes(codes, categories=vocabulary)
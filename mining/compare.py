@@ -0,0 +1,270 @@
+"""
+두 전이 모델 비교 모듈
+
+시즌 / 군집 / 매치업(vs 좌타 · 우타) 간 전이 구조 차이를 sankey 그림을 눈으로 비교하는 대신,
+상태(from activity)별로 다음 activity 분포가 달라졌는지 검정합니다.
+
+- 상태별 2 × K 분할표의 chi-square / G-test, Jensen-Shannon divergence를 배열 연산으로 한 번에 계산
+- Benjamini-Hochberg(FDR) 또는 Bonferroni 다중검정 보정
+- compare_many : 여러 (투수-시즌 등) 쌍을 (쌍, 상태, 다음 activity) 3차원 배열로 묶어 한 번에 비교
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2 as chi2_distribution
+
+from .traces import EncodedTraces
+
+
+def _as_counts(data):
+    """
+    비교 입력을 (vocabulary, (V, V) 빈도 행렬)로 변환
+
+    Args:
+        data: BasedTraces counts(중첩 dict), EncodedTraces, add_node_and_preprocess 결과 DataFrame
+              또는 (matrix, vocabulary) tuple
+    """
+    if isinstance(data, tuple):
+        matrix, labels = data
+        return list(labels), np.asarray(matrix, dtype=np.float64)
+    if isinstance(data, dict):
+        labels = list(dict.fromkeys(
+            [label for label in data] + [label for to_dict in data.values() for label in to_dict]
+        ))
+        code = {label: i for i, label in enumerate(labels)}
+        matrix = np.zeros((len(labels), len(labels)))
+        for a, to_dict in data.items():
+            for b, n in to_dict.items():
+                matrix[code[a], code[b]] = n
+        return labels, matrix
+
+    traces = data if isinstance(data, EncodedTraces) else EncodedTraces.from_dataframe(data)
+    return traces.vocabulary, traces.transition_counts().astype(np.float64)
+
+
+def _align(labels, matrix, vocabulary):
+    """matrix를 공통 vocabulary 기준으로 재배치"""
+    index = pd.Index(vocabulary).get_indexer(labels)
+    aligned = np.zeros((len(vocabulary), len(vocabulary)))
+    aligned[np.ix_(index, index)] = matrix
+    return aligned
+
+
+def adjust_pvalues(pvalues, method='fdr_bh', groups=None):
+    """
+    다중검정 보정
+
+    Args:
+        pvalues: p-value 배열 (NaN은 검정하지 않은 것으로 보고 그대로 NaN)
+        method: 'fdr_bh'(Benjamini-Hochberg) 또는 'bonferroni'
+        groups: 보정 단위 그룹 번호 (None이면 전체를 한 번에 보정)
+
+    Returns:
+        ndarray: 보정된 p-value (q-value)
+    """
+    pvalues = np.asarray(pvalues, dtype=np.float64)
+    groups = np.zeros(len(pvalues), dtype=np.int64) if groups is None else np.asarray(groups)
+    adjusted = np.full(len(pvalues), np.nan)
+
+    tested = np.flatnonzero(~np.isnan(pvalues))
+    if len(tested) == 0:
+        return adjusted
+    p, g = pvalues[tested], groups[tested]
+
+    # 그룹별 검정 수 m
+    _, group_index, m = np.unique(g, return_inverse=True, return_counts=True)
+    m = m[group_index]
+
+    if method == 'bonferroni':
+        adjusted[tested] = np.minimum(p * m, 1.0)
+        return adjusted
+    if method != 'fdr_bh':
+        raise ValueError(f"지원하지 않는 보정 방법입니다: {method}")
+
+    # 그룹 안에서 p 내림차순 정렬 → p * m / rank 의 누적 최솟값
+    order = np.lexsort((-p, group_index))
+    sorted_group = group_index[order]
+    group_start = np.r_[0, np.flatnonzero(sorted_group[1:] != sorted_group[:-1]) + 1]
+    position = np.arange(len(order)) - np.repeat(group_start, np.diff(np.r_[group_start, len(order)]))
+    rank = m[order] - position
+
+    values = np.minimum(p[order] * m[order] / rank, 1.0)
+    # 그룹별 누적 최솟값 : 그룹 시작마다 reset 되도록 그룹 번호만큼 offset 후 minimum.accumulate
+    shifted = values - sorted_group * 2.0
+    values = np.minimum.accumulate(shifted) + sorted_group * 2.0
+
+    adjusted[tested[order]] = values
+    return adjusted
+
+
+def state_tests(a, b):
+    """
+    상태별 검정 통계량 (배열 연산)
+
+    Args:
+        a, b: (..., S, T) 빈도 배열 (같은 shape)
+
+    Returns:
+        dict: n_a, n_b, chi2, g, dof, p_chi2, p_g, js (각 (..., S) 배열, 검정 불가 상태는 NaN)
+    """
+    n_a, n_b = a.sum(axis=-1), b.sum(axis=-1)
+    pooled = a + b
+    total = n_a + n_b
+
+    # 기대빈도 (2 × T 분할표)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = pooled / total[..., None]
+        expected_a, expected_b = share * n_a[..., None], share * n_b[..., None]
+
+        chi2 = (np.nansum((a - expected_a) ** 2 / expected_a, axis=-1)
+                + np.nansum((b - expected_b) ** 2 / expected_b, axis=-1))
+        g = 2 * (np.sum(np.where(a > 0, a * np.log(a / expected_a), 0), axis=-1)
+                 + np.sum(np.where(b > 0, b * np.log(b / expected_b), 0), axis=-1))
+
+        p_a, p_b = a / n_a[..., None], b / n_b[..., None]
+        mix = (p_a + p_b) / 2
+        js = 0.5 * np.sum(np.where(p_a > 0, p_a * np.log2(p_a / mix), 0), axis=-1) \
+            + 0.5 * np.sum(np.where(p_b > 0, p_b * np.log2(p_b / mix), 0), axis=-1)
+
+    dof = (pooled > 0).sum(axis=-1) - 1
+    testable = (n_a > 0) & (n_b > 0)
+
+    p_chi2 = np.where(dof > 0, chi2_distribution.sf(chi2, np.maximum(dof, 1)), 1.0)
+    p_g = np.where(dof > 0, chi2_distribution.sf(g, np.maximum(dof, 1)), 1.0)
+
+    result = {'n_a': n_a, 'n_b': n_b, 'chi2': chi2, 'g': g, 'dof': dof, 'p_chi2': p_chi2, 'p_g': p_g, 'js': js}
+    for key in ('chi2', 'g', 'p_chi2', 'p_g', 'js'):
+        result[key] = np.where(testable, result[key], np.nan)
+
+    # 가장 크게 달라진 다음 activity
+    with np.errstate(invalid='ignore'):
+        delta = np.nan_to_num(p_b) - np.nan_to_num(p_a)
+    result['top_change'] = np.abs(delta).argmax(axis=-1)
+    result['delta'] = np.take_along_axis(delta, result['top_change'][..., None], axis=-1)[..., 0]
+    return result
+
+
+def _frame(tests, vocabulary, test, alpha, method, groups=None):
+    """state_tests 결과(1차원으로 펼친 배열) → 정렬된 DataFrame"""
+    p = tests['p_g'] if test == 'g' else tests['p_chi2']
+    q = adjust_pvalues(p, method=method, groups=groups)
+
+    df = pd.DataFrame({
+        'n_a': tests['n_a'].astype(np.int64),
+        'n_b': tests['n_b'].astype(np.int64),
+        'chi2': tests['chi2'],
+        'g': tests['g'],
+        'dof': tests['dof'],
+        'p_value': p,
+        'q_value': q,
+        'js': tests['js'],
+        'top_change': [vocabulary[i] for i in tests['top_change']],
+        'delta': tests['delta'],
+    })
+    df['significant'] = df['q_value'] < alpha
+    return df
+
+
+def compare_transitions(a, b, alpha=0.05, test='chi2', method='fdr_bh', significant_only=False):
+    """
+    두 전이 모델의 상태별 다음 activity 분포 비교
+
+    Args:
+        a, b: BasedTraces counts(중첩 dict), EncodedTraces, DataFrame 또는 (matrix, vocabulary)
+        alpha: 유의수준 (보정된 q-value 기준)
+        test: 'chi2' 또는 'g' (q-value 계산에 사용할 검정)
+        method: 다중검정 보정 방법 ('fdr_bh' / 'bonferroni')
+        significant_only: True이면 유의한 상태만 반환
+
+    Returns:
+        DataFrame: state, n_a, n_b, chi2, g, dof, p_value, q_value, js, top_change, delta, significant
+                   (q_value 오름차순, js 내림차순)
+    """
+    labels_a, matrix_a = _as_counts(a)
+    labels_b, matrix_b = _as_counts(b)
+    vocabulary = list(dict.fromkeys(labels_a + labels_b))
+    matrix_a, matrix_b = _align(labels_a, matrix_a, vocabulary), _align(labels_b, matrix_b, vocabulary)
+
+    df = _frame(state_tests(matrix_a, matrix_b), vocabulary, test, alpha, method)
+    df.insert(0, 'state', vocabulary)
+    df = df[(df['n_a'] > 0) | (df['n_b'] > 0)]
+    if significant_only:
+        df = df[df['significant']]
+    return df.sort_values(['q_value', 'js'], ascending=[True, False], na_position='last').reset_index(drop=True)
+
+
+def transition_counts_by(data, by):
+    """
+    case 속성(투수, 시즌, 상대 타자 손 등) 그룹별 전이 빈도를 한 번에 집계
+
+    Args:
+        data: add_node_and_preprocess 결과 DataFrame
+        by: 그룹 컬럼 (case 첫 row의 값 사용)
+
+    Returns:
+        (labels, stack, vocabulary): 그룹 값 목록, (그룹 수, V, V) 빈도 배열, vocabulary
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    traces = EncodedTraces.from_dataframe(data, case_columns=by)
+
+    groups = traces.cases.groupby(by, sort=True, observed=True).ngroup().to_numpy()
+    labels = list(traces.cases.groupby(by, sort=True, observed=True).size().index)
+
+    n = len(traces.vocabulary)
+    src, dst, index = traces.transitions()
+    group = groups[traces.case_index()[index]].astype(np.int64)
+    flat = np.bincount((group * n + src) * n + dst, minlength=len(labels) * n * n)
+    return labels, flat.reshape(len(labels), n, n).astype(np.float64), traces.vocabulary
+
+
+def compare_many(stack, vocabulary, pairs=None, labels=None, alpha=0.05, test='chi2', method='fdr_bh',
+                 scope='pair', chunk_size=10000, significant_only=True):
+    """
+    여러 그룹 쌍을 한 번에 비교 (예: 모든 투수의 시즌 간 비교)
+
+    Args:
+        stack: (그룹 수, V, V) 빈도 배열 (transition_counts_by 결과)
+        vocabulary: activity 라벨
+        pairs: 비교할 (i, j) 그룹 번호 또는 라벨 쌍 목록 (None이면 모든 조합)
+        labels: 그룹 라벨 (pairs를 라벨로 줄 때 / 결과 표시용)
+        scope: 'pair'이면 쌍마다 보정, 'all'이면 모든 검정을 한 번에 보정
+        chunk_size: 한 번에 계산할 쌍 수 (메모리 사용량 조절)
+        significant_only: True이면 유의한 (쌍, 상태)만 반환
+
+    Returns:
+        DataFrame: a, b, state + compare_transitions의 컬럼
+    """
+    labels = list(range(len(stack))) if labels is None else list(labels)
+    if pairs is None:
+        pairs = list(combinations(range(len(stack)), 2))
+    else:
+        position = {label: i for i, label in enumerate(labels)}
+        pairs = [(position.get(i, i), position.get(j, j)) for i, j in pairs]
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    n_states = stack.shape[1]
+
+    # [1] 쌍 chunk별 (쌍, 상태, 다음 activity) 배열로 검정
+    collected = []
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        tests = state_tests(stack[chunk[:, 0]], stack[chunk[:, 1]])
+        collected.append({key: value.reshape(-1) for key, value in tests.items()})
+    tests = {key: np.concatenate([c[key] for c in collected]) for key in collected[0]} if collected else None
+    if tests is None:
+        return pd.DataFrame()
+
+    # [2] 보정 (쌍 단위 또는 전체)
+    pair_index = np.repeat(np.arange(len(pairs)), n_states)
+    df = _frame(tests, vocabulary, test, alpha, method, groups=pair_index if scope == 'pair' else None)
+
+    label_array = np.empty(len(labels), dtype=object)
+    label_array[:] = labels
+    df.insert(0, 'state', np.tile(np.asarray(vocabulary, dtype=object), len(pairs)))
+    df.insert(0, 'b', label_array[pairs[pair_index, 1]])
+    df.insert(0, 'a', label_array[pairs[pair_index, 0]])
+
+    df = df[(df['n_a'] > 0) | (df['n_b'] > 0)]
+    if significant_only:
+        df = df[df['significant']]
+    return df.sort_values(['q_value', 'js'], ascending=[True, False], na_position='last').reset_index(drop=True)
@@ -0,0 +1,192 @@
+"""
+적합도(conformance) 검사 모듈
+
+pm4py token replay / alignment는 trace마다 모델 위를 탐색하므로 시즌 전체 타석에 적용하기에는 너무 느립니다.
+이 모듈은 참조 로그에서 발견한 DFG(허용 전이 집합)를 (그룹, from, to) 정수 key의 정렬 배열로 만들고,
+검사할 모든 전이를 searchsorted 한 번으로 조회하여 타석별 지표를 계산합니다.
+
+- fitness         : 허용된 전이 비율 (1 - unseen / 전이 수)
+- unseen          : 모델에 없는 (또는 min_count / min_probability 미만) 전이 수
+- first_deviation : 처음 벗어난 event의 trace 내 위치 (start 노드 = 0, 벗어나지 않았으면 -1)
+
+by='pitcher'이면 투수별 모델을 만들어 각 타석을 그 투수의 평소 패턴과 비교합니다 (참조에 없는 투수의 타석은 모두 unseen).
+
+사용 예:
+    checker = ConformanceChecker(df_2023, by='pitcher', min_probability=0.01)
+    cases = checker.score(df_2024)           # 타석 표 (case 컬럼과 함께)
+    cases[cases['fitness'] < 0.8]
+    checker.deviations(df_2024)              # 자주 벗어나는 전이
+"""
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+from .compare import _as_counts
+from .profiling import instrumented
+
+
+class ConformanceChecker:
+    """
+    참조 로그에서 발견한 DFG 기준 적합도 검사기
+
+    Args:
+        reference: 참조 로그 (add_node_and_preprocess 결과 DataFrame / EncodedTraces)
+                   또는 BasedTraces counts(중첩 dict, by=None일 때만)
+        by: 그룹별 모델을 만들 case 컬럼 (예: 'pitcher')
+        min_count: 이 빈도 미만인 전이는 모델에서 제외
+        min_probability: 출발 상태 기준 전이확률이 이보다 작은 전이는 모델에서 제외
+    """
+
+    def __init__(self, reference, by=None, min_count=1, min_probability=0.0,
+                 case_key='case:concept:name', activity_key='concept:name'):
+        self.by = by
+        self.case_key = case_key
+        self.activity_key = activity_key
+        self.reference = reference
+        self.traces = None
+
+        # [1] 참조 전이 (그룹, from, to)
+        if isinstance(reference, dict):
+            if by is not None:
+                raise ValueError("by를 사용하려면 case 정보가 있는 DataFrame 또는 EncodedTraces를 넘겨주세요.")
+            self.vocabulary, matrix = _as_counts(reference)
+            src, dst = np.nonzero(matrix)
+            weights = matrix[src, dst]
+            group = np.zeros(len(src), dtype=np.int64)
+            self.groups = pd.Index([None])
+        else:
+            self.traces = self._encode(reference)
+            self.vocabulary = self.traces.vocabulary
+            src, dst, index = self.traces.transitions()
+            weights = None
+            if by is None:
+                self.groups = pd.Index([None])
+                group = np.zeros(len(src), dtype=np.int64)
+            else:
+                case_group, self.groups = pd.factorize(self.traces.cases[by])
+                group = case_group[self.traces.case_index()[index]]
+
+        # [2] 정렬된 key 배열 + 출발 상태 기준 확률 → 허용 전이만 남김
+        V = len(self.vocabulary)
+        keys, inverse = np.unique((group * V + src) * V + dst, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights)
+        _, row_of_key = np.unique(keys // V, return_inverse=True)
+        probability = counts / np.bincount(row_of_key, weights=counts)[row_of_key]
+
+        allowed = (counts >= min_count) & (probability >= min_probability)
+        self.keys = keys[allowed]
+        self.counts = counts[allowed]
+        self.probability = probability[allowed]
+
+    def _encode(self, data, case_columns=()):
+        if data is None:
+            if self.traces is None:
+                raise ValueError("counts로 만든 모델은 검사할 로그(data)를 넘겨주세요.")
+            # 참조 로그는 by 컬럼만 인코딩했으므로 다른 case 컬럼을 요청하면 참조 DataFrame에서 다시 인코딩
+            known = () if self.traces.cases is None else tuple(self.traces.cases.columns)
+            if not isinstance(self.reference, pd.DataFrame) or \
+                    all(c in known or c not in self.reference.columns for c in case_columns):
+                return self.traces
+            data = self.reference
+        if isinstance(data, EncodedTraces):
+            return data
+        case_columns = tuple(dict.fromkeys(c for c in ((self.by,) if self.by else ()) + tuple(case_columns)
+                                           if c in data.columns))
+        return EncodedTraces.from_dataframe(data, case_key=self.case_key, activity_key=self.activity_key,
+                                            case_columns=case_columns)
+
+    def _lookup(self, traces):
+        """
+        모든 전이의 허용 여부
+
+        Returns:
+            (found, src, dst, index, case): 전이별 허용 여부, 검사 대상 code, from event 위치, case 번호
+        """
+        V = len(self.vocabulary)
+        mapping = pd.Index(self.vocabulary).get_indexer(traces.vocabulary)  # 참조에 없는 activity는 -1
+        src, dst, index = traces.transitions()
+        case = traces.case_index()[index]
+
+        if self.by is None:
+            group = np.zeros(len(src), dtype=np.int64)
+        else:
+            group = self.groups.get_indexer(traces.cases[self.by])[case]  # 참조에 없는 그룹은 -1
+
+        s, d = mapping[src], mapping[dst]
+        valid = (group >= 0) & (s >= 0) & (d >= 0)
+        keys = (group.astype(np.int64) * V + s) * V + d
+        position = np.minimum(np.searchsorted(self.keys, keys), max(len(self.keys) - 1, 0))
+        found = valid & (self.keys[position] == keys) if len(self.keys) else np.zeros(len(keys), dtype=bool)
+        return found, src, dst, index, case
+
+    @instrumented('ConformanceChecker.score')
+    def score(self, data=None, case_columns=('pitcher', 'game_date')):
+        """
+        타석별 적합도
+
+        Args:
+            data: 검사할 로그 (DataFrame / EncodedTraces, None이면 참조 로그)
+            case_columns: 결과에 붙일 case 컬럼 (case 첫 row의 값)
+
+        Returns:
+            DataFrame: case id + case 컬럼, transitions, unseen, fitness,
+                       first_deviation, deviation_source, deviation_target
+        """
+        traces = self._encode(data, case_columns)
+        found, src, dst, index, case = self._lookup(traces)
+        n = traces.n_cases
+
+        transitions = np.bincount(case, minlength=n)
+        unseen = np.bincount(case[~found], minlength=n)
+
+        # 전이는 case 순서로 정렬되어 있으므로 case별 첫 번째 unseen 전이
+        deviated = np.flatnonzero(~found)
+        deviated_cases, first = np.unique(case[deviated], return_index=True)
+        first = deviated[first]
+
+        first_deviation = np.full(n, -1, dtype=np.int64)
+        first_deviation[deviated_cases] = traces.positions()[index[first] + 1]
+        labels = np.asarray(traces.vocabulary, dtype=object)
+        deviation_source = np.full(n, None, dtype=object)
+        deviation_target = np.full(n, None, dtype=object)
+        deviation_source[deviated_cases] = labels[src[first]]
+        deviation_target[deviated_cases] = labels[dst[first]]
+
+        df = pd.DataFrame({self.case_key: traces.case_ids})
+        if traces.cases is not None:
+            df = pd.concat([df, traces.cases.reset_index(drop=True)], axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['transitions'] = transitions
+            df['unseen'] = unseen
+            df['fitness'] = 1 - unseen / transitions
+        df['first_deviation'] = first_deviation
+        df['deviation_source'] = deviation_source
+        df['deviation_target'] = deviation_target
+        return df
+
+    def deviations(self, data=None):
+        """
+        모델에 없는 전이 집계 (by가 있으면 그룹별)
+
+        Returns:
+            DataFrame: (by), Source, Target, count (빈도 내림차순)
+        """
+        traces = self._encode(data)
+        found, src, dst, index, case = self._lookup(traces)
+        labels = np.asarray(traces.vocabulary, dtype=object)
+
+        df = pd.DataFrame({'Source': labels[src[~found]], 'Target': labels[dst[~found]]})
+        keys = ['Source', 'Target']
+        if self.by is not None:
+            df.insert(0, self.by, traces.cases[self.by].to_numpy()[case[~found]])
+            keys = [self.by] + keys
+        return (df.groupby(keys, sort=False).size().rename('count')
+                .sort_values(ascending=False, kind='stable').reset_index())
+
+    def __call__(self, data=None):
+        result = {}
+        result['cases'] = self.score(data)
+        result['deviations'] = self.deviations(data)
+        result['fitness'] = result['cases']['fitness'].mean()
+        return result
@@ -0,0 +1,249 @@
+"""
+context(볼카운트 / 매치업 / 주자 상황) 조건부 전이 빈도 모듈
+
+balls, strikes, outs_when_up, stand, p_throws, 주자 상황(bases) 등 원하는 context 컬럼 조합별
+전이(from → to) 빈도를 한 번의 벡터 연산으로 집계하여 sparse tensor(COO, context 축 CSR offset)로 보관합니다.
+
+    (context, from, to) → count       # 관측된 조합만 저장 (nnz)
+
+- slice(balls=3, strikes=2) : 특정 context의 전이 빈도 / 확률 (지정하지 않은 차원은 합산)
+- marginal(('stand',)) : 일부 차원만 남긴 tensor (원본 데이터를 다시 읽지 않음)
+"""
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+
+
+# 주자 상황 라벨 (1루 / 2루 / 3루, '-'는 빈 루)
+BASE_STATES = ('---', '1--', '-2-', '12-', '--3', '1-3', '-23', '123')
+
+
+def base_state(df_event):
+    """
+    on_1b / on_2b / on_3b로 주자 상황(8가지) 생성
+
+    Returns:
+        Categorical: BASE_STATES 중 하나
+    """
+    codes = np.zeros(len(df_event), dtype=np.int8)
+    for bit, column in enumerate(('on_1b', 'on_2b', 'on_3b')):
+        codes |= df_event[column].notna().to_numpy().astype(np.int8) << bit
+    return pd.Categorical.from_codes(codes, categories=list(BASE_STATES))
+
+
+class ContextTransitionTensor:
+    """
+    context 조건부 전이 빈도 sparse tensor
+
+    Attributes:
+        dimensions: context 차원 이름
+        categories: 차원별 값 목록 (code → 값)
+        vocabulary: activity code → 라벨
+        context, src, dst, count: (context code, from, to) 정렬된 COO 배열
+        contexts, offsets: 관측된 context code와 그 context의 COO 구간 (CSR)
+    """
+
+    def __init__(self, dimensions, categories, vocabulary, context, src, dst, count):
+        self.dimensions = tuple(dimensions)
+        self.categories = [list(c) for c in categories]
+        self.vocabulary = list(vocabulary)
+        self.shape = tuple(len(c) for c in self.categories)
+
+        order = np.lexsort((dst, src, context))
+        self.context = np.asarray(context, dtype=np.int64)[order]
+        self.src = np.asarray(src, dtype=np.int32)[order]
+        self.dst = np.asarray(dst, dtype=np.int32)[order]
+        self.count = np.asarray(count, dtype=np.int64)[order]
+
+        self.contexts, starts = np.unique(self.context, return_index=True)
+        self.offsets = np.r_[starts, len(self.context)]
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_traces(cls, traces, dimensions):
+        """
+        EncodedTraces에서 생성 (traces.events에 dimensions 컬럼 필요)
+
+        - context 값은 전이 대상 투구 직전 시점 (EncodedTraces.context_rows)
+        """
+        src, dst, index = traces.transitions()
+        row = traces.context_rows(index)
+
+        # [1] 차원별 code → mixed-radix context code
+        context = np.zeros(len(index), dtype=np.int64)
+        categories = []
+        for column in dimensions:
+            codes, uniques = pd.factorize(traces.events[column], sort=True, use_na_sentinel=False)
+            context = context * len(uniques) + codes[row]
+            categories.append(uniques.tolist())
+
+        # [2] (context, from, to) 조합별 빈도
+        n = len(traces.vocabulary)
+        if int(np.prod([len(c) for c in categories], dtype=object)) * n * n >= 2 ** 62:
+            raise ValueError("context 차원 조합이 너무 커서 int64 key로 인코딩할 수 없습니다.")
+        keys = (context * n + src) * n + dst
+        unique_keys, count = np.unique(keys, return_counts=True)
+
+        return cls(dimensions, categories, traces.vocabulary,
+                   unique_keys // (n * n), (unique_keys // n) % n, unique_keys % n, count)
+
+    @classmethod
+    def from_dataframe(cls, df_event, dimensions=('balls', 'strikes'), case_key='case:concept:name',
+                       activity_key='concept:name'):
+        """
+        add_node_and_preprocess 결과로 생성
+
+        Args:
+            dimensions: context 컬럼 ('bases'는 on_1b/on_2b/on_3b에서 자동 계산)
+        """
+        dimensions = tuple(dimensions)
+        if 'bases' in dimensions and 'bases' not in df_event.columns:
+            df_event = df_event.assign(bases=base_state(df_event))
+
+        traces = EncodedTraces.from_dataframe(df_event, case_key=case_key, activity_key=activity_key,
+                                              event_columns=dimensions)
+        return cls.from_traces(traces, dimensions)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    @property
+    def nnz(self):
+        return len(self.count)
+
+    def decode(self, context):
+        """context code 배열 → 차원별 code 배열 목록"""
+        codes = []
+        remainder = np.asarray(context)
+        for size in reversed(self.shape):
+            codes.append(remainder % size)
+            remainder = remainder // size
+        return codes[::-1]
+
+    def _value_code(self, dimension, value):
+        try:
+            return self.categories[self.dimensions.index(dimension)].index(value)
+        except ValueError:
+            return -1
+
+    def _select(self, values):
+        """context 값 조건에 맞는 COO 위치 (모든 차원이 지정되면 CSR 구간 사용)"""
+        unknown = set(values) - set(self.dimensions)
+        if unknown:
+            raise KeyError(f"context 차원이 아닙니다: {sorted(unknown)}")
+
+        if len(values) == len(self.dimensions):
+            code = 0
+            for dimension, size in zip(self.dimensions, self.shape):
+                index = self._value_code(dimension, values[dimension])
+                if index < 0:
+                    return np.array([], dtype=np.int64)
+                code = code * size + index
+            i = np.searchsorted(self.contexts, code)
+            if i == len(self.contexts) or self.contexts[i] != code:
+                return np.array([], dtype=np.int64)
+            return np.arange(self.offsets[i], self.offsets[i + 1])
+
+        mask = np.ones(self.nnz, dtype=bool)
+        for dimension, codes in zip(self.dimensions, self.decode(self.context)):
+            if dimension in values:
+                mask &= codes == self._value_code(dimension, values[dimension])
+        return np.flatnonzero(mask)
+
+    def dense(self, **values):
+        """
+        지정한 context의 (V, V) 전이 빈도 행렬 (지정하지 않은 차원은 합산)
+
+        예: tensor.dense(balls=3, strikes=2)
+        """
+        n = len(self.vocabulary)
+        selected = self._select(values)
+        flat = np.bincount(self.src[selected].astype(np.int64) * n + self.dst[selected],
+                           weights=self.count[selected], minlength=n * n)
+        return flat.reshape(n, n).astype(np.int64)
+
+    def slice(self, normalize=True, **values):
+        """
+        지정한 context의 전이 표 (ProcessEDA / sankey_visualizer와 같은 Source, Target, Variable 형식)
+
+        Args:
+            normalize: True이면 Variable = from 기준 전이확률, False이면 빈도
+        """
+        matrix = self.dense(**values)
+        src, dst = np.nonzero(matrix)
+        variable = matrix[src, dst]
+        if normalize:
+            variable = variable / matrix.sum(axis=1)[src]
+
+        return pd.DataFrame({
+            'Source': [self.vocabulary[i] for i in src],
+            'Target': [self.vocabulary[i] for i in dst],
+            'Variable': variable,
+        })
+
+    def marginal(self, keep):
+        """
+        keep 차원만 남기고 나머지 차원을 합산한 tensor
+
+        Args:
+            keep: 남길 차원 이름 (빈 tuple이면 context 없는 전체 전이 빈도)
+        """
+        keep = tuple(keep)
+        decoded = dict(zip(self.dimensions, self.decode(self.context)))
+
+        context = np.zeros(self.nnz, dtype=np.int64)
+        for dimension in keep:
+            context = context * self.shape[self.dimensions.index(dimension)] + decoded[dimension]
+
+        n = len(self.vocabulary)
+        keys = (context * n + self.src) * n + self.dst
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        count = np.bincount(inverse, weights=self.count, minlength=len(unique_keys)).astype(np.int64)
+
+        categories = [self.categories[self.dimensions.index(d)] for d in keep]
+        return ContextTransitionTensor(keep, categories, self.vocabulary,
+                                       unique_keys // (n * n), (unique_keys // n) % n, unique_keys % n, count)
+
+    def totals(self):
+        """
+        관측된 context별 전이 수
+
+        Returns:
+            DataFrame: 차원 컬럼 + transitions
+        """
+        sums = np.add.reduceat(self.count, self.offsets[:-1]) if self.nnz else np.array([], dtype=np.int64)
+        df = pd.DataFrame({
+            dimension: np.asarray(categories, dtype=object)[codes]
+            for dimension, categories, codes in zip(self.dimensions, self.categories, self.decode(self.contexts))
+        })
+        df['transitions'] = sums
+        return df
+
+    def to_frame(self, normalize=True):
+        """
+        전체 tensor를 long 형식 DataFrame으로 변환
+
+        Returns:
+            DataFrame: 차원 컬럼 + Source, Target, count (+ probability : context, Source 기준)
+        """
+        df = pd.DataFrame({
+            dimension: np.asarray(categories, dtype=object)[codes]
+            for dimension, categories, codes in zip(self.dimensions, self.categories, self.decode(self.context))
+        })
+        vocabulary = pd.Index(self.vocabulary)
+        df['Source'] = pd.Categorical.from_codes(self.src, categories=vocabulary)
+        df['Target'] = pd.Categorical.from_codes(self.dst, categories=vocabulary)
+        df['count'] = self.count
+
+        if normalize:
+            row = self.context * len(self.vocabulary) + self.src
+            _, inverse = np.unique(row, return_inverse=True)
+            df['probability'] = self.count / np.bincount(inverse, weights=self.count)[inverse]
+        return df
+
+    def __repr__(self):
+        return (f"ContextTransitionTensor(dimensions={self.dimensions}, shape={self.shape}, "
+                f"contexts={len(self.contexts)}, nnz={self.nnz})")
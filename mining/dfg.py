@@ -0,0 +1,171 @@
+"""
+Directly-Follows Graph(DFG) 모듈
+
+pm4py의 dfg_discovery.apply(event_log)로 로그를 다시 읽지 않고,
+BasedTraces가 이미 계산한 전이 빈도표(counts)로 DFG를 만들어 DOT 문자열을 직접 생성합니다.
+
+- 빈도 / 백분위수 기준 node · edge 가지치기 (큰 로그에서도 읽을 수 있는 그래프)
+- 여러 그룹(길이별 등)의 그래프는 Graphviz dot 프로세스를 동시에 실행해 이미지 / SVG 파일로 바로 저장
+
+사용 예:
+    nodes, edges = dfg_from_counts(result['counts'])
+    nodes, edges = prune_dfg(nodes, edges, edge_percentile=50)
+    render_many({'all': to_dot(nodes, edges)}, output_dir='dfg', fmt='svg')
+"""
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+
+def dfg_from_counts(counts):
+    """
+    전이 빈도표 → (node 빈도, edge 표)
+
+    Args:
+        counts: BasedTraces counts (중첩 dict: from → to → 빈도) 또는 Source, Target, Variable DataFrame
+
+    Returns:
+        (nodes, edges): Series(activity → 빈도), DataFrame(Source, Target, count)
+        node 빈도는 들어오는 / 나가는 edge 빈도 합 중 큰 값 (시작 노드는 나가는 값, 종료 노드는 들어오는 값)
+    """
+    if isinstance(counts, pd.DataFrame):
+        edges = counts[['Source', 'Target', 'Variable']].rename(columns={'Variable': 'count'})
+    else:
+        edges = pd.DataFrame([{'Source': a, 'Target': b, 'count': n}
+                              for a, to_dict in counts.items() for b, n in to_dict.items() if n > 0],
+                             columns=['Source', 'Target', 'count'])
+    edges = edges.groupby(['Source', 'Target'], sort=False, as_index=False)['count'].sum()
+
+    outgoing = edges.groupby('Source', sort=False)['count'].sum()
+    incoming = edges.groupby('Target', sort=False)['count'].sum()
+    labels = pd.unique(edges[['Source', 'Target']].values.ravel('K'))
+    nodes = pd.Series(np.maximum(outgoing.reindex(labels, fill_value=0).to_numpy(),
+                                 incoming.reindex(labels, fill_value=0).to_numpy()),
+                      index=labels, name='count')
+    return nodes, edges.reset_index(drop=True)
+
+
+def _threshold(values, minimum, percentile):
+    threshold = minimum if minimum is not None else 0
+    if percentile is not None and len(values):
+        threshold = max(threshold, np.percentile(values, percentile))
+    return threshold
+
+
+def prune_dfg(nodes, edges, min_node=None, node_percentile=None, min_edge=None, edge_percentile=None,
+              keep=('start', 'end')):
+    """
+    빈도가 낮은 node / edge 제거
+
+    [1] node 빈도가 기준보다 낮은 node와 그 node에 연결된 edge 제거 (keep은 항상 유지)
+    [2] 남은 edge 중 빈도가 기준보다 낮은 edge 제거
+    [3] edge가 하나도 남지 않은 node 제거 (keep 제외)
+
+    Args:
+        min_node / min_edge: 최소 빈도
+        node_percentile / edge_percentile: 백분위수 기준 (예: 50 → 중앙값 이상만 유지)
+    """
+    keep = set(keep)
+
+    threshold = _threshold(nodes.to_numpy(), min_node, node_percentile)
+    kept_nodes = nodes[(nodes >= threshold) | nodes.index.isin(keep)]
+    edges = edges[edges['Source'].isin(kept_nodes.index) & edges['Target'].isin(kept_nodes.index)]
+
+    threshold = _threshold(edges['count'].to_numpy(), min_edge, edge_percentile)
+    edges = edges[edges['count'] >= threshold]
+
+    connected = set(edges['Source']) | set(edges['Target']) | keep
+    return kept_nodes[kept_nodes.index.isin(connected)], edges.reset_index(drop=True)
+
+
+def _quote(text):
+    return '"' + str(text).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def to_dot(nodes, edges, title=None, rankdir='LR', node_format='{label} ({count})', edge_format='{count}'):
+    """
+    DFG → Graphviz DOT 문자열 (빈도가 클수록 진한 node, 굵은 edge)
+
+    Args:
+        node_format / edge_format: node / edge 라벨 형식 (예: 전이확률이면 edge_format='{count:.2f}')
+
+    Returns:
+        str: DOT source
+    """
+    lines = ['digraph DFG {', f'  rankdir={rankdir};', '  node [shape=box, style="rounded,filled", fontname="Arial"];',
+             '  edge [fontname="Arial", fontsize=10];']
+    if title is not None:
+        lines.append(f'  label={_quote(title)}; labelloc=t; fontsize=20;')
+
+    maximum = max(nodes.max(), 1) if len(nodes) else 1
+    for label, count in nodes.items():
+        # 빈도 비율에 따라 흰색 → 파란색
+        level = count / maximum
+        red, green = int(255 - 200 * level), int(255 - 120 * level)
+        font = 'white' if level > 0.6 else 'black'
+        lines.append(f'  {_quote(label)} [label={_quote(node_format.format(label=label, count=count))}, '
+                     f'fillcolor="#{red:02x}{green:02x}ff", fontcolor={font}];')
+
+    maximum = max(edges['count'].max(), 1) if len(edges) else 1
+    for source, target, count in zip(edges['Source'], edges['Target'], edges['count']):
+        width = 1 + 7 * count / maximum
+        label = _quote(edge_format.format(count=count))
+        lines.append(f'  {_quote(source)} -> {_quote(target)} [label={label}, penwidth={width:.2f}];')
+
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def render_dot(source, path, fmt='svg', engine='dot'):
+    """
+    DOT 문자열을 Graphviz 실행 파일로 바로 렌더링
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    executable = shutil.which(engine)
+    if executable is None:
+        raise RuntimeError(f"Graphviz 실행 파일 '{engine}'을 찾을 수 없습니다. Graphviz를 설치해 주세요.")
+    subprocess.run([executable, f'-T{fmt}', '-o', path], input=source.encode(), check=True)
+    return path
+
+
+def render_many(sources, output_dir='dfg', fmt='svg', engine='dot', n_jobs=None):
+    """
+    여러 DOT 문자열을 동시에 렌더링 (그룹마다 dot 프로세스 하나, n_jobs개까지 동시 실행)
+
+    Args:
+        sources: {이름: DOT 문자열}
+        n_jobs: 동시에 실행할 dot 프로세스 수 (None이면 CPU 수)
+
+    Returns:
+        dict: {이름: 파일 경로}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, f"{name}.{fmt}") for name in sources}
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        futures = {name: executor.submit(render_dot, source, paths[name], fmt, engine)
+                   for name, source in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def dfg_sources(count_tables, title_prefix='', **prune):
+    """
+    그룹별 전이 빈도표 → 그룹별 DOT 문자열
+
+    Args:
+        count_tables: {그룹 이름: counts (중첩 dict 또는 Source, Target, Variable DataFrame)}
+        prune: prune_dfg 인자 (min_edge, edge_percentile, ...)
+    """
+    sources = {}
+    for name, counts in count_tables.items():
+        nodes, edges = dfg_from_counts(counts)
+        if prune:
+            nodes, edges = prune_dfg(nodes, edges, **prune)
+        sources[name] = to_dot(nodes, edges, title=f"{title_prefix}{name}")
+    return sources
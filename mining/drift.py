@@ -0,0 +1,189 @@
+"""
+기간(window)별 전이 구조 변화(drift) 모듈
+
+game_date 구간마다 BasedTraces를 다시 실행하는 대신, 날짜순으로 정렬된 case × 전이 빈도 행렬에서
+window에 새로 들어온 타석은 더하고 빠져나간 타석은 빼는 방식으로 window별 전이 빈도를 갱신합니다.
+모든 타석은 한 번 더해지고 한 번 빠지므로 전체 시즌 시계열의 비용은 전체 데이터 한 번 집계와 비슷합니다.
+
+- rolling  : window='30D', step='1D'  (겹치는 구간)
+- tumbling : window='30D', step='30D' (겹치지 않는 구간)
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import entr
+
+from .traces import EncodedTraces
+from .profiling import instrumented
+
+
+def _js(p, q, axis=-1):
+    """Jensen-Shannon divergence (log2, 0 ~ 1)"""
+    return (entr((p + q) / 2).sum(axis=axis) - (entr(p).sum(axis=axis) + entr(q).sum(axis=axis)) / 2) / np.log(2)
+
+
+class TransitionDrift:
+    """
+    window별 전이 빈도 시계열과 기준(baseline) 대비 divergence
+
+    Args:
+        dataframe: add_node_and_preprocess 결과 DataFrame (또는 date_key를 cases에 가진 EncodedTraces)
+        window: window 길이 (예: '30D')
+        step: window 이동 간격 (None이면 window와 같음 = tumbling)
+        date_key: 날짜 컬럼 (case 첫 row의 값 사용)
+    """
+
+    def __init__(self, dataframe, window='30D', step=None, date_key='game_date'):
+        self.window = pd.Timedelta(window)
+        self.step = self.window if step is None else pd.Timedelta(step)
+        self.date_key = date_key
+
+        if isinstance(dataframe, EncodedTraces):
+            traces = dataframe
+        else:
+            traces = EncodedTraces.from_dataframe(dataframe, case_columns=(date_key,))
+
+        # [1] case를 날짜순으로 정렬
+        dates = pd.to_datetime(traces.cases[date_key]).to_numpy()
+        order = np.argsort(dates, kind='stable')
+        if (np.diff(order) < 0).any():
+            traces = traces.take(order)
+            dates = dates[order]
+
+        self.vocabulary = traces.vocabulary
+        self.src, self.dst, self.case_pairs = traces.case_transition_matrix()
+        self.row_starts = np.flatnonzero(np.r_[True, self.src[1:] != self.src[:-1]])
+        self.dates = dates
+
+        self.windows, self.counts = self.calculate_window_counts()
+
+    @instrumented('TransitionDrift.calculate_window_counts')
+    def calculate_window_counts(self):
+        """
+        window별 전이 빈도 (타석 단위 증분 갱신)
+
+        Returns:
+            (windows, counts): window 정보 DataFrame(start, end, cases), (window 수, 전이 쌍 수) 빈도 배열
+        """
+        n_pairs = len(self.src)
+        if len(self.dates) == 0:
+            return pd.DataFrame(columns=['start', 'end', 'cases']), np.zeros((0, n_pairs), dtype=np.int64)
+
+        day = np.timedelta64(1, 'D')
+        first = self.dates[0].astype('datetime64[D]')
+        last = self.dates[-1].astype('datetime64[D]')
+        window, step = self.window.to_timedelta64(), self.step.to_timedelta64()
+
+        # [1] window 구간 : (end - window, end] 날짜에 해당하는 case 범위 [lo, hi)
+        ends = np.arange(first + window - day, last + step, step).astype('datetime64[ns]')
+        if len(ends) == 0:
+            ends = np.array([first + window - day], dtype='datetime64[ns]')
+        starts = ends - window + day
+        lo = np.searchsorted(self.dates, starts, side='left')
+        hi = np.searchsorted(self.dates, ends + day, side='left')
+
+        indptr, indices, data = self.case_pairs.indptr, self.case_pairs.indices, self.case_pairs.data
+
+        def range_sum(a, b):
+            """case [a, b) 구간의 전이 빈도 합"""
+            if b <= a:
+                return 0
+            return np.bincount(indices[indptr[a]:indptr[b]], weights=data[indptr[a]:indptr[b]], minlength=n_pairs)
+
+        # [2] 들어온 타석은 더하고 나간 타석은 뺌 (겹치지 않으면 새로 합산)
+        counts = np.zeros((len(ends), n_pairs), dtype=np.int64)
+        current = np.zeros(n_pairs)
+        previous_lo, previous_hi = 0, 0
+        for k in range(len(ends)):
+            if lo[k] >= previous_hi:
+                current = range_sum(lo[k], hi[k]) + np.zeros(n_pairs)
+            else:
+                current = current + range_sum(previous_hi, hi[k]) - range_sum(previous_lo, lo[k])
+            counts[k] = np.rint(current)
+            previous_lo, previous_hi = lo[k], hi[k]
+
+        windows = pd.DataFrame({'start': starts, 'end': ends, 'cases': hi - lo})
+        return windows, counts
+
+    def baseline_counts(self, baseline='all'):
+        """
+        기준 전이 빈도
+
+        Args:
+            baseline: 'all'(전체 기간), 'first'(첫 window), window 번호(int) 또는 전이 쌍 빈도 배열
+        """
+        if isinstance(baseline, str):
+            if baseline == 'all':
+                return np.asarray(self.case_pairs.sum(axis=0)).ravel()
+            if baseline == 'first':
+                return self.counts[0]
+            raise ValueError(f"지원하지 않는 baseline입니다: {baseline}")
+        if np.isscalar(baseline):
+            return self.counts[int(baseline)]
+        return np.asarray(baseline)
+
+    def divergence(self, baseline='all'):
+        """
+        window별 기준 대비 divergence
+
+        - js_joint       : (from, to) 결합분포 사이의 JS divergence
+        - js_conditional : 상태(from)별 다음 activity 분포 JS divergence를 window의 상태 빈도로 가중평균
+
+        Returns:
+            DataFrame: start, end, cases, transitions, js_joint, js_conditional
+        """
+        base = self.baseline_counts(baseline).astype(np.float64)
+        counts = self.counts.astype(np.float64)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            totals = counts.sum(axis=1, keepdims=True)
+            js_joint = _js(counts / totals, base / base.sum())
+
+            # 상태별 조건부 분포 (전이 쌍이 from 기준 정렬되어 있으므로 reduceat으로 행 합)
+            state = np.repeat(np.arange(len(self.row_starts)), np.diff(np.r_[self.row_starts, len(self.src)]))
+            state_totals = np.add.reduceat(counts, self.row_starts, axis=1)
+            base_totals = np.add.reduceat(base, self.row_starts)
+            p = counts / state_totals[:, state]
+            q = base / base_totals[state]
+            mixture = (p + q) / 2
+            terms = np.nan_to_num(entr(mixture) - (entr(p) + entr(q)) / 2)
+            js_state = np.add.reduceat(terms, self.row_starts, axis=1) / np.log(2)
+            weights = state_totals / state_totals.sum(axis=1, keepdims=True)
+            js_conditional = (np.nan_to_num(weights) * js_state).sum(axis=1)
+
+        df = self.windows.copy()
+        df['transitions'] = counts.sum(axis=1).astype(np.int64)
+        df['js_joint'] = np.where(df['transitions'] > 0, js_joint, np.nan)
+        df['js_conditional'] = np.where(df['transitions'] > 0, js_conditional, np.nan)
+        return df
+
+    def transition_table(self, k, normalize=True):
+        """
+        k번째 window의 전이 표 (Source, Target, Variable)
+
+        Args:
+            normalize: True이면 from 기준 전이확률, False이면 빈도
+        """
+        counts = self.counts[k]
+        observed = np.flatnonzero(counts)
+        variable = counts[observed].astype(np.float64)
+        if normalize:
+            state_totals = np.add.reduceat(counts, self.row_starts)
+            state = np.repeat(np.arange(len(self.row_starts)), np.diff(np.r_[self.row_starts, len(self.src)]))
+            variable = variable / state_totals[state[observed]]
+
+        return pd.DataFrame({
+            'Source': [self.vocabulary[i] for i in self.src[observed]],
+            'Target': [self.vocabulary[i] for i in self.dst[observed]],
+            'Variable': variable,
+        })
+
+    def __call__(self, baseline='all'):
+        result = {}
+        result['windows'] = self.divergence(baseline)
+        result['counts'] = self.counts
+        result['pairs'] = pd.DataFrame({
+            'Source': [self.vocabulary[i] for i in self.src],
+            'Target': [self.vocabulary[i] for i in self.dst],
+        })
+        result['vocabulary'] = self.vocabulary
+        return result
@@ -0,0 +1,383 @@
+"""
+event log 파일 입출력 모듈 (XES / Parquet)
+
+pm4py의 EventLog / XES exporter는 모든 event를 Python 객체로 만든 뒤 한 번에 쓰므로 큰 로그에서 느리고 메모리를 많이 씁니다.
+이 모듈은 chunk 단위로 쓰고 읽어 메모리 사용량을 chunk 크기로 제한하고,
+읽은 결과는 Python event 객체 없이 EncodedTraces(activity code 배열 + case offset)로 바로 만듭니다.
+
+- XES     : 쓰기는 chunk별 문자열 벡터 연산 (값 escape / 형식 변환은 고유값 단위로 한 번만),
+            읽기는 lxml iterparse (처리한 trace는 바로 메모리에서 제거)
+- Parquet : case, activity(dictionary 인코딩), timestamp, 속성 컬럼을 row group 단위로 쓰고 batch 단위로 읽음
+
+파일 안의 event는 case별로 연속되어 있어야 합니다 (add_node_and_preprocess 결과 / EncodedTraces 순서).
+
+사용 예:
+    write_xes(df_added, 'log.xes', event_columns=('balls', 'strikes'), case_columns=('pitcher',))
+    traces = read_xes('log.xes', event_columns=('balls', 'strikes'), case_columns=('pitcher',))
+
+    write_parquet(chunks, 'log.parquet')                 # DataFrame chunk iterable도 가능
+    traces = read_parquet('log.parquet')
+    for df in iter_parquet_cases('log.parquet'):         # case 경계에 맞춘 DataFrame chunk
+        sketch.update(df)
+"""
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+from .profiling import instrumented
+
+
+CASE_KEY = 'case:concept:name'
+ACTIVITY_KEY = 'concept:name'
+TIMESTAMP_KEY = 'time:timestamp'
+
+XES_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<log xes.version="1.0" xes.features="nested-attributes" xmlns="http://www.xes-standard.org/">\n'
+    '<extension name="Concept" prefix="concept" uri="http://www.xes-standard.org/concept.xesext"/>\n'
+    '<extension name="Time" prefix="time" uri="http://www.xes-standard.org/time.xesext"/>\n'
+)
+
+
+# ----------------------------------------------------------------------
+# 공통
+# ----------------------------------------------------------------------
+def _frames(data, case_key=CASE_KEY, activity_key=ACTIVITY_KEY, chunk_cases=100_000):
+    """DataFrame / DataFrame iterable / EncodedTraces → event DataFrame chunk"""
+    if isinstance(data, pd.DataFrame):
+        yield data
+        return
+
+    if isinstance(data, EncodedTraces):
+        labels = np.asarray(data.vocabulary, dtype=object)
+        for start in range(0, data.n_cases, chunk_cases):
+            stop = min(start + chunk_cases, data.n_cases)
+            lo, hi = data.offsets[start], data.offsets[stop]
+            lengths = np.diff(data.offsets[start:stop + 1])
+
+            df = pd.DataFrame({case_key: np.repeat(data.case_ids[start:stop], lengths),
+                               activity_key: labels[data.codes[lo:hi]]})
+            if data.events is not None:
+                df = pd.concat([df, data.events.iloc[lo:hi].reset_index(drop=True)], axis=1)
+            if data.cases is not None:
+                for column in data.cases.columns:
+                    df[column] = np.repeat(data.cases[column].iloc[start:stop].to_numpy(), lengths)
+            yield df
+        return
+
+    yield from data
+
+
+def _case_starts(case_values, previous=None):
+    """case 값 배열에서 새 case가 시작하는 위치 (앞 chunk의 마지막 case가 이어지면 0번 위치 제외)"""
+    if len(case_values) == 0:
+        return np.array([], dtype=np.int64)
+    first = previous is None or case_values[0] != previous
+    return np.flatnonzero(np.r_[first, case_values[1:] != case_values[:-1]])
+
+
+def _check_contiguous(case_ids):
+    if len(pd.unique(case_ids)) != len(case_ids):
+        raise ValueError("같은 case의 event가 연속되어 있지 않습니다. case 기준으로 정렬한 로그를 사용해 주세요.")
+
+
+# ----------------------------------------------------------------------
+# XES
+# ----------------------------------------------------------------------
+def _xes_type(series):
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(series):
+        return 'int'
+    if pd.api.types.is_float_dtype(series):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'date'
+    return 'string'
+
+
+def _format_value(value, xes_type):
+    if xes_type == 'date':
+        return pd.Timestamp(value).isoformat()
+    if xes_type == 'boolean':
+        return 'true' if value else 'false'
+    text = str(value)
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+def _xes_attribute(series, key, xes_type=None):
+    """
+    컬럼 → event / trace별 XES 속성 문자열 배열 (결측은 빈 문자열)
+    형식 변환과 escape는 고유값 단위로 한 번만 수행
+
+    Args:
+        xes_type: 속성 형식 (None이면 dtype으로 결정, concept:name은 XES 표준상 'string')
+    """
+    xes_type = xes_type or _xes_type(series)
+    codes, uniques = pd.factorize(series)
+    key = _format_value(key, 'string')
+    formatted = np.array([f'<{xes_type} key="{key}" value="{_format_value(u, xes_type)}"/>' for u in uniques] + [''],
+                         dtype=object)
+    return formatted[codes]  # code -1(결측)은 마지막 빈 문자열
+
+
+@instrumented('write_xes')
+def write_xes(data, path, event_columns=(), case_columns=(), case_key=CASE_KEY, activity_key=ACTIVITY_KEY,
+              timestamp_key=TIMESTAMP_KEY, chunk_cases=100_000):
+    """
+    XES 파일로 저장 (chunk 단위 스트리밍)
+
+    Args:
+        data: add_node_and_preprocess 결과 DataFrame, DataFrame chunk iterable 또는 EncodedTraces
+        event_columns: event 속성으로 저장할 컬럼 (timestamp_key 컬럼이 있으면 자동 포함)
+        case_columns: trace 속성으로 저장할 컬럼 (case 첫 event의 값)
+        chunk_cases: EncodedTraces를 나누어 쓸 case 수
+
+    Returns:
+        str: 저장 경로
+    """
+    previous = None
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(XES_HEADER)
+
+        for df in _frames(data, case_key, activity_key, chunk_cases):
+            if len(df) == 0:
+                continue
+            case_values = df[case_key].to_numpy()
+            starts = _case_starts(case_values, previous)
+
+            # [1] event 문자열 : 컬럼별 속성 문자열을 이어 붙임
+            event = '<event>' + _xes_attribute(df[activity_key], ACTIVITY_KEY, 'string')
+            if timestamp_key in df.columns and timestamp_key not in event_columns:
+                event = event + _xes_attribute(df[timestamp_key], TIMESTAMP_KEY)
+            for column in event_columns:
+                event = event + _xes_attribute(df[column], column)
+            event = event + '</event>\n'
+
+            # [2] case 시작 위치에 trace 닫기 / 열기 + trace 속성
+            trace = '<trace>' + _xes_attribute(df[case_key].iloc[starts], ACTIVITY_KEY, 'string')
+            for column in case_columns:
+                trace = trace + _xes_attribute(df[column].iloc[starts], column)
+            closing = np.where((starts > 0) | (previous is not None), '</trace>\n', '')
+            event[starts] = closing + trace + '\n' + event[starts]
+
+            f.write(''.join(event.tolist()))
+            previous = case_values[-1]
+
+        if previous is not None:
+            f.write('</trace>\n')
+        f.write('</log>\n')
+    return path
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def _convert(values, xes_type):
+    """XES 문자열 값 목록 → pandas 컬럼"""
+    if xes_type == 'date':
+        return pd.to_datetime(pd.Series(values, dtype=object), format='ISO8601')
+    if xes_type in ('int', 'float'):
+        return pd.to_numeric(pd.Series(values, dtype=object))
+    if xes_type == 'boolean':
+        return pd.Series(values, dtype=object).map({'true': True, 'false': False})
+    return pd.Series(values, dtype=object)
+
+
+@instrumented('read_xes')
+def read_xes(path, event_columns=(), case_columns=(), activity_key=ACTIVITY_KEY, case_dtype=None):
+    """
+    XES 파일 → EncodedTraces (lxml iterparse, 처리한 trace는 바로 제거)
+
+    Args:
+        event_columns: events로 읽을 event 속성 key (예: 'time:timestamp', 'balls')
+        case_columns: cases로 읽을 trace 속성 key
+        case_dtype: case_ids 변환 dtype (예: 'int64', 정수 case id로 쓴 파일을 원래 dtype으로 복원)
+
+    Returns:
+        EncodedTraces: case_ids는 trace의 concept:name (XES 표준상 string이므로 case_dtype이 없으면 문자열)
+    """
+    from lxml import etree
+
+    vocabulary = {}
+    codes = array('i')
+    offsets = array('q', [0])
+    case_ids = []
+    event_values = {column: [] for column in event_columns}
+    case_values = {column: [] for column in case_columns}
+    types = {}
+
+    for _, element in etree.iterparse(path, events=('end',), tag=('{*}event', '{*}trace', 'event', 'trace')):
+        if _local(element.tag) == 'event':
+            attributes = {child.get('key'): child for child in element}
+            label = attributes[activity_key].get('value')
+            codes.append(vocabulary.setdefault(label, len(vocabulary)))
+            for column in event_columns:
+                child = attributes.get(column)
+                event_values[column].append(None if child is None else child.get('value'))
+                if child is not None:
+                    types.setdefault(('event', column), _local(child.tag))
+            element.clear()
+            continue
+
+        # trace : event가 아닌 자식이 trace 속성
+        attributes = {child.get('key'): child for child in element if _local(child.tag) != 'event'}
+        offsets.append(len(codes))
+        case_ids.append(attributes[ACTIVITY_KEY].get('value') if ACTIVITY_KEY in attributes else str(len(case_ids)))
+        for column in case_columns:
+            child = attributes.get(column)
+            case_values[column].append(None if child is None else child.get('value'))
+            if child is not None:
+                types.setdefault(('case', column), _local(child.tag))
+
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    events = pd.DataFrame({column: _convert(values, types.get(('event', column), 'string'))
+                           for column, values in event_values.items()}) if event_columns else None
+    cases = pd.DataFrame({column: _convert(values, types.get(('case', column), 'string'))
+                          for column, values in case_values.items()}) if case_columns else None
+
+    case_ids = np.asarray(case_ids, dtype=object if case_dtype is None else case_dtype)
+    return EncodedTraces(np.frombuffer(codes, dtype=np.int32), np.frombuffer(offsets, dtype=np.int64),
+                         list(vocabulary), case_ids=case_ids, events=events, cases=cases)
+
+
+# ----------------------------------------------------------------------
+# Parquet
+# ----------------------------------------------------------------------
+@instrumented('write_parquet')
+def write_parquet(data, path, event_columns=(), case_columns=(), case_key=CASE_KEY, activity_key=ACTIVITY_KEY,
+                  timestamp_key=TIMESTAMP_KEY, row_group_size=1_000_000, chunk_cases=100_000):
+    """
+    Parquet event log로 저장 (case, activity(dictionary), timestamp, 속성 컬럼 / chunk마다 row group 추가)
+
+    Args:
+        data: add_node_and_preprocess 결과 DataFrame, DataFrame chunk iterable 또는 EncodedTraces
+        event_columns, case_columns: 함께 저장할 컬럼 (case 속성은 event마다 반복 저장, dictionary 인코딩으로 압축)
+
+    Returns:
+        str: 저장 경로
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for df in _frames(data, case_key, activity_key, chunk_cases):
+            columns = [case_key, activity_key]
+            if timestamp_key in df.columns:
+                columns.append(timestamp_key)
+            columns += [c for c in list(event_columns) + list(case_columns) if c not in columns]
+
+            table = pa.Table.from_pandas(df[columns], preserve_index=False)
+            activity = table.column(activity_key)
+            if not pa.types.is_dictionary(activity.type):
+                table = table.set_column(1, activity_key, pc.dictionary_encode(activity))
+
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table, row_group_size=row_group_size)
+    finally:
+        if writer is not None:
+            writer.close()
+    return path
+
+
+def _decoded(column):
+    import pyarrow as pa
+    if pa.types.is_dictionary(column.type):
+        column = column.dictionary_decode()
+    return column.to_numpy(zero_copy_only=False)
+
+
+@instrumented('read_parquet')
+def read_parquet(path, event_columns=(), case_columns=(), case_key=CASE_KEY, activity_key=ACTIVITY_KEY,
+                 batch_size=1_000_000):
+    """
+    Parquet event log → EncodedTraces (batch 단위로 읽어 activity code / case 경계만 누적)
+
+    Args:
+        event_columns: events로 읽을 컬럼 (예: 'time:timestamp', 'balls')
+        case_columns: cases로 읽을 컬럼 (case 첫 event의 값)
+        batch_size: 한 번에 읽을 row 수
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    columns = list(dict.fromkeys([case_key, activity_key, *event_columns, *case_columns]))
+
+    vocabulary = {}
+    code_chunks, start_chunks, case_chunks, event_batches, case_batches = [], [], [], [], []
+    previous, n_events = None, 0
+
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+        # [1] batch dictionary → 전체 vocabulary code (dictionary 크기만큼만 Python 연산)
+        activity = batch.column(activity_key)
+        if not pa.types.is_dictionary(activity.type):
+            activity = pc.dictionary_encode(activity)
+        mapping = np.array([vocabulary.setdefault(str(label), len(vocabulary))
+                            for label in activity.dictionary.to_pylist()], dtype=np.int32)
+        code_chunks.append(mapping[activity.indices.to_numpy(zero_copy_only=False)])
+
+        # [2] case 경계 (batch 사이에 이어지는 case 처리)
+        case_values = _decoded(batch.column(case_key))
+        starts = _case_starts(case_values, previous)
+        start_chunks.append(starts + n_events)
+        case_chunks.append(case_values[starts])
+        if case_columns:
+            case_batches.append(batch.select(list(case_columns)).take(pa.array(starts)))
+        if event_columns:
+            event_batches.append(batch.select(list(event_columns)))
+
+        previous = case_values[-1] if len(case_values) else previous
+        n_events += len(case_values)
+
+    case_ids = np.concatenate(case_chunks) if case_chunks else np.array([])
+    _check_contiguous(case_ids)
+
+    codes = np.concatenate(code_chunks) if code_chunks else np.array([], dtype=np.int32)
+    offsets = np.r_[np.concatenate(start_chunks) if start_chunks else np.array([], dtype=np.int64), n_events]
+    events = pa.Table.from_batches(event_batches).to_pandas() if event_batches else None
+    cases = pa.Table.from_batches(case_batches).to_pandas() if case_batches else None
+
+    return EncodedTraces(codes, offsets, list(vocabulary), case_ids=case_ids, events=events, cases=cases)
+
+
+def iter_parquet_cases(path, columns=None, case_key=CASE_KEY, batch_size=1_000_000):
+    """
+    Parquet event log를 case 경계에 맞춘 DataFrame chunk로 순회 (VariantSketch.update 등 스트리밍 집계용)
+
+    - batch 끝에서 잘린 case는 다음 chunk로 넘김 → 메모리는 batch 크기 + case 하나로 제한
+
+    Args:
+        columns: 읽을 컬럼 (None이면 전체)
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    carry = None
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+        df = batch.to_pandas()
+        if carry is not None:
+            df = pd.concat([carry, df], ignore_index=True)
+        if len(df) == 0:
+            continue
+
+        case_values = df[case_key].to_numpy()
+        last_start = np.flatnonzero(np.r_[True, case_values[1:] != case_values[:-1]])[-1]
+        carry = df.iloc[last_start:]
+        if last_start > 0:
+            yield df.iloc[:last_start]
+
+    if carry is not None and len(carry):
+        yield carry
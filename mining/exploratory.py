@@ -2,8 +2,8 @@
 프로세스 마이닝 결과에 대한 EDA 모듈
 """
 
-from .visualizer import sankey_visualizer
-from .visualizer import interactive_graph
+import os
+
 from .utils import extract_stage_number
 import pandas as pd
 
@@ -107,6 +107,10 @@ class ProcessEDA:
                 self.len_layer_probs = parent._grouped_transition_faired_set(parent.calc['layer_length']['probs'])
                 
             def visualizer(self, layered=True, grouped=True):
+
+                # plotly / pyvis는 시각화할 때만 로드
+                from .visualizer import sankey_visualizer
+                from .visualizer import interactive_graph
                 
                 if layered is True:                    
                     if grouped is True:
@@ -126,51 +130,83 @@ class ProcessEDA:
                         df_vis = self.all_probs
                         interactive_graph(df_vis)
 
+            def report(self, path='report.html', layered=None, grouped=None, top_k=None, min_probability=None,
+                       fmt='html', n_jobs=None):
+                """
+                visualizer의 그룹들을 브라우저 없이 하나의 HTML 리포트(또는 그룹별 이미지)로 저장
+
+                Args:
+                    layered: True(sankey) / False(network) / None(둘 다)
+                    grouped: True(길이별) / False(전체) / None(둘 다)
+                    top_k, min_probability, fmt, n_jobs: build_report 인자
+                """
+                from .report import build_report
+
+                sections = []
+                for is_layered in ([True, False] if layered is None else [layered]):
+                    kind = 'sankey' if is_layered else 'network'
+                    prefix = 'Layered ' if is_layered else ''
+                    for is_grouped in ([False, True] if grouped is None else [grouped]):
+                        if is_grouped:
+                            groups = self.len_layer_probs if is_layered else self.len_probs
+                            sections += [(kind, f"{prefix}{length}", df_vis) for length, df_vis in groups.items()]
+                        else:
+                            sections.append((kind, f"{prefix}Whole Data", self.layer_probs if is_layered else self.all_probs))
+
+                return build_report(sections, path=path, top_k=top_k, min_probability=min_probability,
+                                    fmt=fmt, n_jobs=n_jobs)
+
 
         class _Frequency:
             def __init__(self, parent):
                 self.all_cnts = parent._transition_faired_set(parent.calc.get('counts', {}))
-                self.len_cnts = parent._grouped_transition_faired_set(parent.calc['length']['counts'])
+                # DFG는 모든 case를 세어야 하므로 variant당 한 번 센 calc['length']['counts'] 대신 그룹 trace에서 집계
+                self.len_cnts = {length: parent._transition_faired_set(self._traces_counts(traces))
+                                 for length, traces in parent.calc['length']['traces']}
 
-                self.event_log = parent.calc.get('event_log', {})
-                self.grouped_event_log = parent.calc['length'].get('event_log', {})
                 # self.layer_cnts = parent.calc['layer'].get('counts', {}),
                 # self.len_layer_cnts = parent._grouped_transition_faired_set(parent.calc['layer_length'].get('counts', {})
                 
-            def visualizer(self, layered=True, grouped=True):
-
-                from pm4py.algo.discovery.dfg import algorithm as dfg_discovery
-                from pm4py.visualization.dfg import visualizer as dfg_visualizer
-                
-
+            @staticmethod
+            def _traces_counts(traces):
+                """EncodedTraces → {from: {to: 빈도}} (case마다 집계, pm4py DFG와 같은 값)"""
+                matrix = traces.transition_counts()
+                labels = list(traces.vocabulary)
+                counts = {}
+                for src, dst in zip(*matrix.nonzero()):
+                    counts.setdefault(labels[src], {})[labels[dst]] = int(matrix[src, dst])
+                return counts
+
+            def visualizer(self, layered=True, grouped=True, output_dir='dfg', fmt='png', n_jobs=None,
+                           min_edge=None, edge_percentile=None, min_node=None, node_percentile=None):
+                """
+                전이 빈도표(counts)로 DFG를 그려 파일로 저장 (pm4py 재계산 없음, 그룹별 dot 프로세스 병렬 실행)
+
+                Args:
+                    output_dir: 이미지 저장 폴더
+                    fmt: 'png' / 'svg' 등 Graphviz 출력 형식
+                    min_edge, edge_percentile, min_node, node_percentile: prune_dfg 가지치기 기준
+
+                Returns:
+                    dict: {그룹 이름: 파일 경로}
+                """
+                from .dfg import dfg_sources
+                from .dfg import render_many
 
                 if layered is not None : 
                     print("Frequency Layered 기능은 불필요하여 개발하지 않았습니다")
-                
-                if grouped is True:
-                    for length, event_log in self.grouped_event_log:
-                        dfg = dfg_discovery.apply(event_log)
-                        parameters = {dfg_visualizer.Variants.FREQUENCY.value.Parameters.FORMAT: "png"}
-                        print(length)
-                        gviz = dfg_visualizer.apply(dfg, 
-                                                    log=event_log, 
-                                                    variant=dfg_visualizer.Variants.FREQUENCY, 
-                                                    parameters=parameters)
-
-                        dfg_visualizer.view(gviz)
-    
-                else :
-                    length = 'Whole Data'
 
-                    
-                    dfg = dfg_discovery.apply(self.event_log)
-                    parameters = {dfg_visualizer.Variants.FREQUENCY.value.Parameters.FORMAT: "png"}
-                    gviz = dfg_visualizer.apply(dfg, 
-                                                log=self.event_log, 
-                                                variant=dfg_visualizer.Variants.FREQUENCY, 
-                                                parameters=parameters)
+                prune = {key: value for key, value in dict(min_edge=min_edge, edge_percentile=edge_percentile,
+                                                           min_node=min_node, node_percentile=node_percentile).items()
+                         if value is not None}
 
-                    dfg_visualizer.view(gviz)
+                if grouped is True:
+                    count_tables = self.len_cnts
+                else :
+                    count_tables = {'Whole Data': self.all_cnts}
 
-                    
-                
\ No newline at end of file
+                sources = dfg_sources(count_tables, **prune)
+                paths = render_many(sources, output_dir=output_dir, fmt=fmt, n_jobs=n_jobs)
+                for length, path in paths.items():
+                    print(f"{length} : {os.path.abspath(path)}")
+                return paths
@@ -0,0 +1,408 @@
+"""
+컴파일된(정수 인덱스) Markov 다음 투구 확률 모델
+
+BasedTraces의 중첩 dict(문자열 key) 확률을 실시간 조회가 가능한 배열 형태로 바꾼 모델입니다.
+
+- 상태(state) = (context, 직전 k개 activity) 를 하나의 int64 key로 인코딩
+  (key = context * R^k + Σ code[t-m] * R^m, R = vocabulary 크기 + 1(padding))
+- 차수(order)별 level마다 정렬된 key 배열과 (상태 수, V) 확률 행렬을 보관
+- 관측 수가 min_count보다 적은 상태는 낮은 차수로 backoff
+  (context 유지한 채 history를 줄이고, 그다음 context 없이 history만 줄여 마지막에 전체 분포)
+- alpha > 0이면 상위 level 분포를 prior로 하는 additive smoothing
+
+order=1, context 없이 학습하면 calc_translation의 probs와 같은 값이 됩니다.
+
+사용 예:
+    model = CompiledMarkovModel(order=2, context=('balls', 'strikes', 'stand')).fit(df_added)
+    model.predict_one(['FF', 'SL'], {'balls': 1, 'strikes': 2, 'stand': 'R'})
+    model.predict_proba(histories, contexts)          # (n, V) 배열
+"""
+import json
+
+import numpy as np
+import pandas as pd
+from scipy.special import entr
+
+from .traces import EncodedTraces
+
+
+class CompiledMarkovModel:
+    """
+    k차 Markov 다음 activity 확률 모델
+
+    Args:
+        order: 참고할 직전 activity 수 (k)
+        context: 조건으로 사용할 event 컬럼 (예: ('balls', 'strikes', 'stand'))
+        alpha: smoothing 강도 (0이면 관측 빈도 그대로)
+        min_count: 이보다 관측 수가 적은 상태는 낮은 level로 backoff
+    """
+
+    def __init__(self, order=1, context=(), alpha=0.0, min_count=1):
+        self.order = order
+        self.context = tuple(context)
+        self.alpha = alpha
+        self.min_count = min_count
+
+        self.vocabulary = None
+        self.context_categories = None
+        self.start_code = None
+        self.levels = []
+        self._code = {}
+        self._context_code = []
+        self._tables = None
+
+    # ------------------------------------------------------------------
+    # 학습
+    # ------------------------------------------------------------------
+    def fit(self, data, case_key='case:concept:name', activity_key='concept:name'):
+        """
+        Args:
+            data: add_node_and_preprocess 결과 DataFrame 또는 EncodedTraces
+                  (EncodedTraces는 context 컬럼을 events에 가지고 있어야 함)
+
+        Returns:
+            self
+        """
+        if isinstance(data, EncodedTraces):
+            traces = data
+        else:
+            traces = EncodedTraces.from_dataframe(data, case_key=case_key, activity_key=activity_key,
+                                                  event_columns=self.context)
+
+        # [1] 전이 (i → i+1)
+        src, dst, index = traces.transitions()
+        positions = traces.positions()
+        pad = len(traces.vocabulary)
+
+        # [2] 차수별 history : 가장 최근 activity가 가장 낮은 자리
+        histories = [np.zeros(len(index), dtype=np.int64)]
+        for m in range(self.order):
+            past = index - m
+            code = np.where(positions[index] >= m, traces.codes[np.maximum(past, 0)], pad)
+            histories.append(histories[-1] + code.astype(np.int64) * (pad + 1) ** m)
+
+        # [3] context : 다음 event 시점의 값 (종료 노드로의 전이는 마지막 투구 시점의 값)
+        context_codes = None
+        self.context_categories = []
+        if self.context:
+            row = traces.context_rows(index)
+
+            context_codes = np.zeros(len(index), dtype=np.int64)
+            for column in self.context:
+                codes, uniques = pd.factorize(traces.events[column], use_na_sentinel=False)
+                context_codes = context_codes * len(uniques) + codes[row]
+                self.context_categories.append(uniques.tolist())
+
+        starts = traces.codes[traces.offsets[:-1]]
+        self.start_code = int(np.bincount(starts).argmax()) if len(starts) else None
+        self._compile(traces.vocabulary, histories, context_codes, dst)
+        return self
+
+    @classmethod
+    def from_transition_counts(cls, counts, alpha=0.0, min_count=1):
+        """
+        BasedTraces의 counts(중첩 dict: from → to → 빈도)를 1차 모델로 컴파일
+
+        Args:
+            counts: result['counts'] (calc_translation)
+        """
+        vocabulary = list(dict.fromkeys(
+            [label for label in counts] + [label for to_dict in counts.values() for label in to_dict]
+        ))
+        code = {label: i for i, label in enumerate(vocabulary)}
+
+        pairs = [(code[a], code[b], n) for a, to_dict in counts.items() for b, n in to_dict.items()]
+        src, dst, weights = (np.asarray(values) for values in zip(*pairs))
+
+        model = cls(order=1, alpha=alpha, min_count=min_count)
+        model.context_categories = []
+        targets = set(dst.tolist())
+        sources = [c for c in range(len(vocabulary)) if c not in targets]
+        model.start_code = sources[0] if sources else None
+        model._compile(vocabulary, [np.zeros(len(src), dtype=np.int64), src.astype(np.int64)], None, dst,
+                       weights=weights)
+        return model
+
+    def _compile(self, vocabulary, histories, context_codes, dst, weights=None):
+        """차수별 level의 key / 확률 / 관측 수 배열 생성"""
+        self.vocabulary = list(vocabulary)
+        n = len(self.vocabulary)
+        radix = n + 1
+
+        n_context = int(np.prod([len(c) for c in self.context_categories])) if self.context_categories else 1
+        if n_context * radix ** self.order >= 2 ** 62:
+            raise ValueError("order / context 조합이 너무 커서 int64 key로 인코딩할 수 없습니다.")
+
+        # [1] 낮은 level부터 : (context 없음, 0차) → ... → (context 없음, k차) → (context, 0차) → ... → (context, k차)
+        #     모르는 / 없는 context는 history만 쓰는 level로 backoff (history를 버리기 전에 context를 버림)
+        specs = [(False, j) for j in range(self.order + 1)]
+        if context_codes is not None:
+            specs += [(True, j) for j in range(self.order + 1)]
+
+        levels = []
+        by_spec = {}
+        for use_context, j in specs:
+            keys = histories[j] if not use_context else context_codes * radix ** j + histories[j]
+            unique_keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse * n + dst, weights=weights, minlength=len(unique_keys) * n)
+            counts = counts.reshape(len(unique_keys), n)
+            totals = counts.sum(axis=1)
+
+            # [2] 한 차수 아래 level 분포를 prior로 smoothing ((context, 0차)의 prior는 전체 분포)
+            parent = by_spec.get((use_context, j - 1)) if j > 0 else by_spec.get((False, 0)) if use_context else None
+            if parent is not None and self.alpha > 0:
+                parent_keys = self._parent_keys(unique_keys, use_context, j, parent, radix)
+                prior = parent['probs'][np.searchsorted(parent['keys'], parent_keys)]
+                probs = (counts + self.alpha * prior) / (totals + self.alpha)[:, None]
+            else:
+                probs = counts / np.maximum(totals, 1)[:, None]
+
+            levels.append({'context': use_context, 'order': j, 'keys': unique_keys,
+                           'probs': probs, 'totals': totals.astype(np.int64)})
+            by_spec[(use_context, j)] = levels[-1]
+
+        # 조회는 높은 level부터
+        self.levels = levels[::-1]
+        self._prepare_lookup()
+        return self
+
+    @staticmethod
+    def _parent_keys(keys, use_context, order, parent, radix):
+        if parent['context'] != use_context:
+            return np.zeros(len(keys), dtype=np.int64)
+        if not use_context:
+            return keys % radix ** parent['order']
+        context, history = keys // radix ** order, keys % radix ** order
+        return context * radix ** parent['order'] + history % radix ** parent['order']
+
+    def _prepare_lookup(self):
+        self._code = {label: i for i, label in enumerate(self.vocabulary)}
+        self._context_code = [{value: i for i, value in enumerate(categories)}
+                              for categories in self.context_categories]
+        self._tables = None
+
+    # ------------------------------------------------------------------
+    # 예측
+    # ------------------------------------------------------------------
+    def _history_codes(self, history):
+        """activity 라벨 시퀀스 → 최근 순서의 code 리스트 (order 길이, 없으면 padding / 모르는 라벨은 -1)"""
+        codes = [self._code.get(label, -1) for label in history]
+        if self.start_code is not None and (not codes or codes[0] != self.start_code):
+            codes.insert(0, self.start_code)
+        recent = codes[::-1][:self.order]
+        return recent + [len(self.vocabulary)] * (self.order - len(recent))
+
+    def _context_value(self, context):
+        """context(dict / sequence) → context code (모르는 값은 -1)"""
+        if not self.context:
+            return 0
+        if context is None:
+            return -1
+        values = [context.get(column) for column in self.context] if isinstance(context, dict) else list(context)
+
+        code = 0
+        for value, categories, lookup in zip(values, self.context_categories, self._context_code):
+            index = lookup.get(value, -1)
+            if index < 0:
+                return -1
+            code = code * len(categories) + index
+        return code
+
+    def predict_proba(self, histories, contexts=None):
+        """
+        여러 partial at-bat의 다음 activity 분포를 한 번에 계산
+
+        Args:
+            histories: activity 라벨 시퀀스 목록 (시작 노드는 생략 가능)
+            contexts: history별 context (dict / sequence 목록 또는 context 컬럼을 가진 DataFrame)
+
+        Returns:
+            ndarray: (len(histories), V) 확률 (열 순서는 self.vocabulary)
+        """
+        n = len(histories)
+        history_codes = np.array([self._history_codes(h) for h in histories], dtype=np.int64).reshape(n, self.order)
+
+        if isinstance(contexts, pd.DataFrame):
+            contexts = contexts[list(self.context)].itertuples(index=False, name=None)
+        if contexts is None:
+            contexts = [None] * n
+        context_codes = np.fromiter((self._context_value(c) for c in contexts), dtype=np.int64, count=n)
+
+        return self.predict_codes(history_codes, context_codes)
+
+    def _resolve(self, history_codes, context_codes=None):
+        """
+        행별로 사용할 level과 그 level의 상태 번호 (높은 level부터 backoff)
+
+        Returns:
+            (level_index, row): level 번호 (찾지 못하면 -1), level 안의 상태 번호
+        """
+        n = len(history_codes)
+        radix = len(self.vocabulary) + 1
+        context_codes = np.zeros(n, dtype=np.int64) if context_codes is None else np.asarray(context_codes)
+
+        level_index = np.full(n, -1, dtype=np.int64)
+        row = np.zeros(n, dtype=np.int64)
+        for i, level in enumerate(self.levels):
+            j = level['order']
+            valid = (level_index < 0) & (history_codes[:, :j] >= 0).all(axis=1)
+            keys = (history_codes[:, :j] * radix ** np.arange(j)).sum(axis=1)
+            if level['context']:
+                valid &= context_codes >= 0
+                keys = keys + context_codes * radix ** j
+
+            index = np.minimum(np.searchsorted(level['keys'], keys), len(level['keys']) - 1)
+            found = valid & (level['keys'][index] == keys)
+            if i < len(self.levels) - 1:
+                found &= level['totals'][index] >= self.min_count
+
+            level_index[found] = i
+            row[found] = index[found]
+            if (level_index >= 0).all():
+                break
+        return level_index, row
+
+    def predict_codes(self, history_codes, context_codes=None):
+        """
+        code 배열 기반 batch 예측
+
+        Args:
+            history_codes: (n, order) 최근 순서 activity code (padding = V, 모르는 값 = -1)
+            context_codes: (n,) context code (모르는 값 = -1)
+        """
+        level_index, row = self._resolve(history_codes, context_codes)
+        result = np.zeros((len(history_codes), len(self.vocabulary)))
+        for i, level in enumerate(self.levels):
+            found = level_index == i
+            result[found] = level['probs'][row[found]]
+        return result
+
+    def transition_codes(self, traces):
+        """
+        EncodedTraces의 모든 전이를 이 모델의 code로 변환 (학습에 쓰지 않은 데이터도 가능)
+
+        Returns:
+            (history_codes, context_codes, targets, index):
+                (n, order) 최근 순서 history, (n,) context code, (n,) 실제 다음 activity code
+                (모르는 라벨 / context 값은 -1), traces 안의 전이 위치
+        """
+        src, dst, index = traces.transitions()
+        mapping = np.array([self._code.get(label, -1) for label in traces.vocabulary], dtype=np.int64)
+        positions = traces.positions()
+
+        history_codes = np.empty((len(index), self.order), dtype=np.int64)
+        for m in range(self.order):
+            past = traces.codes[np.maximum(index - m, 0)]
+            history_codes[:, m] = np.where(positions[index] >= m, mapping[past], len(self.vocabulary))
+
+        context_codes = np.zeros(len(index), dtype=np.int64)
+        if self.context:
+            row = traces.context_rows(index)
+            for column, categories, lookup in zip(self.context, self.context_categories, self._context_code):
+                codes, uniques = pd.factorize(traces.events[column], use_na_sentinel=False)
+                table = np.array([lookup.get(value, -1) for value in uniques.tolist()], dtype=np.int64)
+                code = table[codes[row]]
+                context_codes = np.where((context_codes < 0) | (code < 0), -1,
+                                         context_codes * len(categories) + code)
+
+        return history_codes, context_codes, mapping[dst], index
+
+    def score_codes(self, history_codes, context_codes, targets):
+        """
+        실제 다음 activity의 확률과 예측 분포의 entropy (전체 분포 행렬을 만들지 않고 필요한 값만 조회)
+
+        Returns:
+            (probability, entropy): (n,) 실제 다음 activity 확률, (n,) 예측 분포 entropy (bit)
+            (상태를 찾지 못하거나 target을 모르면 확률 0, entropy NaN)
+        """
+        level_index, row = self._resolve(history_codes, context_codes)
+        probability = np.zeros(len(targets))
+        entropy = np.full(len(targets), np.nan)
+        for i, level in enumerate(self.levels):
+            found = level_index == i
+            known = found & (targets >= 0)
+            probability[known] = level['probs'][row[known], targets[known]]
+            entropy[found] = (entr(level['probs']).sum(axis=1) / np.log(2))[row[found]]
+        return probability, entropy
+
+    def predict_one(self, history, context=None):
+        """
+        partial at-bat 하나의 다음 activity 분포 (dict 조회, 실시간 호출용)
+
+        Returns:
+            ndarray: (V,) 확률 (열 순서는 self.vocabulary, 읽기 전용으로 사용)
+        """
+        if self._tables is None:
+            self._tables = [dict(zip(level['keys'].tolist(), range(len(level['keys'])))) for level in self.levels]
+
+        codes = self._history_codes(history)
+        context_code = self._context_value(context)
+        radix = len(self.vocabulary) + 1
+        last = len(self.levels) - 1
+
+        for i, (level, table) in enumerate(zip(self.levels, self._tables)):
+            j = level['order']
+            if min(codes[:j], default=0) < 0 or (level['context'] and context_code < 0):
+                continue
+            key = 0
+            for m in range(j - 1, -1, -1):
+                key = key * radix + codes[m]
+            if level['context']:
+                key += context_code * radix ** j
+
+            row = table.get(key)
+            if row is not None and (i == last or level['totals'][row] >= self.min_count):
+                return level['probs'][row]
+        return np.zeros(len(self.vocabulary))
+
+    def top_k(self, history, context=None, k=5):
+        """확률이 높은 다음 activity k개 [(라벨, 확률), ...]"""
+        probs = self.predict_one(history, context)
+        best = np.argsort(-probs, kind='stable')[:k]
+        return [(self.vocabulary[i], float(probs[i])) for i in best if probs[i] > 0]
+
+    def to_dict(self, probs, top=None):
+        """확률 벡터 → {라벨: 확률} (top이 주어지면 상위 top개만)"""
+        order = np.argsort(-probs, kind='stable')
+        if top is not None:
+            order = order[:top]
+        return {self.vocabulary[i]: float(probs[i]) for i in order if probs[i] > 0}
+
+    # ------------------------------------------------------------------
+    # 저장 / 로드
+    # ------------------------------------------------------------------
+    def save(self, path):
+        """npz 파일로 저장 (pickle 없이 로드 가능)"""
+        meta = {
+            'order': self.order, 'context': list(self.context), 'alpha': self.alpha, 'min_count': self.min_count,
+            'vocabulary': self.vocabulary, 'context_categories': self.context_categories,
+            'start_code': self.start_code,
+            'levels': [{'context': level['context'], 'order': level['order']} for level in self.levels],
+        }
+        arrays = {}
+        for i, level in enumerate(self.levels):
+            arrays[f'keys_{i}'] = level['keys']
+            arrays[f'probs_{i}'] = level['probs']
+            arrays[f'totals_{i}'] = level['totals']
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            model = cls(order=meta['order'], context=meta['context'], alpha=meta['alpha'],
+                        min_count=meta['min_count'])
+            model.vocabulary = meta['vocabulary']
+            model.context_categories = meta['context_categories']
+            model.start_code = meta['start_code']
+            model.levels = [
+                {**spec, 'keys': data[f'keys_{i}'], 'probs': data[f'probs_{i}'], 'totals': data[f'totals_{i}']}
+                for i, spec in enumerate(meta['levels'])
+            ]
+        model._prepare_lookup()
+        return model
+
+    def __repr__(self):
+        states = sum(len(level['keys']) for level in self.levels)
+        return (f"CompiledMarkovModel(order={self.order}, context={self.context}, "
+                f"vocabulary={len(self.vocabulary or [])}, states={states})")
@@ -0,0 +1,110 @@
+"""
+메모리 절약(lean) 모드 모듈
+
+- 로드 시점에 문자열 컬럼을 categorical로, 숫자 컬럼을 최소 dtype으로 변환
+- 파이프라인 각 단계가 사용하는 컬럼만 남김
+- 기본 모드 / lean 모드의 peak memory 비교 리포트
+"""
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+# 로드 시 categorical로 변환할 문자열 컬럼
+CATEGORICAL_COLUMNS = ('pitch_type', 'description', 'events', 'stand', 'p_throws', 'type')
+
+# 파이프라인 단계별로 필요한 원본 컬럼
+STAGE_COLUMNS = {
+    'define_at_bat_cases': ('game_date', 'batter', 'events'),
+    'add_node_and_preprocess': ('game_date', 'pitch_type', 'description', 'events', 'plate_x', 'plate_z'),
+    'one_way_filter': ('events', 'pitch_type'),
+    'metrics': ('pitcher', 'pitcher_name', 'events', 'pitch_type'),
+    'context': ('stand', 'p_throws', 'balls', 'strikes', 'outs_when_up', 'on_1b', 'on_2b', 'on_3b'),
+}
+
+# lean 모드에서 로드할 컬럼 (모든 단계 컬럼의 합집합)
+LEAN_COLUMNS = tuple(dict.fromkeys(column for columns in STAGE_COLUMNS.values() for column in columns))
+
+
+def project_columns(df, columns=LEAN_COLUMNS):
+    """df에 존재하는 columns만 남긴 DataFrame 반환 (없는 컬럼은 무시)"""
+    return df[[column for column in df.columns if column in set(columns)]]
+
+
+def optimize_dtypes(df, columns=LEAN_COLUMNS, categorical_columns=CATEGORICAL_COLUMNS):
+    """
+    컬럼 projection + categorical 변환 + 숫자 컬럼 downcast
+
+    Args:
+        df: 원본 투구 DataFrame
+        columns: 남길 컬럼 (None이면 전체 유지)
+        categorical_columns: category로 변환할 문자열 컬럼
+
+    Returns:
+        DataFrame: 메모리 사용량이 줄어든 새 DataFrame
+    """
+    df_lean = project_columns(df, columns) if columns is not None else df
+
+    converted = {}
+    for column, values in df_lean.items():
+        if column in categorical_columns:
+            converted[column] = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values.dtype):
+            converted[column] = pd.to_numeric(values, downcast='integer')
+        elif pd.api.types.is_float_dtype(values.dtype):
+            converted[column] = pd.to_numeric(values, downcast='float')
+        else:
+            converted[column] = values
+
+    return pd.DataFrame(converted, index=df_lean.index)
+
+
+def read_csv_lean(path, columns=LEAN_COLUMNS, categorical_columns=CATEGORICAL_COLUMNS, **kwargs):
+    """
+    필요한 컬럼만, 문자열 컬럼은 category로 바로 읽어오는 read_csv
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    usecols = [column for column in header if column in set(columns)] if columns is not None else None
+    dtype = {column: 'category' for column in categorical_columns if column in header}
+
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype, **kwargs)
+    return optimize_dtypes(df, columns=None, categorical_columns=categorical_columns)
+
+
+def memory_usage_mb(df):
+    """DataFrame의 실제 메모리 사용량(MB, object 문자열 포함)"""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+
+def peak_memory_report(df, **kwargs):
+    """
+    기본 모드와 lean 모드로 preprocessing_df를 실행하여 peak memory를 비교
+
+    Args:
+        df: 기준(reference) 투구 DataFrame
+        **kwargs: preprocessing_df에 전달할 인자 (start_name, end_name, case_type)
+
+    Returns:
+        DataFrame: mode별 peak_MB(tracemalloc 기준), result_MB, seconds
+    """
+    from .pipeline import preprocessing_df
+
+    rows = []
+    for lean in (False, True):
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = preprocessing_df(df, lean=lean, **kwargs)
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        rows.append({
+            'mode': 'lean' if lean else 'default',
+            'peak_MB': peak / 1024 ** 2,
+            'result_MB': memory_usage_mb(result),
+            'seconds': seconds,
+        })
+        del result
+
+    return pd.DataFrame(rows)
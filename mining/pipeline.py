@@ -11,12 +11,24 @@ from .preprocessing import define_at_bat_cases
 from .preprocessing import add_node_and_preprocess
 from .preprocessing import one_way_filter
 
-from .probability import BasedTraces
-from .exploratory import ProcessEDA
+from .memory import optimize_dtypes
+from .memory import read_csv_lean
 
 
 
-def preprocessing_df(df, start_name='start', end_name='end', case_type=None):
+def preprocessing_df(df, start_name='start', end_name='end', case_type=None, lean=False):
+    """
+    case 정의 + 시작/종료 노드 추가
+
+    Args:
+        lean: True이면 필요한 컬럼만 categorical/downcast dtype으로 한 번 복사한 뒤,
+              이후 단계는 copy-on-write 모드에서 복사 없이 진행
+    """
+    if lean:
+        df = optimize_dtypes(df)
+        with pd.option_context('mode.copy_on_write', True):
+            df_grouped = define_at_bat_cases(df, copy=False)
+            return add_node_and_preprocess(df_grouped, start_name, end_name, case_type=case_type, copy=False)
 
     # case 정의
     df_grouped = define_at_bat_cases(df)
@@ -27,7 +39,7 @@ def preprocessing_df(df, start_name='start', end_name='end', case_type=None):
     return df_added
 
 
-def one_step_EDA_from_bigquery(path="key.json", limit=None, start_name='start', end_name='end', case_type=None):
+def one_step_EDA_from_bigquery(path="key.json", limit=None, start_name='start', end_name='end', case_type=None, lean=False):
     """
     전체 분석 파이프라인 실행
     
@@ -36,17 +48,21 @@ def one_step_EDA_from_bigquery(path="key.json", limit=None, start_name='start',
         limit: 데이터 제한 (None이면 전체)
         min_prob: 전이 확률 최소 임계값
         case_type: 분석할 케이스 타입 ('out' 또는 'reach')
+        lean: 메모리 절약 모드 (categorical dtype + 필요한 컬럼만 로드)
     
     Returns:
         dict: 분석 결과
     """
     # Data Load
-    df = load_data_from_bigquery(key_path="key.json", limit=limit)
+    df = load_data_from_bigquery(key_path="key.json", limit=limit, lean=lean)
 
     # Data Preprocess
-    df_preprocess = preprocessing_df(df, start_name=start_name, end_name=end_name, case_type=case_type)
+    df_preprocess = preprocessing_df(df, start_name=start_name, end_name=end_name, case_type=case_type, lean=lean)
+
+    # Event Log 데이터를 Probability로 계산 (pm4py는 이 단계에서 로드)
+    from .probability import BasedTraces
+    from .exploratory import ProcessEDA
 
-    # Event Log 데이터를 Probability로 계산
     calc_eventlog = BasedTraces(df_preprocess) 
     final_result = calc_eventlog()
 
@@ -55,7 +71,7 @@ def one_step_EDA_from_bigquery(path="key.json", limit=None, start_name='start',
 
     return eda
     
-def one_step_EDA_from_csv(path:str, limit=None, start_name='start', end_name='end', case_type=None):
+def one_step_EDA_from_csv(path:str, limit=None, start_name='start', end_name='end', case_type=None, lean=False):
     """
     전체 분석 파이프라인 실행
     
@@ -64,17 +80,21 @@ def one_step_EDA_from_csv(path:str, limit=None, start_name='start', end_name='en
         limit: 데이터 제한 (None이면 전체)
         min_prob: 전이 확률 최소 임계값
         case_type: 분석할 케이스 타입 ('out' 또는 'reach')
+        lean: 메모리 절약 모드 (categorical dtype + 필요한 컬럼만 로드)
     
     Returns:
         dict: 분석 결과
     """
     # Data Load
-    df = pd.read_csv(path)
+    df = read_csv_lean(path) if lean else pd.read_csv(path)
 
     # Data Preprocess
-    df_preprocess = preprocessing_df(df, start_name=start_name, end_name=end_name, case_type=case_type)
+    df_preprocess = preprocessing_df(df, start_name=start_name, end_name=end_name, case_type=case_type, lean=lean)
+
+    # Event Log 데이터를 Probability로 계산 (pm4py는 이 단계에서 로드)
+    from .probability import BasedTraces
+    from .exploratory import ProcessEDA
 
-    # Event Log 데이터를 Probability로 계산
     calc_eventlog = BasedTraces(df_preprocess) 
     final_result = calc_eventlog()
 
@@ -2,15 +2,23 @@
 데이터 전처리 모듈
 """
 
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 
+from .activity import ActivityEncoder
+from .activity import ACTIVITY_SCHEMES
+from .profiling import instrumented
+
 # Helper Functions
 def deleteNullPitchType(df_event):
     """
     pitch_type이 'nan'(문자열) 또는 None인 행 제거
     """
     p_index = set(df_event[df_event['pitch_type'].isna()]['processID'])
+    if not p_index:
+        return df_event
+
     condition = ~df_event['processID'].isin(p_index)
     
     df_event = df_event[condition]
@@ -25,118 +33,225 @@ def checkNullPitchType(df_event):
 
     return df_check_null
 
-def descriptionToGroups(df_event):
+# description → 3개 범주 매핑 (매핑에 없는 description은 'result')
+DESCRIPTION_GROUPS = {
+    'called_strike': 'S', # 스트라이크
+    'swinging_strike': 'S',
+    'swinging_strike_blocked': 'S',
+    'foul_tip': 'S',
+    'foul_bunt': 'S',
+    'missed_bunt': 'S',
+    'blocked_ball': 'B',# 볼&데드볼
+    'ball': 'B',
+    'hit_by_pitch': 'B',
+    'foul': 'I', # 인플레이(In-play)&파울
+    'hit_into_play': 'I'
+}
+
+
+def descriptionToGroups(df_event, mapping=None, default='result'):
     """
         description을 3개 범주로 그룹화
         
         [그룹화 목적]
         - Process Activity를 정의 할 때, "구종+그룹화된 결과"로 사용해보려함
+
+        [계산 방식]
+        - 매핑은 description의 category 단위로 한 번만 계산하고, 행에는 code 인덱싱으로 적용
      
     """
-    mapping = {
-        'called_strike': 'S', # 스트라이크
-        'swinging_strike': 'S',
-        'swinging_strike_blocked': 'S',
-        'foul_tip': 'S',
-        'foul_bunt': 'S',
-        'missed_bunt': 'S',
-        'blocked_ball': 'B',# 볼&데드볼
-        'ball': 'B',
-        'hit_by_pitch': 'B',
-        'foul': 'I', # 인플레이(In-play)&파울
-        'hit_into_play': 'I'
-    }
-    df_event['grouped_description'] = df_event['description'].map(mapping).fillna('result')
+    mapping = DESCRIPTION_GROUPS if mapping is None else mapping
+
+    description = df_event['description']
+    if not isinstance(description.dtype, pd.CategoricalDtype):
+        description = description.astype('category')
+
+    groups = list(dict.fromkeys(list(mapping.values()) + [default]))
+    category_groups = description.cat.categories.map(lambda c: mapping.get(c, default))
+    lookup = np.append(pd.Index(groups).get_indexer(category_groups), groups.index(default))
+
+    df_event['grouped_description'] = pd.Categorical.from_codes(
+        lookup[description.cat.codes.to_numpy()], categories=groups
+    )
+    return df_event
+
+
+# 타석 최종 이벤트 → 결과 범주 매핑 (out / reach 외의 이벤트는 default 범주)
+CASE_RESULT_TAXONOMY = {
+    'strikeout': 'out',
+    'out': 'out',
+    'field_out': 'out',
+    'force_out': 'out',
+    'double_play': 'out',
+    'triple_play': 'out',
+    'strikeout_double_play': 'out',
+    'sac_fly': 'out',
+    'sac_bunt': 'out',
+    'single': 'reach',
+    'double': 'reach',
+    'triple': 'reach',
+    'home_run': 'reach',
+    'walk': 'reach',
+    'hit_by_pitch': 'reach',
+    'catcher_interf': 'reach',
+    'field_error': 'reach',
+    'fielders_choice': 'reach',
+}
+
+
+def classify_case_results(df_event, taxonomy=None, default='other'):
+    """
+    타석(processID)별 마지막 유효 이벤트를 결과 범주로 분류
+
+    [계산 방식]
+    - groupby.last()로 타석마다 마지막 non-null 이벤트를 한 번에 집계
+    - 이벤트 범주(category) 단위로 만든 lookup table을 code 인덱싱으로 적용 (행 단위 Python 호출 없음)
+
+    Args:
+        df_event: processID, events 컬럼을 가진 DataFrame
+        taxonomy: {이벤트: 결과 범주} 매핑 (None이면 CASE_RESULT_TAXONOMY)
+        default: 매핑에 없거나 이벤트가 없는 타석의 범주
+
+    Returns:
+        Series: processID를 index로 하는 categorical 결과 범주
+    """
+    taxonomy = CASE_RESULT_TAXONOMY if taxonomy is None else taxonomy
+
+    # [1] 타석별 마지막 이벤트 (NaN/None은 건너뜀)
+    last_events = df_event.groupby('processID', sort=False, observed=True)['events'].last()
+
+    # [2] 이벤트 → 결과 범주 lookup table (마지막 칸은 default, code -1이 이를 가리킴)
+    outcome_classes = list(dict.fromkeys(list(taxonomy.values()) + [default]))
+    event_codes = pd.Categorical(last_events, categories=list(taxonomy)).codes
+    lookup = np.array([outcome_classes.index(c) for c in taxonomy.values()] + [outcome_classes.index(default)],
+                      dtype=np.int8)
+
+    case_results = pd.Categorical.from_codes(lookup[event_codes], categories=outcome_classes)
+    return pd.Series(case_results, index=last_events.index, name='case_result')
+
+
+def attach_case_result(df_event, taxonomy=None, default='other'):
+    """
+    각 투구 행에 해당 타석의 최종 결과 범주(case_result)를 붙임
+
+    merge 대신 processID의 위치 인덱스로 타석 결과를 행에 직접 매핑 (DataFrame 복사 없음)
+    """
+    case_results = classify_case_results(df_event, taxonomy=taxonomy, default=default)
+
+    positions = case_results.index.get_indexer(df_event['processID'])
+    df_event['case_result'] = pd.Categorical.from_codes(
+        case_results.cat.codes.to_numpy()[positions],
+        dtype=case_results.dtype,
+    )
     return df_event
 
 
-def attach_case_result_to_pitch_type(df_event): 
+def attach_case_result_to_pitch_type(df_event, taxonomy=None, default='other'):
     """
     각 투구의 pitch_type에 해당 타석의 최종 결과(out / reach / other)를 붙임
     예: SL → SL_out, SI → SI_reach
     """
-    # case_id별 마지막 이벤트 기반으로 결과 분류
-    case_results = df_event.groupby('processID')['events'].apply(
-        lambda x: x.dropna().iloc[-1] if len(x.dropna()) > 0 else None
-    )
+    df_event = attach_case_result(df_event, taxonomy=taxonomy, default=default)
 
-    def classify_result(event):
-        if event in ['strikeout', 'out', 'field_out', 'force_out', 'double_play', 'triple_play',
-                     'strikeout_double_play', 'sac_fly', 'sac_bunt']:
-            return 'out'
-        elif event in ['single', 'double', 'triple', 'home_run', 'walk', 'hit_by_pitch',
-                       'catcher_interf', 'field_error', 'fielders_choice']:
-            return 'reach'
-        else:
-            return 'other'
+    # pitch_type + 결과 결합 (category code 연산, 행 단위 문자열 결합 없음)
+    df_event['pitch_type'] = ActivityEncoder(('pitch_type', 'case_result')).fit_transform(df_event)
 
-    case_results = case_results.apply(classify_result)
+    return df_event
 
-    # 원본 DataFrame에 결과 병합
-    df_event = df_event.merge(case_results.rename('case_result'), on='processID', how='left')
 
-    # pitch_type + 결과 결합
-    df_event['pitch_type'] = df_event['pitch_type'] + '_' + df_event['case_result']
+def _with_categories(column, names):
+    """categorical 컬럼이면 names를 category에 추가 (시작/종료 노드 라벨용)"""
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        return column
+    missing = [name for name in names if name not in column.cat.categories]
+    return column.cat.add_categories(missing) if missing else column
+
+
+def _fill_label(rows, column, label):
+    """컬럼 dtype(categorical 포함)을 유지한 채로 모든 행을 label로 채움"""
+    rows[column] = pd.Series(label, index=rows.index, dtype=rows[column].dtype)
+
+
+def add_start_end_nodes(acept_data, start_name, end_name):
+    """
+    각 케이스(processID)에 시작/종료 노드 행을 추가
+
+    - 시작 노드 : 케이스의 마지막 행을 복사, timestamp - 1초, pitchOrder = -1
+    - 종료 노드 : 케이스의 첫 번째 행을 복사, timestamp + 1초, pitchOrder = 케이스 길이
+    """
+    for column in ('concept:name', 'pitch_type'):
+        acept_data[column] = _with_categories(acept_data[column], (start_name, end_name))
+
+    grouped = acept_data.groupby('processID', sort=False)
+    case_sizes = grouped['processID'].transform('size').to_numpy()
+
+    is_first = grouped.cumcount().to_numpy() == 0
+    is_last = grouped.cumcount(ascending=False).to_numpy() == 0
+
+    # 시작 노드
+    first_rows = acept_data[is_last].copy()
+    first_rows['time:timestamp'] = first_rows['time:timestamp'] - timedelta(seconds=1)
+    first_rows['case:concept:name'] = first_rows['processID']
+    _fill_label(first_rows, 'concept:name', start_name)
+    _fill_label(first_rows, 'pitch_type', start_name)
+    first_rows['pitchOrder'] = -1  # 시작 노드는 -1로 설정
+
+    # 종료 노드
+    last_rows = acept_data[is_first].copy()
+    last_rows['time:timestamp'] = last_rows['time:timestamp'] + timedelta(seconds=1)
+    last_rows['case:concept:name'] = last_rows['processID']
+    _fill_label(last_rows, 'concept:name', end_name)
+    _fill_label(last_rows, 'pitch_type', end_name)
+    last_rows['pitchOrder'] = case_sizes[is_first]
+
+    acept_data = pd.concat([acept_data, first_rows, last_rows], ignore_index=True)
+    acept_data = acept_data.sort_values(by=['processID', 'pitchOrder'], ascending=[True, True], kind='stable')
+
+    return acept_data
 
-    return df_event
 
 # 시작 노드 끝 노드 설정하는 걸로 변경하기 (Labeling으로 도식화)
-def add_node_and_preprocess(df_event, start_name, end_name, case_type=None):
- 
+@instrumented('add_node_and_preprocess')
+def add_node_and_preprocess(df_event, start_name, end_name, case_type=None, copy=True):
+    """
+    EventLog 변환을 위한 전처리 + 시작/종료 노드 추가
+
+    Args:
+        df_event: define_at_bat_cases를 거친 DataFrame
+        start_name, end_name: 시작/종료 노드 이름
+        case_type: ACTIVITY_SCHEMES의 key (None, 'discription', 'out', 'reach', 'out+discription', ...)
+                   또는 activity를 구성할 차원 이름의 tuple (예: ('pitch_type', 'case_result', 'zone'))
+        copy: False이면 입력 DataFrame에 컬럼을 직접 추가 (lean 모드에서 복사 생략)
+
+    Returns:
+        DataFrame: concept:name(categorical), case:concept:name, time:timestamp가 추가된 DataFrame
+    """
     # [1] 행 제거(PitchType is Null)
-    df_event = df_event.copy()
     acept_data = deleteNullPitchType(df_event)
+    if copy:
+        acept_data = acept_data.copy()
     acept_data['game_date'] = pd.to_datetime(acept_data['game_date'])
 
+    dimensions = ACTIVITY_SCHEMES[case_type] if not isinstance(case_type, tuple) else case_type
+
     # [2] Description을 3개 범주로 그룹화
-    # acept_data = descriptionToGroups(acept_data)
+    if 'grouped_description' in dimensions:
+        acept_data = descriptionToGroups(acept_data)
 
     # [2.1] 출루 유무에 따라 concept:name을 설정할 경우
-    if case_type == 'reach' or case_type == 'out':
+    if case_type in ('reach', 'out', 'reach+discription', 'out+discription'):
         acept_data = attach_case_result_to_pitch_type(acept_data)
-        acept_data['concept:name'] = acept_data['pitch_type'].astype(str)
-        if case_type == 'reach+discription' or case_type == 'out+discription':
-            acept_data['concept:name'] = acept_data['pitch_type'].astype(str)+ "_" + acept_data['grouped_description'].astype(str) 
-    
+    elif 'case_result' in dimensions:
+        acept_data = attach_case_result(acept_data)
+
     # [3] pm4py용 EventLog 포맷으로 변경 (Timestamp, CaseID, Activity)
     acept_data['time:timestamp'] = acept_data['game_date'] + pd.to_timedelta(acept_data['pitchOrder'], unit='s')
     acept_data['case:concept:name'] = acept_data['processID']
-    if case_type == None:
-        acept_data['concept:name'] = acept_data['pitch_type'].astype(str)
-    elif case_type == 'discription':
-        acept_data['concept:name'] = acept_data['pitch_type'].astype(str)+ "_" + acept_data['grouped_description'].astype(str) 
+    encoder = ActivityEncoder(dimensions, reserved=(start_name, end_name))
+    acept_data['concept:name'] = encoder.fit_transform(acept_data)
 
-        
-    
     # [4] 시작/종료 노드 추가
-    start_name = start_name
-    end_name = end_name
-    add_node_list = []
-
-    for process in acept_data['processID'].unique():
-        case_df = acept_data[acept_data['processID'] == process]
-        if len(case_df) > 0:
-            # 첫 번째 행을 복사하여 "In" 노드 생성
-            first_row = case_df.iloc[-1].copy()
-            first_row['time:timestamp'] = first_row['time:timestamp'] - timedelta(seconds=1)
-            first_row['case:concept:name'] = first_row['processID']
-            first_row['concept:name'] = start_name
-            first_row['pitch_type'] = start_name
-            first_row['pitchOrder'] = -1  # 시작 노드는 -1로 설정
-        
-            last_row = case_df.iloc[0].copy()
-            last_row['time:timestamp'] = last_row['time:timestamp'] + timedelta(seconds=1)
-            last_row['case:concept:name'] = last_row['processID']
-            last_row['concept:name'] = end_name
-            last_row['pitch_type'] = end_name
-            last_row['pitchOrder'] = len(case_df)
-            
-            add_node_list.extend([first_row, last_row])
-
-    # [4] 결과 저장
-    node_df = pd.DataFrame(add_node_list)
-    acept_data = pd.concat([acept_data, node_df], ignore_index=True)
-    acept_data = acept_data.sort_values(by=['processID', 'pitchOrder'], ascending=[True, True])
+    acept_data = add_start_end_nodes(acept_data, start_name, end_name)
 
     return acept_data
 
@@ -180,34 +295,39 @@ def assign_group_index_two_pointer(df):
     return group_indices
 
 
-def define_at_bat_cases(df):
+@instrumented('define_at_bat_cases')
+def define_at_bat_cases(df, copy=True):
     """
     각 타석을 케이스로 정의 (game_date + batter)
     경기일자가 같고 같은 게임의 같은 타자 = 하나의 케이스 (하나의 프로세스)
     
     Args:
         df: 투구 데이터 DataFrame
+        copy: False이면 입력 DataFrame에 컬럼을 직접 추가 (lean 모드에서 복사 생략)
     
     Returns:
-        DataFrame: case_id가 추가된 DataFrame
+        DataFrame: processID, pitchOrder, case_lengths가 추가된 DataFrame
     """
     # 투구 순서 부여 + 케이스별로 정렬 + 그룹 인덱스 라벨링
-    df_event = df.copy()    
-    df_event['case_id'] = (df_event['game_date'].astype(str) + "_" + df_event['batter'].astype(str))
-    df_event['processID'] = assign_group_index_two_pointer(df_event)
+    df_event = df.copy() if copy else df
+
+    # (game_date, batter)가 바로 앞 행과 달라지는 지점마다 새 케이스 (assign_group_index_two_pointer와 동일한 결과)
+    # - case_id 문자열 컬럼을 만들지 않고 두 컬럼을 직접 비교
+    changed = (df_event['game_date'] != df_event['game_date'].shift()) | (df_event['batter'] != df_event['batter'].shift())
+    df_event['processID'] = changed.cumsum().to_numpy() - 1
+
     df_event['pitchOrder'] = df_event.groupby('processID').cumcount()
     df_event['case_lengths'] = df_event.groupby('processID')['events'].transform('size')
     df_event = df_event[~(df_event['case_lengths'] < 3.0)]
-    
-    del df_event['case_id']
 
     return df_event
 
 
+@instrumented('one_way_filter')
 def one_way_filter(df, colName = 'events', posCondition = ['strikeout']):
-
-    df = df.copy()
-
+    """
+    colName이 posCondition에 해당하는 타석만 남기는 필터 (입력 DataFrame은 변경하지 않으므로 복사 없음)
+    """
     # 1. 조건에 걸리는 행만 추출
     condition1 = df[colName].isin(posCondition)
     df_filtered = df[condition1]
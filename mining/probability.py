@@ -8,8 +8,13 @@ from pm4py.util import constants
 
 from pm4py.algo.filtering.log.variants.variants_filter import get_variants
 from collections import defaultdict
+from collections.abc import Sequence
+import numpy as np
 import pandas as pd
 
+from .traces import EncodedTraces
+from .profiling import instrumented
+
 
 def prepare_eventLog(df_clean):
     """
@@ -65,6 +70,7 @@ def clean_event_log(log):
     return cleaned_log
 
 
+@instrumented('create_eventlog_from_dataFrame')
 def create_eventlog_from_dataFrame(df_clean):
     """
     DataFrame을 PM4Py 이벤트 로그로 변환
@@ -88,30 +94,125 @@ def create_eventlog_from_dataFrame(df_clean):
     return event_log
 
 
+class GroupedEventLogs(Sequence):
+    """
+    길이 그룹별 pm4py EventLog 목록 [(f"length_{L}", EventLog), ...]
+
+    - grouped_preprocessing 이전과 같은 형식 (result['length']['event_log'])
+    - 처음 접근할 때 전체 EventLog를 한 번 훑어 그룹별로 나누고, 이후에는 만든 EventLog를 재사용
+    - 계산에는 쓰지 않음 (계산은 result['length']['traces']의 EncodedTraces 사용)
+
+    Args:
+        event_log: 전체 EventLog
+        groups: grouped_preprocessing 결과 [(이름, EncodedTraces), ...]
+    """
+
+    def __init__(self, event_log, groups):
+        self.event_log = event_log
+        self.groups = groups
+        self._logs = None
+
+    def _build(self):
+        group_of_case = {str(case_id): i for i, (_, traces) in enumerate(self.groups) for case_id in traces.case_ids}
+        members = [[] for _ in self.groups]
+        for trace in self.event_log:
+            i = group_of_case.get(str(trace.attributes.get('concept:name')))
+            if i is not None:
+                members[i].append(trace)
+
+        log = self.event_log
+        self._logs = [EventLog(traces, attributes=log.attributes, extensions=log.extensions,
+                               omni_present=log.omni_present, classifiers=log.classifiers, properties=log.properties)
+                      for traces in members]
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._logs is None:
+            self._build()
+        return self.groups[index][0], self._logs[index]
+
+
 class BasedTraces:
     
     def __init__(self, dataframe):
         self.dataframe = dataframe
         
         self.event_log = self.preprocessing()
-        self.grouped_event_log = self.grouped_preprocessing()
+        self.traces = EncodedTraces.from_dataframe(dataframe)
+        self.grouped_traces = self.grouped_preprocessing()
+        self.grouped_event_log = GroupedEventLogs(self.event_log, self.grouped_traces)
 
     def preprocessing(self):
         prepared_df = prepare_eventLog(self.dataframe)
         eventlog_df = create_eventlog_from_dataFrame(prepared_df)        
         return eventlog_df
 
+    @instrumented('BasedTraces.grouped_preprocessing')
     def grouped_preprocessing(self):
-        
-        grouped_df = self.dataframe.copy()
+        """
+        투구 수(len(activities) - 2)별 그룹
 
-        grouped_preprocessed_data = []
-        for i, df in grouped_df.groupby('case_lengths'):
-            prepared_df = prepare_eventLog(df)
-            eventlog_df = create_eventlog_from_dataFrame(prepared_df)                    
-            grouped_preprocessed_data.append((f"length_{i}", eventlog_df))
-        return grouped_preprocessed_data
+        - case를 길이 기준으로 한 번만 정렬하고 그룹마다 연속 구간(EncodedTraces view)으로 나눔
+        - 그룹마다 DataFrame 복사 / EventLog 변환을 하지 않음 (그룹 이름은 전이확률 표의 length_{L}과 같음)
+        - 그룹별 EventLog는 GroupedEventLogs(self.grouped_event_log)가 필요할 때 만듦
+
+        Returns:
+            list: [(f"length_{L}", EncodedTraces), ...] 길이 오름차순
+        """
+        self.length_sorted, self.lengths, self.length_bounds = self.traces.length_groups()
+        return [(f"length_{length}", self.length_sorted.slice(start, stop))
+                for length, start, stop in zip(self.lengths, self.length_bounds[:-1], self.length_bounds[1:])]
+
+    def _length_counts(self, layered=False):
+        """
+        길이 그룹별 전이 빈도 (variant마다 한 번씩 집계, 모든 그룹을 한 번의 bincount로 계산)
+
+        Args:
+            layered: True이면 중간 activity 라벨에 단계 번호를 붙임 (SL_1, FF_2 ...)
+
+        Returns:
+            dict: {length_{L}: {from: {to: 빈도}}}
+        """
+        # [1] variant 대표 case (정렬된 순서라 그룹 안에 연속) 와 그 그룹 번호
+        traces = self.length_sorted
+        first = np.unique(traces.variants()[2], return_index=True)[1]
+        variants = traces.take(first)
+        group_of_case = np.searchsorted(self.length_bounds, first, side='right') - 1
+
+        # [2] (그룹, 단계, from, to) key 하나로 segmented 집계
+        src, dst, index = variants.transitions()
+        group = group_of_case[variants.case_index()[index]]
+        position = variants.positions()[index] if layered else np.zeros(len(index), dtype=np.int64)
+        V, W = len(variants.vocabulary), int(position.max()) + 2 if len(position) else 1
+        keys, n = np.unique(((group * W + position) * V + src) * V + dst, return_counts=True)
+
+        def label(code, step, length):
+            name = variants.vocabulary[code]
+            return f"{name}_{step}" if layered and 1 <= step <= length else name
+
+        counts = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+        for key, count in zip(keys.tolist(), n.tolist()):
+            key, b = divmod(key, V)
+            key, a = divmod(key, V)
+            g, step = divmod(key, W)
+            length = int(self.lengths[g])
+            counts[f"length_{length}"][label(a, step, length)][label(b, step + 1, length)] += count
+        return counts
+
+    @staticmethod
+    def _grouped_probs(counts):
+        probs = defaultdict(lambda : defaultdict(int))
+        for length in counts.keys():
+            for from_activity, to_dict in counts[length].items():
+                total = sum(to_dict.values())
+                probs[length][from_activity] = {to_activity: count / total for to_activity, count in to_dict.items()}
+        return probs
 
+    @instrumented('BasedTraces.achieve_rawdata')
     def achieve_rawdata(self):
         """
                 Description : Eventlog의 Vriants Pattern과 Freq, Length을 저장하기 위한 함수
@@ -127,6 +228,7 @@ class BasedTraces:
         return raw_data
         
     
+    @instrumented('BasedTraces.calc_translation')
     def calc_translation(self):
         """
              Description : Eventlog에서 Length와 Layer 구분없이 빈도와 전이확률을 계산
@@ -149,30 +251,16 @@ class BasedTraces:
         return counts, probs
     
 
+    @instrumented('BasedTraces.calc_transition_same_length')
     def calc_transition_same_length(self):
         """
              Description : Eventlog에서 Length가 같은 varient pattern에 대하여 빈도와 전이확률 계산
         """
-        variants_dict = get_variants(self.event_log)
-        counts = defaultdict(lambda : defaultdict(lambda:defaultdict(int)))
-        probs = defaultdict(lambda : defaultdict(int))
-        
-        for activities, traces in variants_dict.items():
-            activity_legnth = len(activities) - 2
-            
-            for i in range(len(activities) - 1):
-                from_activity = activities[i]
-                to_activity = activities[i + 1]        
-                counts[f'length_{activity_legnth}'][from_activity][to_activity] += 1
-            
-        for length in counts.keys():                
-            for from_activity, to_dict in counts[length].items(): 
-                total = sum(to_dict.values()) 
-                probs[length][from_activity] = {to_activity: count / total for to_activity, count in to_dict.items()}
-                
-        return counts, probs
+        counts = self._length_counts(layered=False)
+        return counts, self._grouped_probs(counts)
         
         
+    @instrumented('BasedTraces.calc_transition_same_layer')
     def calc_transition_same_layer(self):
         """
              Description : Eventlog에서 Layer 별로 빈도와 전이확률 계산
@@ -199,33 +287,13 @@ class BasedTraces:
         return counts, probs
         
         
+    @instrumented('BasedTraces.calc_transition_same_layer_and_length')
     def calc_transition_same_layer_and_length(self):
         """
                  Description : Eventlog에서 Layer와 Length가 같은 varient patterns들의 빈도와 전이확률 계산
         """
-        variants_dict = get_variants(self.event_log)
-        
-        counts = defaultdict(lambda : defaultdict(lambda:defaultdict(int)))
-        probs = defaultdict(lambda : defaultdict(int))
-        
-        for activities, traces in variants_dict.items():
-            activity_length = len(activities) -2
-        
-            layered_activities = list(activities)
-            for i in range(1, len(layered_activities) - 1):
-                 layered_activities[i] = layered_activities[i] + "_" + str(i)
-                 
-            for i in range(len(layered_activities)-1):
-                from_activity = layered_activities[i]    
-                to_activity = layered_activities[i+1]
-                counts[f"length_{activity_length}"][from_activity][to_activity] += 1
-        
-        for length in counts.keys():
-            for from_activity, to_dict in counts[length].items(): 
-                total = sum(to_dict.values()) 
-                probs[length][from_activity] = {to_activity: count / total for to_activity, count in to_dict.items()}
-    
-        return counts, probs
+        counts = self._length_counts(layered=True)
+        return counts, self._grouped_probs(counts)
             
 
         
@@ -239,6 +307,7 @@ class BasedTraces:
         
         result['length'] = {}
         result['length']['event_log'] = self.grouped_event_log
+        result['length']['traces'] = self.grouped_traces
         result['length']['counts'], result['length']['probs'] = self.calc_transition_same_length()
         
         result['layer'] = {}
@@ -0,0 +1,230 @@
+"""
+파이프라인 단계 계측(instrumentation) 모듈
+
+define_at_bat_cases, add_node_and_preprocess, create_eventlog_from_dataFrame, BasedTraces.calc_*,
+ClusteredTraces.calculate_distance_matrix 등 @instrumented 단계별로
+wall time, CPU time, peak RSS 증가량, tracemalloc peak, row/case/variant 수를 기록합니다.
+
+- 기본은 비활성화 상태이며, 비활성화 시에는 전역 플래그 확인 한 번만 추가됩니다.
+- 결과는 JSON / 콘솔 표로 출력하고, add_hook으로 외부 metrics 시스템에 전달할 수 있습니다.
+
+사용 예:
+    from mining import profiling
+    with profiling.profile(trace_memory=True) as report:
+        df_added = preprocessing_df(df)
+        result = BasedTraces(df_added)()
+    print(report.table())
+    report.to_json('profile.json')
+"""
+import functools
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import pandas as pd
+
+
+class _State:
+    enabled = False
+    trace_memory = False
+    records = []
+    hooks = []
+    stack = []
+
+
+def enable(trace_memory=False):
+    """
+    계측 활성화
+
+    Args:
+        trace_memory: True이면 tracemalloc으로 Python/NumPy 할당 peak도 기록 (할당이 느려짐)
+    """
+    _State.enabled = True
+    _State.trace_memory = trace_memory
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    _State.enabled = False
+    if _State.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _State.trace_memory = False
+
+
+def is_enabled():
+    return _State.enabled
+
+
+def reset():
+    _State.records = []
+
+
+def report():
+    """profile() 밖에서 enable()로 수집된 기록"""
+    return ProfileReport(list(_State.records))
+
+
+def add_hook(func):
+    """단계 기록(dict)이 생길 때마다 호출할 함수 등록 (예: 자체 metrics 시스템 전송)"""
+    _State.hooks.append(func)
+    return func
+
+
+def remove_hook(func):
+    _State.hooks.remove(func)
+
+
+def _peak_rss_mb():
+    """프로세스 peak RSS (MB, Linux는 KB / macOS는 bytes 단위로 보고됨)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def describe_output(result):
+    """
+    단계 결과에서 row / case / variant 수 추출
+
+    - DataFrame : 행 수, case 수 (case:concept:name 또는 processID)
+    - pm4py EventLog : case 수, event 수 (variant 수는 세지 않음 : event를 다시 훑으면 상위 단계 측정값이 커짐)
+    - (counts, probs) : 전이 상태(state) 수
+    - ndarray : 첫 번째 차원 크기
+    """
+    counts = {'rows': None, 'cases': None, 'variants': None, 'states': None}
+
+    if isinstance(result, pd.DataFrame):
+        counts['rows'] = len(result)
+        for key in ('case:concept:name', 'processID'):
+            if key in result.columns:
+                counts['cases'] = int(result[key].nunique())
+                break
+    elif type(result).__name__ == 'EventLog':
+        counts['cases'] = len(result)
+        counts['rows'] = sum(len(trace) for trace in result)
+    elif isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], dict):
+        counts['states'] = len(result[0])
+    elif hasattr(result, 'shape'):
+        counts['rows'] = int(result.shape[0])
+
+    return counts
+
+
+def _measure(stage, func, args, kwargs):
+    frame = {'peak': 0}
+    _State.stack.append(frame)
+
+    tracing = _State.trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        memory_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+    rss_before = _peak_rss_mb()
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        wall = time.perf_counter() - wall_started
+        cpu = time.process_time() - cpu_started
+        _State.stack.pop()
+
+    record = {
+        'stage': stage,
+        'wall_s': wall,
+        'cpu_s': cpu,
+        'rss_peak_delta_mb': None if rss_before is None else _peak_rss_mb() - rss_before,
+        'tracemalloc_peak_mb': None,
+    }
+
+    if tracing:
+        # 하위 단계가 reset_peak를 호출했을 수 있으므로 하위 단계 peak와 비교
+        peak = max(tracemalloc.get_traced_memory()[1], frame['peak'])
+        record['tracemalloc_peak_mb'] = (peak - memory_before) / 1024 ** 2
+        if _State.stack:
+            _State.stack[-1]['peak'] = max(_State.stack[-1]['peak'], peak)
+
+    record.update(describe_output(result))
+    _State.records.append(record)
+    for hook in _State.hooks:
+        hook(record)
+
+    return result
+
+
+def instrumented(stage):
+    """
+    단계 계측 decorator (비활성화 시 원래 함수를 바로 호출)
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            return _measure(stage, func, args, kwargs)
+        return wrapper
+    return decorator
+
+
+class ProfileReport:
+    """계측 기록 모음 (JSON / 콘솔 표 출력)"""
+
+    COLUMNS = ['stage', 'wall_s', 'cpu_s', 'rss_peak_delta_mb', 'tracemalloc_peak_mb',
+               'rows', 'cases', 'variants', 'states']
+
+    def __init__(self, records=None):
+        self.records = [] if records is None else records
+
+    def to_frame(self):
+        df = pd.DataFrame(self.records, columns=self.COLUMNS)
+        return df.astype({'rows': 'Int64', 'cases': 'Int64', 'variants': 'Int64', 'states': 'Int64'})
+
+    def to_json(self, path=None, indent=2):
+        text = json.dumps(self.records, indent=indent, ensure_ascii=False)
+        if path is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
+
+    def table(self):
+        if not self.records:
+            return "(no instrumented stages recorded)"
+        df = self.to_frame().dropna(axis=1, how='all')
+        return df.to_string(index=False, float_format=lambda v: f"{v:.3f}")
+
+    def __repr__(self):
+        return self.table()
+
+
+@contextmanager
+def profile(trace_memory=False):
+    """
+    with 블록 안에서 실행된 계측 단계를 ProfileReport로 수집
+
+    Args:
+        trace_memory: tracemalloc peak 기록 여부
+    """
+    was_enabled, was_tracing = _State.enabled, _State.trace_memory
+    start = len(_State.records)
+    report = ProfileReport()
+
+    enable(trace_memory=trace_memory)
+    try:
+        yield report
+    finally:
+        report.records.extend(_State.records[start:])
+        del _State.records[start:]
+        if not was_enabled:
+            disable()
+        else:
+            if trace_memory and not was_tracing and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            _State.trace_memory = was_tracing
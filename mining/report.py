@@ -0,0 +1,208 @@
+"""
+headless 일괄 리포트 모듈
+
+interactive_graph / sankey_visualizer는 그룹마다 파일을 하나씩 쓰고 브라우저를 열며,
+pyvis의 물리 시뮬레이션으로 node 위치를 정합니다. 이 모듈은 브라우저 없이
+
+- 모든 길이 / layer 그룹을 하나의 self-contained HTML로 저장 (lib/의 vis-network JS / CSS와 plotly.js는 한 번만 포함)
+  또는 그룹별 정적 이미지로 저장 (network : Graphviz, sankey : kaleido)
+- node 위치는 단계(layer) 번호 기반의 고정 layout으로 미리 계산 (physics off, 실행마다 같은 그림)
+- 출발 상태별 상위 top_k / 최소 확률 min_probability edge 필터
+  (sankey는 전체 전이표로 흐름을 계산한 뒤 표시할 링크만 거름)
+- 그룹별 HTML 조각 / 이미지는 process pool에서 병렬 생성
+
+사용 예:
+    eda = ProcessEDA(result)
+    eda.Transition.Probability.report('report.html', top_k=3, min_probability=0.05)
+"""
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .utils import extract_stage_number
+from .profiling import instrumented
+
+
+LIB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'lib')
+KINDS = ('network', 'sankey')
+
+
+def edge_mask(df_transition, top_k=None, min_probability=None):
+    """
+    전이 표 (Source, Target, Variable) 중 남길 edge
+
+    Args:
+        top_k: 출발 상태(Source)별 확률 상위 k개 edge만 유지
+        min_probability: 이보다 작은 확률의 edge 제거
+
+    Returns:
+        ndarray: row별 bool
+    """
+    keep = np.ones(len(df_transition), dtype=bool)
+    if min_probability is not None:
+        keep &= (df_transition['Variable'] >= min_probability).to_numpy()
+    if top_k is not None:
+        rank = df_transition[keep].groupby('Source', sort=False)['Variable'].rank(method='first', ascending=False)
+        keep[np.flatnonzero(keep)[(rank > top_k).to_numpy()]] = False
+    return keep
+
+
+def filter_edges(df_transition, top_k=None, min_probability=None):
+    """전이 표 edge 필터 (edge_mask 기준)"""
+    return df_transition[edge_mask(df_transition, top_k, min_probability)].reset_index(drop=True)
+
+
+def graph_layout(labels, width=1200, height=800):
+    """
+    고정 node 위치 {라벨: (x, y)}
+
+    - layer 라벨(SL_1, FF_2 ...)이면 단계 번호별 열(column)에 배치, 열 안에서는 라벨 순서
+    - 단계 구분이 없으면 start는 왼쪽, end는 오른쪽, 나머지는 원 위에 라벨 순서로 배치
+    """
+    labels = list(labels)
+    stages = {label: extract_stage_number(label) for label in labels}
+    middle = sorted(label for label in labels if label not in ('start', 'end'))
+
+    positions = {}
+    if len({stages[label] for label in middle}) > 1:
+        columns = sorted(set(stages.values()))
+        for i, stage in enumerate(columns):
+            members = sorted(label for label in labels if stages[label] == stage)
+            x = -width / 2 + width * i / max(len(columns) - 1, 1)
+            for j, label in enumerate(members):
+                positions[label] = (x, -height / 2 + height * (j + 1) / (len(members) + 1))
+        return positions
+
+    radius = min(width, height) * 0.35
+    for j, label in enumerate(middle):
+        angle = 2 * np.pi * j / max(len(middle), 1)
+        positions[label] = (radius * np.cos(angle), radius * np.sin(angle))
+    positions['start'] = (-width / 2, 0.0)
+    positions['end'] = (width / 2, 0.0)
+    return {label: positions[label] for label in labels}
+
+
+def _network_html(df, title, element_id):
+    """vis-network (physics off, 고정 좌표) HTML 조각"""
+    labels = list(pd.unique(df[['Source', 'Target']].values.ravel('K')))
+    positions = graph_layout(labels)
+
+    nodes = [{'id': label, 'label': label, 'x': round(float(positions[label][0]), 1),
+              'y': round(float(positions[label][1]), 1), 'fixed': True,
+              'color': '#E3F2FD' if label == 'start' else '#1565C0' if label == 'end' else '#4A90E2'}
+             for label in labels]
+
+    weights = df['Variable'].to_numpy(dtype=float)
+    low, high = (weights.min(), weights.max()) if len(weights) else (0.0, 1.0)
+    widths = 1 + (weights - low) / (high - low) * 9 if high > low else np.full(len(weights), 5.0)
+    edges = [{'from': source, 'to': target, 'label': f"{value:.2f}", 'width': round(float(w), 2), 'arrows': 'to'}
+             for source, target, value, w in zip(df['Source'], df['Target'], weights, widths)]
+
+    options = {'physics': {'enabled': False}, 'nodes': {'shape': 'dot', 'size': 20, 'font': {'size': 16}},
+               'edges': {'font': {'size': 10, 'align': 'middle'}, 'smooth': {'type': 'curvedCW', 'roundness': 0.15}}}
+    return (f'<h2>{html.escape(title)}</h2>\n<div id="{element_id}" class="network"></div>\n'
+            f'<script>new vis.Network(document.getElementById("{element_id}"), '
+            f'{{nodes: new vis.DataSet({json.dumps(nodes)}), edges: new vis.DataSet({json.dumps(edges)})}}, '
+            f'{json.dumps(options)});</script>')
+
+
+def _sankey_html(df, title, element_id, filters):
+    from .visualizer import sankey_figure
+    fig = sankey_figure(df, title, **filters)
+    return f'<h2>{html.escape(title)}</h2>\n' + fig.to_html(full_html=False, include_plotlyjs=False, div_id=element_id)
+
+
+def _render_section(task):
+    """(kind, title, df, element_id, filters) → HTML 조각 (worker process에서 실행)"""
+    kind, title, df, element_id, filters = task
+    if kind == 'sankey':
+        return _sankey_html(df, title, element_id, filters)
+    return _network_html(df, title, element_id)
+
+
+def _render_image(task):
+    """(kind, title, df, path, filters) → 정적 이미지 파일 (worker process에서 실행)"""
+    kind, title, df, path, filters = task
+    if kind == 'sankey':
+        from .visualizer import sankey_figure
+        sankey_figure(df, title, **filters).write_image(path)  # kaleido 필요
+        return path
+
+    from .dfg import to_dot, render_dot
+    nodes = pd.Series(1, index=pd.unique(df[['Source', 'Target']].values.ravel('K')))
+    edges = df.rename(columns={'Variable': 'count'})
+    return render_dot(to_dot(nodes, edges, title=title, node_format='{label}', edge_format='{count:.2f}'),
+                      path, fmt=os.path.splitext(path)[1][1:])
+
+
+def _map(function, tasks, n_jobs):
+    if n_jobs == 1 or len(tasks) <= 1:
+        return [function(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(function, tasks))
+
+
+def _read_lib(*parts):
+    with open(os.path.join(LIB_DIR, *parts), encoding='utf-8') as f:
+        return f.read()
+
+
+@instrumented('build_report')
+def build_report(sections, path='report.html', title='Process Mining Report', top_k=None, min_probability=None,
+                 fmt='html', n_jobs=None):
+    """
+    여러 그룹의 전이 그래프를 하나의 HTML 리포트(또는 그룹별 이미지)로 저장 (브라우저를 열지 않음)
+
+    Args:
+        sections: [(kind, 제목, 전이 표 DataFrame), ...]  kind는 'network' 또는 'sankey'
+        path: HTML 파일 경로 (fmt가 'png' / 'svg'이면 이미지를 저장할 폴더)
+        top_k, min_probability: edge 필터 기준
+                                (network는 표를 거르고, sankey는 전체 표로 흐름을 계산한 뒤 링크만 거름)
+        fmt: 'html' / 'png' / 'svg'
+        n_jobs: worker process 수 (1이면 현재 process에서 순서대로, None이면 CPU 수)
+
+    Returns:
+        str 또는 dict: HTML 파일 경로, 이미지면 {제목: 파일 경로}
+    """
+    for kind, *_ in sections:
+        if kind not in KINDS:
+            raise ValueError(f"kind는 {KINDS} 중 하나여야 합니다: {kind}")
+    # sankey 흐름(edge_flows)은 행 정규화된 전체 전이표가 필요하므로 network만 미리 거름
+    filters = dict(top_k=top_k, min_probability=min_probability)
+    sections = [(kind, name, filter_edges(df, **filters) if kind == 'network' else df)
+                for kind, name, df in sections]
+
+    # [1] 정적 이미지 : 그룹별 파일
+    if fmt != 'html':
+        os.makedirs(path, exist_ok=True)
+        tasks = [(kind, name, df, os.path.join(path, f"{kind}_{name}.{fmt}"), filters)
+                 for kind, name, df in sections]
+        return dict(zip([name for _, name, _ in sections], _map(_render_image, tasks, n_jobs)))
+
+    # [2] HTML 조각 병렬 생성
+    tasks = [(kind, name, df, f"section-{i}", filters) for i, (kind, name, df) in enumerate(sections)]
+    fragments = _map(_render_section, tasks, n_jobs)
+
+    # [3] 공유 JS / CSS는 한 번만 포함
+    head = ['<meta charset="utf-8">', f'<title>{html.escape(title)}</title>',
+            '<style>body{font-family:Arial,sans-serif;margin:24px} .network{width:100%;height:800px;'
+            'border:1px solid #ddd} nav a{margin-right:12px}</style>']
+    if any(kind == 'network' for kind, *_ in sections):
+        head.append(f"<style>{_read_lib('vis-9.1.2', 'vis-network.css')}</style>")
+        head.append(f"<script>{_read_lib('vis-9.1.2', 'vis-network.min.js')}</script>")
+    if any(kind == 'sankey' for kind, *_ in sections):
+        from plotly.offline import get_plotlyjs
+        head.append(f"<script>{get_plotlyjs()}</script>")
+
+    nav = ' '.join(f'<a href="#{element_id}">{html.escape(name)}</a>' for _, name, _, element_id, _ in tasks)
+    body = '\n<hr>\n'.join(fragments)
+    document = (f"<!DOCTYPE html>\n<html>\n<head>\n{chr(10).join(head)}\n</head>\n<body>\n"
+                f"<h1>{html.escape(title)}</h1>\n<nav>{nav}</nav>\n{body}\n</body>\n</html>\n")
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return path
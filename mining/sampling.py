@@ -0,0 +1,318 @@
+"""
+표본 기반 근사 분석 모듈
+
+리그 전체 데이터로 BasedTraces / ClusteredTraces를 모두 돌리면 탐색 중 기다리는 시간이 깁니다.
+이 모듈은 로드하면서 (투수, 길이, 결과) 층별로 타석을 표본 추출하고, 전이확률 / variant 빈도를 신뢰구간과 함께 추정합니다.
+
+- 타석마다 case id hash로 고정된 난수 u를 부여 (seed별로 재현 가능)
+- 층 h에서 u < rate 이거나 u가 층 안에서 가장 작은 min_per_stratum개에 드는 타석을 표본에 포함
+  (chunk마다 층별 bottom-k reservoir를 갱신, 표본 밖 타석의 event는 보관하지 않음)
+- rate를 키우면 이전 표본을 포함하는 더 큰 표본이 되므로 refine은 목표 정밀도까지 표본을 점진적으로 늘림
+- 추정은 층별 가중치 N_h / n_h, 분산은 층화 표본 공식 (유한 모집단 보정 포함, 전이확률은 비율 추정량의 선형화)
+
+사용 예:
+    sample = StratifiedSample(df_added, rate=0.02)
+    sample.transition_probabilities()        # Source, Target, Variable, lower, upper ...
+    sample.variant_frequencies().head()
+    sample.refine(target=0.01)               # 최대 신뢰구간 반폭이 0.01 이하가 될 때까지 표본 확대
+    BasedTraces(sample.events)               # 표본 event DataFrame으로 기존 분석도 가능
+
+    # 여러 파일 / chunk로 나뉜 로그 : chunk iterable을 만드는 함수를 넘김 (refine 시 다시 읽음)
+    sample = StratifiedSample(lambda: iter_parquet_cases('league.parquet'), rate=0.01)
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.stats import norm
+
+from .traces import EncodedTraces
+from .sketch import label_hashes
+from .profiling import instrumented
+
+
+LENGTH = 'length'
+
+
+def _uniform(case_values, seed):
+    """case id → [0, 1) 고정 난수 (splitmix64, 정수가 아닌 id는 blake2b hash 후 섞음)"""
+    codes, uniques = pd.factorize(case_values)
+    if pd.api.types.is_integer_dtype(uniques.dtype):
+        keys = np.asarray(uniques).astype(np.uint64)
+    else:
+        keys = label_hashes(uniques)
+
+    x = keys + np.uint64((0x9E3779B97F4A7C15 * (seed + 1)) & 0xFFFFFFFFFFFFFFFF)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    x = x ^ (x >> np.uint64(31))
+    return ((x >> np.uint64(11)).astype(np.float64) / float(1 << 53))[codes]
+
+
+def _bottom(stratum, u, k):
+    """층 안에서 u가 가장 작은 k개 여부 (boolean mask)"""
+    order = np.lexsort((u, stratum))
+    sorted_stratum = stratum[order]
+    starts = np.flatnonzero(np.r_[True, sorted_stratum[1:] != sorted_stratum[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    mask = np.zeros(len(order), dtype=bool)
+    mask[order] = rank < k
+    return mask
+
+
+class StratifiedSample:
+    """
+    층화 타석 표본
+
+    Args:
+        source: add_node_and_preprocess 결과 DataFrame 또는 case 경계에 맞춘 DataFrame chunk iterable을 돌려주는 함수
+        strata: 층 컬럼 (case 첫 row의 값, 'length'는 투구 수 = trace 길이 - 2)
+        rate: 층별 포함 비율
+        min_per_stratum: 층마다 최소 표본 타석 수 (작은 층도 추정할 수 있도록)
+        columns: 표본 event에 함께 보관할 컬럼
+        seed: 난수 seed
+    """
+
+    def __init__(self, source, strata=('pitcher', LENGTH, 'events'), rate=0.05, min_per_stratum=5,
+                 columns=(), seed=0, case_key='case:concept:name', activity_key='concept:name'):
+        if not strata:
+            raise ValueError("strata에 층 컬럼을 하나 이상 지정해 주세요.")
+        self.source = source
+        self.strata = tuple(strata)
+        self.rate = rate
+        self.min_per_stratum = min_per_stratum
+        self.columns = tuple(columns)
+        self.seed = seed
+        self.case_key = case_key
+        self.activity_key = activity_key
+        self.history = []
+        self.load()
+
+    # ------------------------------------------------------------------
+    # 표본 추출
+    # ------------------------------------------------------------------
+    def _chunks(self):
+        if isinstance(self.source, pd.DataFrame):
+            return [self.source]
+        return self.source()
+
+    def _case_strata(self, df):
+        """chunk의 case별 (case id, 층 값 tuple, u)"""
+        case_values = df[self.case_key].to_numpy()
+        codes, case_ids = pd.factorize(case_values)
+        first = np.unique(codes, return_index=True)[1]
+        lengths = np.bincount(codes) - 2
+
+        values = [lengths if column == LENGTH else df[column].to_numpy()[first] for column in self.strata]
+        keys = pd.MultiIndex.from_arrays(values)
+        return np.asarray(case_ids), keys, _uniform(case_ids, self.seed)
+
+    @instrumented('StratifiedSample.load')
+    def load(self):
+        """source를 한 번 읽어 현재 rate 기준 표본 구성 (모든 타석의 층별 수 N_h도 집계)"""
+        stratum_of = {}
+        population = np.zeros(0)
+        kept = pd.DataFrame()
+        kept_ids, kept_stratum, kept_u = None, np.array([], dtype=np.int64), np.array([])
+        keep_columns = None
+
+        for df in self._chunks():
+            if len(df) == 0:
+                continue
+            if keep_columns is None:
+                keep_columns = list(dict.fromkeys(
+                    [self.case_key, self.activity_key] + [c for c in self.strata + self.columns
+                                                          if c != LENGTH and c in df.columns]))
+
+            # [1] 층 번호 (chunk 사이에서 공유)
+            case_ids, keys, u = self._case_strata(df)
+            key_codes, unique_keys = pd.factorize(keys)
+            mapping = np.array([stratum_of.setdefault(key, len(stratum_of)) for key in unique_keys], dtype=np.int64)
+            stratum = mapping[key_codes]
+            population = np.r_[population, np.zeros(len(stratum_of) - len(population))] + \
+                np.bincount(stratum, minlength=len(stratum_of))
+
+            # [2] 후보 : u < rate 또는 chunk 안 bottom-k → 기존 표본과 합쳐 다시 bottom-k
+            candidate = (u < self.rate) | _bottom(stratum, u, self.min_per_stratum)
+            ids = case_ids[candidate] if kept_ids is None else np.r_[kept_ids, case_ids[candidate]]
+            strata = np.r_[kept_stratum, stratum[candidate]]
+            us = np.r_[kept_u, u[candidate]]
+            keep = (us < self.rate) | _bottom(strata, us, self.min_per_stratum)
+
+            rows = df.loc[df[self.case_key].isin(case_ids[candidate]), keep_columns]
+            kept = pd.concat([kept, rows], ignore_index=True) if len(kept) else rows.reset_index(drop=True)
+            if not keep.all():
+                kept = kept[kept[self.case_key].isin(ids[keep])].reset_index(drop=True)
+            kept_ids, kept_stratum, kept_u = ids[keep], strata[keep], us[keep]
+
+        n_strata = len(stratum_of)
+        self.population = population
+        self.stratum_labels = list(stratum_of)
+
+        # [3] 표본 trace와 case별 층 / 가중치
+        self.events = kept
+        self.traces = EncodedTraces.from_dataframe(kept, case_key=self.case_key, activity_key=self.activity_key) \
+            if len(kept) else EncodedTraces(np.array([], dtype=np.int32), [0], [])
+        position = pd.Index(kept_ids if kept_ids is not None else []).get_indexer(self.traces.case_ids)
+        self.case_stratum = kept_stratum[position]
+        self.sample_size = np.bincount(self.case_stratum, minlength=n_strata).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.weights = (self.population / self.sample_size)[self.case_stratum]
+        return self
+
+    # ------------------------------------------------------------------
+    # 추정
+    # ------------------------------------------------------------------
+    def _variance_factor(self):
+        """층별 N_h² (1 - n_h / N_h) / (n_h (n_h - 1)) (n_h < 2이면 0)"""
+        N, n = self.population, self.sample_size
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factor = N ** 2 * (1 - n / N) / (n * (n - 1))
+        return np.where(n >= 2, factor, 0.0)
+
+    def _stratum_matrix(self):
+        """(층 수, 표본 case 수) 층 indicator sparse 행렬"""
+        n_cases = len(self.case_stratum)
+        return sparse.csr_matrix((np.ones(n_cases), (self.case_stratum, np.arange(n_cases))),
+                                 shape=(len(self.population), n_cases))
+
+    @instrumented('StratifiedSample.transition_probabilities')
+    def transition_probabilities(self, level=0.95):
+        """
+        전이확률 추정 (비율 추정량 Ŷ_ab / X̂_a, 선형화 분산)
+
+        Returns:
+            DataFrame: Source, Target, count(표본 전이 수), support(표본에서 Source의 전이 수),
+                       estimated(모집단 전이 수 추정), Variable, std, lower, upper
+        """
+        traces = self.traces
+        src, dst, Y = traces.case_transition_matrix()
+
+        # [1] case별 Source 상태 전이 수를 전이 쌍 열에 맞춤 (전이 쌍 × Source indicator로 합산 후 다시 펼침)
+        sources, source_of_pair = np.unique(src, return_inverse=True)
+        pair_source = sparse.csr_matrix((np.ones(len(src)), (np.arange(len(src)), source_of_pair)),
+                                        shape=(len(src), len(sources)))
+        X = (Y @ pair_source).tocsc()[:, source_of_pair].tocsr()
+
+        w = self.weights
+        Y_total, X_total = Y.T @ w, X.T @ w
+        p = Y_total / X_total
+
+        # [2] 선형화 변수 z = (y - p x) / X̂ 의 층별 분산
+        Z = (Y - X.multiply(p[None, :])).multiply(1 / X_total[None, :]).tocsr()
+        S = self._stratum_matrix()
+        sum_z = S @ Z
+        sum_z2 = S @ Z.multiply(Z)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            inverse_n = np.where(self.sample_size > 0, 1 / self.sample_size, 0.0)
+        within = sum_z2 - sparse.diags(inverse_n) @ sum_z.multiply(sum_z)
+        variance = np.maximum(np.asarray(within.T @ self._variance_factor()).ravel(), 0)
+
+        z = norm.ppf(0.5 + level / 2)
+        std = np.sqrt(variance)
+        return pd.DataFrame({
+            'Source': [traces.vocabulary[i] for i in src],
+            'Target': [traces.vocabulary[i] for i in dst],
+            'count': np.asarray(Y.sum(axis=0)).ravel().astype(np.int64),
+            'support': np.asarray(X.sum(axis=0)).ravel().astype(np.int64),
+            'estimated': Y_total,
+            'Variable': p,
+            'std': std,
+            'lower': np.clip(p - z * std, 0, 1),
+            'upper': np.clip(p + z * std, 0, 1),
+        })
+
+    @instrumented('StratifiedSample.variant_frequencies')
+    def variant_frequencies(self, level=0.95):
+        """
+        variant 비율 추정 (층화 비율 추정량)
+
+        Returns:
+            DataFrame: variant, length, count(표본 case 수), estimated(모집단 case 수 추정), share, std, lower, upper
+                       (share 내림차순)
+        """
+        matrix, counts, inverse = self.traces.variants()
+        N = self.population.sum()
+
+        # 층 × variant 표본 수 (0인 칸은 분산 기여가 0이므로 관측된 칸만 계산)
+        n_variants = len(counts)
+        keys, cell = np.unique(self.case_stratum * n_variants + inverse, return_counts=True)
+        h, v = keys // n_variants, keys % n_variants
+        p_hv = cell / self.sample_size[h]
+
+        share = np.bincount(v, weights=self.population[h] * p_hv, minlength=n_variants) / N
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factor = np.where(self.sample_size[h] >= 2, self._variance_factor()[h] * self.sample_size[h] / N ** 2, 0.0)
+        variance = np.bincount(v, weights=factor * p_hv * (1 - p_hv), minlength=n_variants)
+
+        z = norm.ppf(0.5 + level / 2)
+        std = np.sqrt(variance)
+        variants = [self.traces.labels(row[row >= 0]) for row in matrix]
+        df = pd.DataFrame({
+            'variant': variants,
+            'length': [len(activities) - 2 for activities in variants],
+            'count': counts,
+            'estimated': share * N,
+            'share': share,
+            'std': std,
+            'lower': np.clip(share - z * std, 0, 1),
+            'upper': np.clip(share + z * std, 0, 1),
+        })
+        return df.sort_values('share', ascending=False, kind='stable').reset_index(drop=True)
+
+    def precision(self, statistic='transitions', level=0.95, min_count=30):
+        """
+        최대 신뢰구간 반폭
+
+        Args:
+            statistic: 'transitions' 또는 'variants'
+            min_count: 이보다 표본이 적은 전이 Source(support) / variant(count)는 제외
+        """
+        if statistic == 'transitions':
+            df = self.transition_probabilities(level)
+            df = df[df['support'] >= min_count]
+        else:
+            df = self.variant_frequencies(level)
+            df = df[df['count'] >= min_count]
+        return float(((df['upper'] - df['lower']) / 2).max()) if len(df) else np.nan
+
+    @instrumented('StratifiedSample.refine')
+    def refine(self, target=0.01, statistic='transitions', level=0.95, min_count=30, growth=2.0, max_rounds=10):
+        """
+        목표 정밀도(최대 신뢰구간 반폭 ≤ target)까지 rate를 growth배씩 키워 표본 확대
+
+        - 새 표본은 이전 표본을 포함 (같은 u 기준)
+        - 진행 기록은 history에 (rate, 표본 타석 수, 정밀도)로 남김
+
+        Returns:
+            StratifiedSample: self
+        """
+        for _ in range(max_rounds + 1):
+            current = self.precision(statistic, level, min_count)
+            self.history.append((self.rate, self.traces.n_cases, current))
+            if (not np.isnan(current) and current <= target) or self.rate >= 1:
+                break
+            self.rate = min(1.0, self.rate * growth)
+            self.load()
+        return self
+
+    def strata_table(self):
+        """
+        층별 모집단 / 표본 타석 수
+
+        Returns:
+            DataFrame: 층 컬럼, population, sample, weight
+        """
+        df = pd.DataFrame(self.stratum_labels, columns=list(self.strata))
+        df['population'] = self.population.astype(np.int64)
+        df['sample'] = self.sample_size.astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['weight'] = self.population / self.sample_size
+        return df
+
+    def __call__(self, level=0.95):
+        result = {}
+        result['transitions'] = self.transition_probabilities(level)
+        result['variants'] = self.variant_frequencies(level)
+        result['strata'] = self.strata_table()
+        result['rate'] = self.rate
+        return result
@@ -0,0 +1,123 @@
+"""
+다음 투구 확률 로컬 서비스 (asyncio, 한 줄에 JSON 하나)
+
+CompiledMarkovModel을 메모리에 올려 두고 TCP로 질의를 받습니다.
+
+요청:
+    {"history": ["FF", "SL"], "context": {"balls": 1, "strikes": 2, "stand": "R"}, "top": 3}
+    {"batch": [{"history": ["FF"], "context": {...}}, ...], "top": 3}
+응답:
+    {"probs": {"SL": 0.31, "FF": 0.27, "end": 0.2}}
+    {"batch": [{"SL": 0.31, ...}, ...]}
+    {"error": "..."}
+
+실행:
+    python -m mining.service model.npz --port 8765
+"""
+import argparse
+import asyncio
+import json
+
+from .markov import CompiledMarkovModel
+
+
+# 한 줄(요청 / 응답) 최대 크기 (asyncio 기본값 64 KiB는 batch 요청 수백 건이면 넘음)
+STREAM_LIMIT = 64 * 1024 ** 2
+
+
+def handle_request(model, request):
+    """
+    요청 dict 하나를 처리하여 응답 dict 반환
+
+    - history 하나는 predict_one (dict 조회), batch는 predict_proba (벡터 연산)
+    """
+    top = request.get('top')
+
+    if 'batch' in request:
+        items = request['batch']
+        probs = model.predict_proba([item.get('history', []) for item in items],
+                                    [item.get('context') for item in items])
+        return {'batch': [model.to_dict(row, top) for row in probs]}
+
+    probs = model.predict_one(request.get('history', []), request.get('context'))
+    return {'probs': model.to_dict(probs, top)}
+
+
+async def _handle_connection(model, reader, writer):
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError as e:
+                # 한 줄이 STREAM_LIMIT보다 김 (읽은 부분은 버려짐) → 연결은 유지하고 오류 응답
+                line, response = None, {'error': f"{type(e).__name__}: {e}"}
+            else:
+                if not line:
+                    break
+                try:
+                    response = handle_request(model, json.loads(line))
+                except Exception as e:
+                    response = {'error': f"{type(e).__name__}: {e}"}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+    except (ConnectionResetError, asyncio.CancelledError):
+        # client 연결 끊김 / 서버 종료
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(model, host='127.0.0.1', port=8765, limit=STREAM_LIMIT):
+    """
+    서버 시작 (이미 실행 중인 event loop 안에서 사용)
+
+    Args:
+        limit: 요청 한 줄의 최대 byte 수
+
+    Returns:
+        asyncio.Server
+    """
+    return await asyncio.start_server(lambda r, w: _handle_connection(model, r, w), host, port, limit=limit)
+
+
+def serve(model, host='127.0.0.1', port=8765):
+    """
+    서버를 실행하고 종료될 때까지 대기
+
+    Args:
+        model: CompiledMarkovModel 또는 save()로 저장한 npz 경로
+    """
+    if not isinstance(model, CompiledMarkovModel):
+        model = CompiledMarkovModel.load(model)
+
+    async def run():
+        server = await start_server(model, host, port)
+        print(f"[service] {model} listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+async def query(request, host='127.0.0.1', port=8765, limit=STREAM_LIMIT):
+    """서버에 요청 하나를 보내고 응답을 받는 간단한 client (limit : 응답 한 줄의 최대 byte 수)"""
+    reader, writer = await asyncio.open_connection(host, port, limit=limit)
+    writer.write(json.dumps(request).encode() + b'\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Next-pitch probability service')
+    parser.add_argument('model', help='CompiledMarkovModel.save()로 저장한 npz 파일')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args(argv)
+    serve(args.model, args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
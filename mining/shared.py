@@ -0,0 +1,161 @@
+"""
+공유 메모리 배열 모듈
+
+ProcessPoolExecutor에 DataFrame / EventLog / 큰 배열을 인자로 넘기면 worker마다 pickle 복사가 일어나
+병렬 처리 이득보다 전달 비용이 커집니다. 이 모듈은 numpy 배열을 이름 있는 공유 메모리 segment에 한 번만 올리고,
+worker는 이름(handle)으로 복사 없이 붙어서(attach) 읽기 / 쓰기만 합니다.
+
+- SharedArrays : {이름: 배열} 묶음을 segment로 보관하는 소유자 (with 블록 / close / 가비지 수집 / 종료 시 unlink)
+- attach       : worker에서 handle로 배열 view를 얻음 (worker 종료 전까지 유지)
+- SharedTraces : EncodedTraces(codes, offsets, case_ids)와 variant 표를 공유, attach_traces로 worker에서 복원
+
+segment는 생성한 process만 unlink 합니다. 소유 process가 비정상 종료(kill)되어도
+multiprocessing resource tracker가 남은 segment를 정리합니다.
+
+사용 예:
+    with SharedArrays({'codes': traces.codes}) as shared, \
+            ProcessPoolExecutor(initializer=init, initargs=(shared.handle,)) as executor:
+        ...
+    # worker
+    def init(handle):
+        arrays = attach(handle)
+"""
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .traces import EncodedTraces
+
+
+def _release(segments):
+    """segment close + unlink (이미 정리된 segment는 무시)"""
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            pass  # 아직 남은 view가 있으면 close는 생략하고 unlink만 (process 종료 시 해제)
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+    segments.clear()
+
+
+class SharedArrays:
+    """
+    numpy 배열 묶음의 공유 메모리 소유자
+
+    Args:
+        arrays: {이름: ndarray} 또는 {이름: (shape, dtype)} (0으로 채운 출력용 배열)
+
+    Attributes:
+        arrays: {이름: 공유 메모리 위의 ndarray view}
+        handle: worker로 넘길 {이름: (segment 이름, dtype, shape)} (pickle 크기는 배열 크기와 무관)
+    """
+
+    def __init__(self, arrays):
+        self._segments = []
+        self.arrays = {}
+        self.handle = {}
+
+        try:
+            for key, value in arrays.items():
+                if isinstance(value, tuple):
+                    shape, dtype = value
+                    source = None
+                else:
+                    source = np.ascontiguousarray(value)
+                    shape, dtype = source.shape, source.dtype
+                dtype = np.dtype(dtype)
+                if dtype.hasobject:
+                    raise TypeError(f"object dtype 배열은 공유 메모리에 올릴 수 없습니다: {key}")
+
+                nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+                segment = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+                self._segments.append(segment)
+
+                view = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+                if source is None:
+                    view.fill(0)
+                else:
+                    view[...] = source
+                self.arrays[key] = view
+                self.handle[key] = (segment.name, dtype.str, tuple(shape))
+        except BaseException:
+            self.arrays = {}
+            _release(self._segments)
+            raise
+
+        # close를 호출하지 않고 버려지거나 예외로 종료되어도 unlink (interpreter 종료 시에도 실행)
+        self._finalizer = weakref.finalize(self, _release, self._segments)
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def close(self):
+        """모든 segment 해제 (이후 arrays view는 사용할 수 없음)"""
+        self.arrays = {}
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# worker process가 attach한 segment (process가 끝날 때까지 유지)
+_ATTACHED = {}
+
+
+def attach(handle):
+    """
+    handle로 공유 배열에 붙음 (복사 없음, worker에서 호출)
+
+    Returns:
+        dict: {이름: ndarray view}
+    """
+    arrays = {}
+    for key, (name, dtype, shape) in handle.items():
+        segment = _ATTACHED.get(name)
+        if segment is None:
+            segment = _ATTACHED[name] = shared_memory.SharedMemory(name=name)
+        arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+    return arrays
+
+
+class SharedTraces(SharedArrays):
+    """
+    EncodedTraces 공유 (codes, offsets, 숫자형 case_ids, 선택적으로 variant 표)
+
+    - events / cases DataFrame은 공유하지 않음 (필요한 컬럼은 배열로 SharedArrays에 따로 올림)
+
+    Args:
+        traces: EncodedTraces
+        variants: True이면 traces.variants()의 matrix / counts / inverse도 공유
+    """
+
+    def __init__(self, traces, variants=False):
+        arrays = {'codes': traces.codes, 'offsets': traces.offsets}
+        if not np.asarray(traces.case_ids).dtype.hasobject:
+            arrays['case_ids'] = traces.case_ids
+        if variants:
+            arrays['variant_matrix'], arrays['variant_counts'], arrays['variant_inverse'] = traces.variants()
+        super().__init__(arrays)
+        self.handle = {'arrays': self.handle, 'vocabulary': list(traces.vocabulary)}
+
+
+def attach_traces(handle):
+    """
+    SharedTraces.handle → EncodedTraces (배열은 공유 메모리 view)
+
+    Returns:
+        (traces, variants): variants는 (matrix, counts, inverse) 또는 None
+    """
+    arrays = attach(handle['arrays'])
+    traces = EncodedTraces(arrays['codes'], arrays['offsets'], handle['vocabulary'], case_ids=arrays.get('case_ids'))
+    variants = None
+    if 'variant_matrix' in arrays:
+        variants = (arrays['variant_matrix'], arrays['variant_counts'], arrays['variant_inverse'])
+    return traces, variants
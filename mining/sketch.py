@@ -0,0 +1,400 @@
+"""
+고정 메모리 variant 빈도 sketch 모듈
+
+achieve_rawdata / get_variants는 모든 variant와 case 목록을 메모리에 보관하므로,
+리그 전체 데이터에서는 한 번만 나온 타석 variant(long tail)가 메모리 대부분을 차지합니다.
+이 모듈은 데이터 chunk를 차례로 읽으면서 고정된 크기의 요약만 유지합니다.
+
+- SpaceSaving    : 상위 capacity개 variant의 빈도 (과대추정, 오차 상한 error 보관)
+                   추적되지 않은 variant의 실제 빈도 ≤ floor ≤ 전체 case 수 / capacity
+- CountMinSketch : 모든 variant의 빈도 점추정 (과대추정, 확률 1 - δ로 오차 ≤ ε × 전체 case 수)
+- VariantSketch  : 전체 / 길이별 SpaceSaving + CountMinSketch 묶음 (ProcessEDA.Descriptive 출력용)
+
+모든 sketch는 merge로 합칠 수 있어 partition / worker별로 만든 결과를 나중에 합산할 수 있습니다.
+variant는 activity 라벨의 64bit hash로 식별하므로 chunk마다 vocabulary가 달라도 같은 key가 됩니다.
+(한 case가 두 chunk에 나뉘면 다른 variant로 집계되므로 chunk는 case 경계로 나누어야 합니다)
+
+사용 예:
+    sketch = VariantSketch(capacity=1000)
+    for chunk in chunks:                      # add_node_and_preprocess 결과 DataFrame 조각
+        sketch.update(chunk)
+    sketch.top(10)
+    sketch.top_per_length(1)
+"""
+import hashlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+from .profiling import instrumented
+
+
+# FNV-1a 64bit 상수
+_FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+_FNV_PRIME = np.uint64(0x100000001b3)
+
+
+def label_hashes(vocabulary):
+    """activity 라벨 → 64bit hash 배열 (프로세스 / 실행과 무관하게 고정)"""
+    return np.array([int.from_bytes(hashlib.blake2b(str(label).encode(), digest_size=8).digest(), 'little')
+                     for label in vocabulary], dtype=np.uint64)
+
+
+def variant_keys(matrix, vocabulary):
+    """
+    padded code 행렬(빈 칸 -1)의 행별 variant hash
+
+    Returns:
+        ndarray: (n_rows,) uint64
+    """
+    hashes = label_hashes(vocabulary)
+    keys = np.full(len(matrix), _FNV_OFFSET, dtype=np.uint64)
+    for j in range(matrix.shape[1] if matrix.ndim == 2 else 0):
+        column = matrix[:, j]
+        filled = column >= 0
+        keys[filled] = (keys[filled] ^ hashes[column[filled]]) * _FNV_PRIME
+    return keys
+
+
+class SpaceSaving:
+    """
+    mergeable Space-Saving heavy-hitter 요약
+
+    Attributes:
+        keys, counts, errors: 추적 중인 key (정렬), 추정 빈도, 과대추정 상한
+                              → 실제 빈도는 [counts - errors, counts] 구간
+        floor: 추적되지 않은 key의 실제 빈도 상한
+        total: 지금까지 더한 전체 빈도
+        labels: key → variant 라벨 tuple (추적 중인 key만)
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = int(capacity)
+        self.keys = np.array([], dtype=np.uint64)
+        self.counts = np.array([], dtype=np.int64)
+        self.errors = np.array([], dtype=np.int64)
+        self.floor = 0
+        self.total = 0
+        self.labels = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _combine(self, keys, counts, errors, floor, labels):
+        """
+        두 요약 합산 (없는 key는 상대 요약의 floor로 채움)
+        상위 capacity개만 남기고, 버린 key 중 최대 추정 빈도로 floor를 갱신
+        """
+        union = np.union1d(self.keys, keys)
+
+        count = np.full(len(union), self.floor + floor, dtype=np.int64)
+        error = np.full(len(union), self.floor + floor, dtype=np.int64)
+        mine = np.searchsorted(union, self.keys)
+        theirs = np.searchsorted(union, keys)
+        count[mine] += self.counts - self.floor
+        error[mine] += self.errors - self.floor
+        count[theirs] += counts - floor
+        error[theirs] += errors - floor
+        new_floor = self.floor + floor
+
+        if len(union) > self.capacity:
+            order = np.argsort(-count, kind='stable')
+            new_floor = max(new_floor, int(count[order[self.capacity]]))
+            kept = np.sort(order[:self.capacity])
+            union, count, error = union[kept], count[kept], error[kept]
+
+        merged = {}
+        for key in union.tolist():
+            merged[key] = self.labels[key] if key in self.labels else labels[key]
+
+        self.keys, self.counts, self.errors = union, count, error
+        self.floor = new_floor
+        self.labels = merged
+
+    def update(self, keys, counts, labels):
+        """
+        정확히 집계된 (key, 빈도) batch 추가
+
+        Args:
+            keys: uint64 key 배열 (중복 없음)
+            counts: key별 빈도
+            labels: key → 라벨 dict (keys 전부 포함)
+        """
+        keys = np.asarray(keys, dtype=np.uint64)
+        counts = np.asarray(counts, dtype=np.int64)
+        order = np.argsort(keys)
+        self._combine(keys[order], counts[order], np.zeros(len(keys), dtype=np.int64), 0, labels)
+        self.total += int(counts.sum())
+
+    def merge(self, other):
+        """다른 SpaceSaving 요약을 합산 (in-place, self 반환)"""
+        total = self.total + other.total
+        self._combine(other.keys, other.counts, other.errors, other.floor, other.labels)
+        self.total = total
+        return self
+
+    def estimate(self, key):
+        """key의 (추정 빈도, 오차 상한). 추적되지 않으면 (floor, floor)"""
+        i = np.searchsorted(self.keys, np.uint64(key))
+        if i < len(self.keys) and self.keys[i] == np.uint64(key):
+            return int(self.counts[i]), int(self.errors[i])
+        return self.floor, self.floor
+
+    def top(self, k=None):
+        """
+        추정 빈도 상위 k개 (k=None이면 전체)
+
+        Returns:
+            list: [(라벨 tuple, 추정 빈도, 오차 상한), ...]
+        """
+        order = np.lexsort((-(self.counts - self.errors), -self.counts))[:k]
+        return [(self.labels[int(self.keys[i])], int(self.counts[i]), int(self.errors[i])) for i in order]
+
+    def __repr__(self):
+        return f"SpaceSaving(capacity={self.capacity}, tracked={len(self)}, total={self.total}, floor={self.floor})"
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch (multiply-shift hash, 폭은 2의 거듭제곱)
+
+    - 추정값 ≥ 실제 빈도
+    - 확률 1 - delta 이상으로 추정값 ≤ 실제 빈도 + epsilon × total
+
+    Args:
+        width: 행당 counter 수 (epsilon = e / width)
+        depth: hash 함수 수 (delta = exp(-depth))
+        seed: hash 계수 seed (merge하려면 같아야 함)
+    """
+
+    def __init__(self, width=2 ** 16, depth=4, seed=0):
+        self.bits = max(1, int(np.ceil(np.log2(width))))
+        self.width = 1 << self.bits
+        self.depth = int(depth)
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.multipliers = rng.integers(0, 2 ** 63, size=self.depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    @property
+    def epsilon(self):
+        return np.e / self.width
+
+    @property
+    def delta(self):
+        return float(np.exp(-self.depth))
+
+    def _columns(self, keys):
+        """(depth, n_keys) counter 위치"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        return (self.multipliers[:, None] * keys[None, :]) >> np.uint64(64 - self.bits)
+
+    def update(self, keys, counts):
+        columns = self._columns(keys).astype(np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], weights=counts, minlength=self.width).astype(np.int64)
+        self.total += int(counts.sum())
+
+    def estimate(self, keys):
+        """key 배열의 추정 빈도"""
+        columns = self._columns(keys).astype(np.int64)
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other):
+        """같은 (width, depth, seed)의 sketch 합산 (in-place, self 반환)"""
+        if (self.width, self.depth, self.seed) != (other.width, other.depth, other.seed):
+            raise ValueError("width / depth / seed가 같은 CountMinSketch만 합칠 수 있습니다.")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def __repr__(self):
+        return f"CountMinSketch(width={self.width}, depth={self.depth}, total={self.total})"
+
+
+class VariantSketch:
+    """
+    고정 메모리 variant 빈도 요약 (전체 / 길이별 heavy hitter + 전체 점추정)
+
+    Args:
+        capacity: 전체 SpaceSaving 크기
+        length_capacity: 길이별 SpaceSaving 크기
+        width, depth, seed: CountMinSketch 설정
+    """
+
+    def __init__(self, capacity=1000, length_capacity=100, width=2 ** 16, depth=4, seed=0):
+        self.capacity = capacity
+        self.length_capacity = length_capacity
+
+        self.heavy = SpaceSaving(capacity)
+        self.by_length = {}
+        self.count_min = CountMinSketch(width=width, depth=depth, seed=seed)
+        self.length_counts = defaultdict(int)
+        self.n_cases = 0
+
+    # ------------------------------------------------------------------
+    # 추가 / 합산
+    # ------------------------------------------------------------------
+    @instrumented('VariantSketch.update')
+    def update(self, data, case_key='case:concept:name', activity_key='concept:name'):
+        """
+        chunk 하나 추가 (chunk 안에서 variant를 정확히 집계한 뒤 sketch에 반영)
+
+        Args:
+            data: add_node_and_preprocess 결과 DataFrame, EncodedTraces
+                  또는 achieve_rawdata()['all'] 형식 [(activities, 빈도, 길이), ...]
+        """
+        # [1] chunk 안의 variant 행렬과 빈도
+        if isinstance(data, pd.DataFrame):
+            data = EncodedTraces.from_dataframe(data, case_key=case_key, activity_key=activity_key)
+        if isinstance(data, EncodedTraces):
+            matrix, counts, _ = data.variants()
+            vocabulary = data.vocabulary
+        else:
+            vocabulary = list(dict.fromkeys(label for activities, *_ in data for label in activities))
+            code = {label: i for i, label in enumerate(vocabulary)}
+            width = max((len(activities) for activities, *_ in data), default=0)
+            matrix = np.full((len(data), width), -1, dtype=np.int64)
+            for i, (activities, *_) in enumerate(data):
+                matrix[i, :len(activities)] = [code[label] for label in activities]
+            counts = np.array([variant[1] for variant in data], dtype=np.int64)
+        if len(counts) == 0:
+            return self
+
+        # [2] variant hash (같은 variant가 여러 번 들어온 경우 합산)
+        keys = variant_keys(matrix, vocabulary)
+        keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=counts, minlength=len(keys)).astype(np.int64)
+        matrix = matrix[first]
+        lengths = (matrix >= 0).sum(axis=1) - 2  # start / end 노드 제외
+
+        labels = {}
+        for key, row in zip(keys.tolist(), matrix):
+            labels[key] = tuple(vocabulary[c] for c in row if c >= 0)
+
+        # [3] 전체 / 길이별 heavy hitter, 점추정 sketch, 길이 분포 갱신
+        self.heavy.update(keys, counts, labels)
+        self.count_min.update(keys, counts)
+        for length in np.unique(lengths).tolist():
+            mask = lengths == length
+            summary = self.by_length.setdefault(length, SpaceSaving(self.length_capacity))
+            summary.update(keys[mask], counts[mask], labels)
+            self.length_counts[length] += int(counts[mask].sum())
+        self.n_cases += int(counts.sum())
+        return self
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        """chunk iterable(DataFrame / EncodedTraces)로 생성"""
+        sketch = cls(**kwargs)
+        for chunk in chunks:
+            sketch.update(chunk)
+        return sketch
+
+    def merge(self, other):
+        """다른 VariantSketch 합산 (partition / worker 결과 결합, in-place, self 반환)"""
+        self.heavy.merge(other.heavy)
+        self.count_min.merge(other.count_min)
+        for length, summary in other.by_length.items():
+            self.by_length.setdefault(length, SpaceSaving(self.length_capacity)).merge(summary)
+        for length, n in other.length_counts.items():
+            self.length_counts[length] += n
+        self.n_cases += other.n_cases
+        return self
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _frame(self, entries):
+        return pd.DataFrame({
+            'variant': [activities for activities, *_ in entries],
+            'length': [len(activities) - 2 for activities, *_ in entries],
+            'count': [count for _, count, _ in entries],
+            'lower': [count - error for _, count, error in entries],
+            'share': [count / max(self.n_cases, 1) for _, count, _ in entries],
+        })
+
+    def top(self, k=10):
+        """
+        전체 상위 k개 variant
+
+        Returns:
+            DataFrame: variant, length, count(추정, 상한), lower(하한), share
+        """
+        return self._frame(self.heavy.top(k))
+
+    def top_per_length(self, k=1):
+        """
+        길이별 상위 k개 variant
+
+        Returns:
+            DataFrame: variant, length, count, lower, share (길이 순)
+        """
+        entries = [entry for length in sorted(self.by_length) for entry in self.by_length[length].top(k)]
+        return self._frame(entries)
+
+    def frequency(self, activities):
+        """
+        임의 variant의 빈도 추정 (heavy hitter로 추적 중이면 SpaceSaving 값과 Count-Min 값 중 작은 값)
+
+        Args:
+            activities: 'start' / 'end'를 포함한 activity 라벨 시퀀스
+        """
+        activities = list(activities)
+        key = variant_keys(np.arange(len(activities))[None, :], activities)[0]
+        estimate = int(self.count_min.estimate([key])[0])
+        count, _ = self.heavy.estimate(key)
+        return min(estimate, count) if int(key) in self.heavy.labels else estimate
+
+    def error_bounds(self):
+        """
+        빈도 추정 오차 보장
+
+        Returns:
+            dict: heavy_floor(추적되지 않은 variant 빈도 상한), count_min_error(ε × total), count_min_delta
+        """
+        return {
+            'n_cases': self.n_cases,
+            'heavy_floor': self.heavy.floor,
+            'heavy_bound': self.n_cases / self.heavy.capacity,
+            'count_min_error': self.count_min.epsilon * self.count_min.total,
+            'count_min_delta': self.count_min.delta,
+        }
+
+    def raw_data(self):
+        """
+        achieve_rawdata() 형식 dict (추적 중인 variant만, 빈도는 추정값)
+        EventLogToProbability 결과의 'data' 대신 넣으면 ProcessEDA.Descriptive로 출력 가능
+        (Minimum Frequency 항목은 추적 중인 variant 중 최솟값)
+        """
+        raw_data = defaultdict(list)
+        for activities, count, _ in self.heavy.top():
+            raw_data['all'].append((activities, count, len(activities) - 2))
+        for length in sorted(self.by_length):
+            for activities, count, _ in self.by_length[length].top():
+                raw_data[f'length_{length}'].append((activities, count))
+        return raw_data
+
+    def memory_bytes(self):
+        """sketch 배열의 대략적인 메모리 사용량 (라벨 tuple 제외)"""
+        summaries = [self.heavy] + list(self.by_length.values())
+        arrays = sum(s.keys.nbytes + s.counts.nbytes + s.errors.nbytes for s in summaries)
+        return arrays + self.count_min.table.nbytes
+
+    def __call__(self, k=10):
+        result = {}
+        result['top'] = self.top(k)
+        result['top_per_length'] = self.top_per_length(1)
+        result['length_counts'] = dict(sorted(self.length_counts.items()))
+        result['error_bounds'] = self.error_bounds()
+        result['data'] = self.raw_data()
+        return result
+
+    def __repr__(self):
+        return (f"VariantSketch(n_cases={self.n_cases}, tracked={len(self.heavy)}, "
+                f"lengths={len(self.by_length)}, memory={self.memory_bytes() / 1024 ** 2:.1f}MB)")
@@ -0,0 +1,375 @@
+"""
+단계(stage) 단위 memoization 파이프라인 모듈
+
+load → preprocessing_df → one_way_filter → BasedTraces / ClusteredTraces → metrics 흐름을
+이름 있는 단계의 DAG로 표현하고, 각 단계의 결과를 (입력 + 파라미터)의 해시로 디스크에 캐시합니다.
+하위 단계의 파라미터(예: n_clusters)만 바뀌면 그 단계에 의존하는 단계만 다시 계산됩니다.
+
+[캐시 저장 형식]
+- DataFrame → parquet (columnar), ndarray → npy
+- str key dict → 하위 디렉토리로 재귀 저장
+- 그 외 객체(pm4py EventLog 등) → pickle
+- 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은(LRU) 항목부터 삭제
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint_dataframe(df):
+    """DataFrame의 내용(값 + index + 컬럼/dtype) 해시"""
+    digest = hashlib.sha256()
+    digest.update(repr(list(zip(df.columns, map(str, df.dtypes)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint_path(path):
+    """파일 경로의 해시 (경로 + 크기 + 수정 시각)"""
+    stat = os.stat(path)
+    return hashlib.sha256(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()
+
+
+def _plain(value):
+    """pickle이 불가능한 defaultdict(lambda) 등을 일반 dict로 변환"""
+    if isinstance(value, defaultdict):
+        value = dict(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _has_columnar(value):
+    """str key dict 안에 DataFrame / ndarray가 있으면 하위 디렉토리로 나눠 저장"""
+    if not isinstance(value, dict) or not value or not all(isinstance(k, str) for k in value):
+        return False
+    return any(isinstance(v, (pd.DataFrame, np.ndarray)) or _has_columnar(v) for v in value.values())
+
+
+class StageCache:
+    """
+    content-addressed 디스크 캐시 (LRU 크기 제한)
+
+    Args:
+        directory: 캐시 디렉토리
+        max_bytes: 캐시 전체 크기 상한 (None이면 제한 없음)
+    """
+
+    def __init__(self, directory='.pipeline_cache', max_bytes=2 * 1024 ** 3):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, key):
+        return self.directory / key
+
+    def __contains__(self, key):
+        return (self._entry(key) / 'manifest.json').exists()
+
+    # [1] 저장 / 로드
+    def _dump(self, value, path):
+        path.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(value, pd.DataFrame):
+            try:
+                value.to_parquet(path / 'value.parquet')
+                return {'kind': 'frame'}
+            except (TypeError, ValueError):
+                # 혼합 타입 object 컬럼 등 parquet으로 표현할 수 없는 경우는 pickle
+                (path / 'value.parquet').unlink(missing_ok=True)
+        elif isinstance(value, np.ndarray) and value.dtype != object:
+            np.save(path / 'value.npy', value)
+            return {'kind': 'array'}
+        elif _has_columnar(value):
+            items = {}
+            for i, (k, v) in enumerate(value.items()):
+                items[k] = {'dir': str(i), **self._dump(v, path / str(i))}
+            return {'kind': 'dict', 'items': items}
+
+        with open(path / 'value.pkl', 'wb') as f:
+            pickle.dump(_plain(value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {'kind': 'pickle'}
+
+    def _load(self, spec, path):
+        kind = spec['kind']
+        if kind == 'frame':
+            return pd.read_parquet(path / 'value.parquet')
+        if kind == 'array':
+            return np.load(path / 'value.npy', allow_pickle=False)
+        if kind == 'dict':
+            return {k: self._load(item, path / item['dir']) for k, item in spec['items'].items()}
+        with open(path / 'value.pkl', 'rb') as f:
+            return pickle.load(f)
+
+    def get(self, key):
+        """
+        Returns:
+            (hit, value): 캐시 적중 여부와 값
+        """
+        if key not in self:
+            return False, None
+
+        entry = self._entry(key)
+        with open(entry / 'manifest.json', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        value = self._load(manifest['spec'], entry)
+        os.utime(entry / 'manifest.json')  # LRU 기준 시각 갱신
+        return True, value
+
+    def put(self, key, value, stage=None):
+        entry = self._entry(key)
+        staging = self.directory / f".{key}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+
+        spec = self._dump(value, staging)
+        with open(staging / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump({'stage': stage, 'created': time.time(), 'spec': spec}, f)
+
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        self.evict()
+
+    # [2] LRU 삭제
+    def entries(self):
+        """캐시 항목 목록 (key, 크기(bytes), 마지막 사용 시각)"""
+        rows = []
+        for entry in self.directory.iterdir():
+            manifest = entry / 'manifest.json'
+            if entry.name.startswith('.') or not manifest.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.rglob('*') if f.is_file())
+            rows.append((entry.name, size, manifest.stat().st_mtime))
+        return rows
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 사용하지 않은 항목 삭제"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return []
+
+        entries = sorted(self.entries(), key=lambda x: x[2])
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for key, size, _ in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+
+
+class Stage:
+    """
+    파이프라인의 한 단계
+
+    Args:
+        name: 단계 이름
+        func: func(*입력 단계 결과, **params) 형태의 함수
+        inputs: 입력으로 사용할 상위 단계 이름
+        params: 단계 파라미터 (캐시 key에 포함)
+        version: 함수 로직이 바뀌었을 때 캐시를 무효화하기 위한 버전
+    """
+
+    def __init__(self, name, func, inputs=(), params=None, version=1):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.params = dict(params or {})
+        self.version = version
+
+
+class StagePipeline:
+    """
+    단계 DAG + content-addressed 캐시
+
+    - 단계 key = hash(단계 이름, 함수, 버전, 파라미터, 입력 단계들의 key)
+    - 같은 key의 결과는 메모리 / 디스크 캐시에서 재사용
+
+    Args:
+        cache: StageCache (None이면 메모리 memoization만 사용)
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.stages = {}
+        self.history = []
+        self._sources = {}
+        self._memory = {}
+
+    def source(self, name, data, reader=None):
+        """
+        파이프라인의 입력 단계 등록
+
+        Args:
+            data: DataFrame 또는 파일 경로
+            reader: 파일 경로일 때 사용할 읽기 함수 (기본 pd.read_csv)
+        """
+        if isinstance(data, pd.DataFrame):
+            self._sources[name] = (fingerprint_dataframe(data), lambda: data)
+        else:
+            reader = pd.read_csv if reader is None else reader
+            self._sources[name] = (fingerprint_path(data), lambda: reader(data))
+        return self
+
+    def add(self, name, func, inputs=(), version=1, **params):
+        self.stages[name] = Stage(name, func, inputs=inputs, params=params, version=version)
+        return self
+
+    def set_params(self, name, **params):
+        """단계 파라미터 변경 (이 단계와 하위 단계만 key가 바뀜)"""
+        self.stages[name].params.update(params)
+        return self
+
+    def key(self, name):
+        if name in self._sources:
+            return self._sources[name][0]
+
+        stage = self.stages[name]
+        payload = json.dumps({
+            'stage': stage.name,
+            'func': f"{stage.func.__module__}.{stage.func.__qualname__}",
+            'version': stage.version,
+            'params': stage.params,
+            'inputs': [self.key(dep) for dep in stage.inputs],
+        }, sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def run(self, name):
+        """name 단계의 결과 반환 (필요한 상위 단계만 계산)"""
+        key = self.key(name)
+        if key in self._memory:
+            return self._memory[key]
+
+        started = time.perf_counter()
+        if name in self._sources:
+            value = self._sources[name][1]()
+            self.history.append((name, 'source', time.perf_counter() - started))
+            self._memory[key] = value
+            return value
+
+        if self.cache is not None:
+            hit, value = self.cache.get(key)
+            if hit:
+                self.history.append((name, 'hit', time.perf_counter() - started))
+                self._memory[key] = value
+                return value
+
+        stage = self.stages[name]
+        upstream = [self.run(dep) for dep in stage.inputs]
+
+        started = time.perf_counter()
+        value = stage.func(*upstream, **stage.params)
+        self.history.append((name, 'computed', time.perf_counter() - started))
+
+        if self.cache is not None:
+            self.cache.put(key, value, stage=name)
+        self._memory[key] = value
+        return value
+
+    def report(self):
+        """단계별 실행 기록 (stage, status(source / hit / computed), seconds)"""
+        return pd.DataFrame(self.history, columns=['stage', 'status', 'seconds'])
+
+
+# 기본 분석 파이프라인의 단계 함수
+def _preprocess_stage(df, start_name='start', end_name='end', case_type=None, lean=False):
+    from .pipeline import preprocessing_df
+    return preprocessing_df(df, start_name=start_name, end_name=end_name, case_type=case_type, lean=lean)
+
+
+def _filter_stage(df, colName='events', posCondition=('strikeout',)):
+    from .preprocessing import one_way_filter
+    return one_way_filter(df, colName=colName, posCondition=list(posCondition))
+
+
+def _traces_stage(df):
+    from .probability import BasedTraces
+    return BasedTraces(df)()
+
+
+def _distances_stage(df):
+    from clustering.distance import ClusteredTraces
+
+    clustered = ClusteredTraces(df)
+    _, sequences, labels = clustered.achieve_trace_infomation()
+    return {
+        'sequences': sequences,
+        'labels': labels,
+        'distances': clustered.matrix,
+        'variant_case_ids': clustered.variant_case_ids(),
+    }
+
+
+def _clusters_stage(distances, n_clusters=3):
+    """ClusteredTraces()(n_clusters)와 같은 구성의 결과 ('traces'의 pm4py 객체는 제외)"""
+    from clustering.distance import agglomerative_clusters
+    from clustering.distance import map_variant_cases_to_clusters
+
+    clusters = agglomerative_clusters(distances['distances'], n_clusters)
+    return {
+        'sequences': distances['sequences'],
+        'labels': distances['labels'],
+        'distances': distances['distances'],
+        'clusters': clusters,
+        'n_clusters': n_clusters,
+        'cluster_map': dict(map_variant_cases_to_clusters(distances['variant_case_ids'], clusters)),
+    }
+
+
+def _metrics_stage(clusters, df):
+    from clustering.utils import clustered_dataframe
+    from metrics import p_per_pa, k_per_pa, fip
+
+    df_clustered = clustered_dataframe(clusters, df)
+    return {
+        'p_per_pa': p_per_pa(df_clustered)[1],
+        'k_per_pa': k_per_pa(df_clustered)[1],
+        'fip': fip(df_clustered),
+    }
+
+
+def analysis_pipeline(source, cache_dir='.pipeline_cache', max_bytes=2 * 1024 ** 3,
+                      start_name='start', end_name='end', case_type=None, lean=False,
+                      colName='events', posCondition=('strikeout',), n_clusters=3):
+    """
+    load → preprocess → filter → traces / distances → clusters → metrics 파이프라인 생성
+
+    Args:
+        source: 투구 DataFrame 또는 CSV 경로
+        cache_dir: 디스크 캐시 디렉토리 (None이면 메모리 memoization만 사용)
+        max_bytes: 디스크 캐시 크기 상한
+
+    Returns:
+        StagePipeline: pipeline.run('metrics') 등으로 실행,
+                       pipeline.set_params('clusters', n_clusters=4)로 하위 단계만 재계산
+    """
+    cache = StageCache(cache_dir, max_bytes=max_bytes) if cache_dir is not None else None
+
+    pipeline = StagePipeline(cache)
+    pipeline.source('load', source)
+    pipeline.add('preprocess', _preprocess_stage, inputs=('load',),
+                 start_name=start_name, end_name=end_name, case_type=case_type, lean=lean)
+    pipeline.add('filter', _filter_stage, inputs=('preprocess',),
+                 colName=colName, posCondition=tuple(posCondition))
+    pipeline.add('traces', _traces_stage, inputs=('filter',))
+    pipeline.add('distances', _distances_stage, inputs=('filter',))
+    pipeline.add('clusters', _clusters_stage, inputs=('distances',), n_clusters=n_clusters)
+    pipeline.add('metrics', _metrics_stage, inputs=('clusters', 'filter'))
+    return pipeline
@@ -0,0 +1,157 @@
+"""
+투구 예측 가능성(surprisal / entropy) 모듈
+
+CompiledMarkovModel(배열 기반 전이 모델)로 모든 전이를 한 번에 조회하여 투구 / 타석 / 투수 단위
+예측 가능성 지표를 계산합니다. BasedTraces의 probs dict를 중첩 루프로 도는 대신
+(전이 수, ) 배열 연산만 사용하므로 수백만 개 투구도 한 번의 호출로 점수화됩니다.
+
+- surprisal  : 실제 다음 투구의 -log2 p (bit, 작을수록 예상대로 던진 투구)
+- entropy    : 그 시점 예측 분포의 entropy H(next | state) (bit, 작을수록 다음 투구가 뻔한 상태)
+- cumulative : 타석 안에서 누적한 surprisal
+
+사용 예:
+    scorer = PitchSurprisal(df_added, order=1)
+    scorer.pitches          # 투구(전이)별 surprisal / entropy
+    scorer.case_table()     # 타석별 누적 surprisal (case 컬럼과 함께)
+    scorer.state_entropy()  # 상태(직전 activity)별 조건부 entropy
+"""
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+from .markov import CompiledMarkovModel
+from .profiling import instrumented
+
+
+class PitchSurprisal:
+    """
+    투구별 surprisal / entropy 계산기
+
+    Args:
+        dataframe: add_node_and_preprocess 결과 DataFrame 또는 EncodedTraces
+        model: 학습된 CompiledMarkovModel (None이면 같은 데이터로 order / context / alpha 모델 학습)
+        order, context, alpha: model이 None일 때 학습 설정
+        case_columns: case_table에 붙일 case 컬럼 (case 첫 row의 값)
+        include_end: True이면 마지막 투구 → end(타석 종료) 전이도 점수화
+        floor: 확률 0(관측되지 않은 전이)의 surprisal 계산에 사용할 최소 확률
+    """
+
+    def __init__(self, dataframe, model=None, order=1, context=(), alpha=0.0,
+                 case_columns=('pitcher', 'game_date'), include_end=False, floor=1e-6,
+                 end='end', case_key='case:concept:name', activity_key='concept:name'):
+        self.floor = floor
+        self.end = end
+
+        if isinstance(dataframe, EncodedTraces):
+            self.traces = dataframe
+        else:
+            context = tuple(model.context) if model is not None else tuple(context)
+            case_columns = tuple(c for c in case_columns if c in dataframe.columns)
+            self.traces = EncodedTraces.from_dataframe(dataframe, case_key=case_key, activity_key=activity_key,
+                                                       event_columns=context, case_columns=case_columns)
+
+        self.model = model if model is not None else \
+            CompiledMarkovModel(order=order, context=context, alpha=alpha).fit(self.traces)
+
+        self.pitches = self.score(include_end=include_end)
+
+    @instrumented('PitchSurprisal.score')
+    def score(self, include_end=False):
+        """
+        모든 전이 점수화
+
+        Returns:
+            DataFrame: case, position(다음 투구의 타석 내 위치), Source, Target, probability,
+                       surprisal, entropy, cumulative (bit)
+        """
+        traces = self.traces
+
+        # [1] 모델 code 기준 history / context / 실제 다음 activity
+        history_codes, context_codes, targets, index = self.model.transition_codes(traces)
+        if not include_end:
+            keep = traces.codes[index + 1] != traces.code_of(self.end)
+            history_codes, context_codes, targets, index = \
+                history_codes[keep], context_codes[keep], targets[keep], index[keep]
+
+        # [2] 실제 다음 activity 확률 → surprisal
+        probability, entropy = self.model.score_codes(history_codes, context_codes, targets)
+        surprisal = -np.log2(np.maximum(probability, self.floor))
+
+        # [3] 타석 안 누적합 (전체 cumsum에서 타석 시작 직전 값을 뺌)
+        case = traces.case_index()[index]
+        cumulative = np.cumsum(surprisal)
+        first = np.r_[True, case[1:] != case[:-1]]
+        cumulative -= np.repeat((cumulative - surprisal)[first], np.diff(np.r_[np.flatnonzero(first), len(case)]))
+
+        vocabulary = pd.Index(traces.vocabulary)
+        return pd.DataFrame({
+            'case': case,
+            'position': traces.positions()[index + 1],
+            'Source': pd.Categorical.from_codes(traces.codes[index], categories=vocabulary),
+            'Target': pd.Categorical.from_codes(traces.codes[index + 1], categories=vocabulary),
+            'probability': probability,
+            'surprisal': surprisal,
+            'entropy': entropy,
+            'cumulative': cumulative,
+        })
+
+    def case_table(self):
+        """
+        타석별 예측 가능성 (traces.cases 컬럼과 함께)
+
+        Returns:
+            DataFrame: case id + case 컬럼, pitches, surprisal(누적), mean_surprisal, max_surprisal,
+                       mean_entropy, perplexity (2 ** mean_surprisal)
+        """
+        case = self.pitches['case'].to_numpy()
+        n = self.traces.n_cases
+        pitches = np.bincount(case, minlength=n)
+        total = np.bincount(case, weights=self.pitches['surprisal'].to_numpy(), minlength=n)
+        entropy = np.bincount(case, weights=np.nan_to_num(self.pitches['entropy'].to_numpy()), minlength=n)
+        maximum = np.zeros(n)
+        np.maximum.at(maximum, case, self.pitches['surprisal'].to_numpy())
+
+        df = pd.DataFrame({'case:concept:name': self.traces.case_ids})
+        if self.traces.cases is not None:
+            df = pd.concat([df, self.traces.cases.reset_index(drop=True)], axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            df['pitches'] = pitches
+            df['surprisal'] = total
+            df['mean_surprisal'] = total / pitches
+            df['max_surprisal'] = np.where(pitches > 0, maximum, np.nan)
+            df['mean_entropy'] = entropy / pitches
+            df['perplexity'] = 2 ** df['mean_surprisal']
+        return df
+
+    def state_entropy(self):
+        """
+        직전 activity(Source)별 조건부 entropy와 실제 surprisal 평균
+
+        - entropy   : 그 상태에서 예측 분포 entropy의 평균 (order=1, context 없으면 H(next | state) 그대로)
+        - surprisal : 실제 다음 투구 surprisal 평균 (cross-entropy, include_end=True로 같은 데이터의 1차 모델이면 entropy와 같음)
+
+        Returns:
+            DataFrame: Source, transitions, entropy, surprisal
+        """
+        source = self.pitches['Source'].cat.codes.to_numpy()
+        n = len(self.traces.vocabulary)
+        transitions = np.bincount(source, minlength=n)
+        entropy = np.bincount(source, weights=np.nan_to_num(self.pitches['entropy'].to_numpy()), minlength=n)
+        surprisal = np.bincount(source, weights=self.pitches['surprisal'].to_numpy(), minlength=n)
+
+        observed = np.flatnonzero(transitions)
+        return pd.DataFrame({
+            'Source': [self.traces.vocabulary[i] for i in observed],
+            'transitions': transitions[observed],
+            'entropy': entropy[observed] / transitions[observed],
+            'surprisal': surprisal[observed] / transitions[observed],
+        })
+
+    def __call__(self):
+        result = {}
+        result['pitches'] = self.pitches
+        result['cases'] = self.case_table()
+        result['states'] = self.state_entropy()
+        result['model'] = self.model
+        return result
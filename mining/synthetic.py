@@ -0,0 +1,192 @@
+"""
+Statcast 형식의 합성(synthetic) 투구 데이터 생성 모듈
+
+실제 데이터(data/pitcher_2019_2024.csv, BigQuery)는 저장소에 없으므로
+벤치마크와 재현 가능한 실험을 위해 load_data_from_bigquery와 같은 컬럼의 투구 단위 데이터를 생성합니다.
+
+- seed가 같으면 항상 같은 데이터 (numpy Generator 기반)
+- 구종 비율(pitch_mix), 타석당 투구 수 분포(length_distribution), 같은 구종 반복 확률을 조절 가능
+- 모든 컬럼을 벡터 연산으로 생성하므로 수백만 투구도 수 초 내에 생성
+"""
+import numpy as np
+import pandas as pd
+
+from .utils import STATCAST_COLUMNS
+
+
+# 리그 평균에 가까운 구종 비율
+DEFAULT_PITCH_MIX = {
+    'FF': 0.32, 'SI': 0.15, 'SL': 0.17, 'CH': 0.11, 'CU': 0.08, 'FC': 0.08, 'ST': 0.06, 'FS': 0.03,
+}
+
+# 타석당 투구 수 분포 (평균 약 3.9구)
+DEFAULT_LENGTH_DISTRIBUTION = {
+    1: 0.12, 2: 0.13, 3: 0.16, 4: 0.17, 5: 0.16, 6: 0.13, 7: 0.07, 8: 0.035, 9: 0.015, 10: 0.007, 11: 0.003,
+}
+
+# 타석 결과 분포
+DEFAULT_OUTCOME_MIX = {
+    'field_out': 0.30, 'strikeout': 0.23, 'single': 0.14, 'walk': 0.085, 'double': 0.045,
+    'home_run': 0.03, 'force_out': 0.02, 'grounded_into_double_play': 0.02, 'hit_by_pitch': 0.011,
+    'field_error': 0.008, 'sac_fly': 0.007, 'fielders_choice': 0.004, 'triple': 0.004, 'sac_bunt': 0.003,
+}
+
+# 타석 중간 투구의 description 분포
+DEFAULT_DESCRIPTION_MIX = {
+    'ball': 0.40, 'foul': 0.27, 'called_strike': 0.17, 'swinging_strike': 0.12, 'blocked_ball': 0.02,
+    'foul_tip': 0.02,
+}
+
+# 구종별 평균 구속 (mph)
+RELEASE_SPEED = {
+    'FF': 94.5, 'SI': 93.5, 'FC': 89.0, 'SL': 85.5, 'ST': 82.0, 'SV': 80.0, 'CU': 79.0, 'KC': 82.0,
+    'CS': 75.0, 'CH': 85.0, 'FS': 86.0, 'FO': 84.0, 'SC': 80.0, 'KN': 76.0, 'EP': 60.0,
+}
+
+
+def _normalized(mapping):
+    keys = list(mapping)
+    p = np.asarray([mapping[k] for k in keys], dtype=float)
+    return keys, p / p.sum()
+
+
+def _labels(names, codes, missing=None):
+    """code 배열 → 문자열 object 배열 (code -1은 missing)"""
+    table = np.array(list(names) + [missing], dtype=object)
+    return table[np.where(codes < 0, len(names), codes)]
+
+
+def generate_pitches(n_pitches, n_pitchers=1, pitch_mix=None, length_distribution=None,
+                     outcome_mix=None, repeat_prob=0.25, pitcher_variation=50.0,
+                     start_date='2019-03-28', n_days=1080, seed=0):
+    """
+    load_data_from_bigquery와 같은 컬럼을 가진 합성 투구 데이터 생성
+
+    Args:
+        n_pitches: 생성할 투구 수
+        n_pitchers: 투수 수 (투수마다 pitch_mix에서 조금씩 다른 구종 비율을 가짐)
+        pitch_mix: {구종: 비율} (None이면 DEFAULT_PITCH_MIX)
+        length_distribution: {타석당 투구 수: 비율} (None이면 DEFAULT_LENGTH_DISTRIBUTION)
+        outcome_mix: {타석 결과 이벤트: 비율} (None이면 DEFAULT_OUTCOME_MIX)
+        repeat_prob: 직전 투구와 같은 구종을 다시 던질 확률 (구종 시퀀스의 Markov 의존성)
+        pitcher_variation: 투수별 구종 비율 Dirichlet 농도 (클수록 pitch_mix에 가까움)
+        start_date, n_days: 경기일자 범위
+        seed: 난수 seed
+
+    Returns:
+        DataFrame: game_date 순으로 정렬된 투구 단위 데이터 (events는 타석 마지막 투구에만 존재)
+    """
+    rng = np.random.default_rng(seed)
+    pitch_names, pitch_p = _normalized(DEFAULT_PITCH_MIX if pitch_mix is None else pitch_mix)
+    lengths_k, lengths_p = _normalized(DEFAULT_LENGTH_DISTRIBUTION if length_distribution is None else length_distribution)
+    outcome_names, outcome_p = _normalized(DEFAULT_OUTCOME_MIX if outcome_mix is None else outcome_mix)
+    description_names, description_p = _normalized(DEFAULT_DESCRIPTION_MIX)
+
+    # [1] 타석(at-bat) 길이 : 합이 n_pitches가 될 때까지 샘플링 후 마지막 타석을 잘라냄
+    n_at_bats = int(n_pitches / np.dot(lengths_k, lengths_p) * 1.1) + 1
+    lengths = np.asarray(lengths_k)[rng.choice(len(lengths_k), size=n_at_bats, p=lengths_p)]
+    ends = np.cumsum(lengths)
+    n_at_bats = int(np.searchsorted(ends, n_pitches)) + 1
+    lengths = lengths[:n_at_bats]
+    lengths[-1] -= ends[n_at_bats - 1] - n_pitches
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    at_bat = np.repeat(np.arange(n_at_bats), lengths)
+    order = np.arange(n_pitches) - starts[at_bat]
+    is_last = order == lengths[at_bat] - 1
+
+    # [2] 경기(등판) : 4~6 타석 단위, 경기일자는 정렬된 임의의 날짜
+    game_sizes = rng.integers(4, 7, size=n_at_bats)
+    game_of_at_bat = np.searchsorted(np.cumsum(game_sizes), np.arange(n_at_bats), side='right')
+    n_games = int(game_of_at_bat[-1]) + 1
+    days = np.sort(rng.integers(0, n_days, size=n_games))
+    game_dates = pd.Timestamp(start_date) + pd.to_timedelta(days, unit='D')
+    pitcher_of_game = rng.integers(0, n_pitchers, size=n_games)
+
+    pitcher_ab = pitcher_of_game[game_of_at_bat]
+    slot_ab = np.arange(n_at_bats) - np.searchsorted(game_of_at_bat, game_of_at_bat)
+    # 연속된 타석의 타자가 항상 다르도록 타석 번호로 타자 id를 결정
+    batter_ab = 400000 + (np.arange(n_at_bats) * 7919) % 6000
+
+    # [3] 타석 결과 : 길이가 짧으면 불가능한 결과(삼진 < 3구, 볼넷 < 4구)는 field_out으로 대체
+    outcome_ab = rng.choice(len(outcome_names), size=n_at_bats, p=outcome_p)
+    field_out = outcome_names.index('field_out') if 'field_out' in outcome_names else 0
+    if 'strikeout' in outcome_names:
+        outcome_ab[(outcome_ab == outcome_names.index('strikeout')) & (lengths < 3)] = field_out
+    if 'walk' in outcome_names:
+        outcome_ab[(outcome_ab == outcome_names.index('walk')) & (lengths < 4)] = field_out
+
+    # [4] 구종 : 투수별 구종 비율 + repeat_prob 확률로 직전 구종 반복
+    pitch_mix_of_pitcher = rng.dirichlet(pitch_p * pitcher_variation, size=n_pitchers)
+    pitcher = pitcher_ab[at_bat]
+    cdf = np.cumsum(pitch_mix_of_pitcher, axis=1)
+    u = rng.random(n_pitches)
+    fresh = np.zeros(n_pitches, dtype=np.int16)
+    for k in range(len(pitch_names) - 1):
+        fresh += u >= cdf[pitcher, k]
+    repeat = (rng.random(n_pitches) < repeat_prob) & (order > 0)
+    source = np.maximum.accumulate(np.where(repeat, 0, np.arange(n_pitches)))
+    pitch_code = fresh[source]
+
+    # [5] description : 중간 투구는 분포에서, 마지막 투구는 타석 결과에 맞게
+    description = np.asarray(description_names, dtype=object)[
+        rng.choice(len(description_names), size=n_pitches, p=description_p)
+    ]
+    outcome = np.asarray(outcome_names, dtype=object)[outcome_ab[at_bat]]
+    last_description = np.where(outcome == 'strikeout',
+                                np.where(rng.random(n_pitches) < 0.75, 'swinging_strike', 'called_strike'),
+                                np.where(outcome == 'walk', 'ball',
+                                         np.where(outcome == 'hit_by_pitch', 'hit_by_pitch', 'hit_into_play')))
+    description = np.where(is_last, last_description, description)
+    events = np.where(is_last, outcome, None)
+
+    pitch_type_result = np.where(np.isin(description, ['ball', 'blocked_ball', 'hit_by_pitch']), 'B',
+                                 np.where(description == 'hit_into_play', 'X', 'S'))
+
+    # [6] 볼카운트 : 타석 내 직전까지의 볼 / 스트라이크 누적 (최대 3볼 2스트라이크)
+    is_ball = np.isin(description, ['ball', 'blocked_ball']).astype(np.int32)
+    is_strike = np.isin(description, ['called_strike', 'swinging_strike', 'foul', 'foul_tip']).astype(np.int32)
+    balls = np.cumsum(is_ball) - is_ball
+    strikes = np.cumsum(is_strike) - is_strike
+    balls = np.minimum(balls - balls[starts][at_bat], 3)
+    strikes = np.minimum(strikes - strikes[starts][at_bat], 2)
+
+    # [7] 위치 / 구속 / 타구 정보
+    in_play = description == 'hit_into_play'
+    p_throws_of_pitcher = rng.choice(np.array(['R', 'L']), size=n_pitchers, p=[0.72, 0.28])
+    p_throws = p_throws_of_pitcher[pitcher]
+    stand = np.where((batter_ab[at_bat] % 5) < 2, 'L', 'R')
+    base_speed = np.array([RELEASE_SPEED.get(name, 85.0) for name in pitch_names])
+
+    runners = rng.random((n_at_bats, 3)) < np.array([0.30, 0.18, 0.09])
+    previous_batter = np.concatenate([[batter_ab[0]], batter_ab[:-1]]).astype(float)
+
+    df = pd.DataFrame({
+        'game_date': game_dates[game_of_at_bat][at_bat],
+        'pitcher': (600000 + pitcher).astype(np.int64),
+        'batter': batter_ab[at_bat].astype(np.int64),
+        'stand': stand.astype(object),
+        'p_throws': p_throws.astype(object),
+        'outs_when_up': (slot_ab % 3)[at_bat].astype(np.int64),
+        'on_1b': np.where(runners[:, 0], previous_batter, np.nan)[at_bat],
+        'on_2b': np.where(runners[:, 1], previous_batter + 1, np.nan)[at_bat],
+        'on_3b': np.where(runners[:, 2], previous_batter + 2, np.nan)[at_bat],
+        'balls': balls.astype(np.int64),
+        'strikes': strikes.astype(np.int64),
+        'type': pitch_type_result.astype(object),
+        'hit_location': np.where(in_play, rng.integers(1, 10, size=n_pitches), np.nan),
+        'launch_speed': np.where(in_play, rng.normal(89.0, 14.0, size=n_pitches), np.nan),
+        'launch_angle': np.where(in_play, rng.normal(12.0, 26.0, size=n_pitches), np.nan),
+        'babip_value': np.where(in_play, np.isin(outcome, ['single', 'double', 'triple']).astype(float), np.nan),
+        'pitch_type': _labels(pitch_names, pitch_code),
+        'release_speed': base_speed[pitch_code] + rng.normal(0.0, 1.2, size=n_pitches),
+        'release_pos_x': np.where(p_throws == 'L', 1.8, -1.8) + rng.normal(0.0, 0.15, size=n_pitches),
+        'release_pos_z': rng.normal(5.9, 0.2, size=n_pitches),
+        'release_pos_y': rng.normal(54.0, 0.4, size=n_pitches),
+        'plate_x': rng.normal(0.0, 0.85, size=n_pitches),
+        'plate_z': rng.normal(2.3, 0.9, size=n_pitches),
+        'description': description.astype(object),
+        'events': events,
+    })
+
+    return df[list(STATCAST_COLUMNS)]
@@ -0,0 +1,239 @@
+"""
+정수 인코딩된 trace(타석) 모음 모듈
+
+pm4py EventLog / 문자열 dict 대신 activity code 배열과 case offset 배열(CSR 형태)로
+trace를 보관하여, 전이 / variant 집계를 NumPy 벡터 연산으로 처리합니다.
+
+    codes   : [start, FF, SL, end, start, CH, end, ...]   (int32, vocabulary index)
+    offsets : [0, 4, 7, ...]                               (case i = codes[offsets[i]:offsets[i+1]])
+"""
+import numpy as np
+import pandas as pd
+
+
+class EncodedTraces:
+    """
+    activity code 배열 기반 trace 모음
+
+    Args:
+        codes: 모든 event의 activity code (case 순서, case 내부는 발생 순서)
+        offsets: case별 시작 위치 (길이 n_cases + 1)
+        vocabulary: code → activity 라벨
+        case_ids: case 식별자 (case:concept:name)
+        events: event 단위 속성 DataFrame (codes와 같은 순서, 선택)
+        cases: case 단위 속성 DataFrame (case_ids와 같은 순서, 선택)
+    """
+
+    def __init__(self, codes, offsets, vocabulary, case_ids=None, events=None, cases=None):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.vocabulary = list(vocabulary)
+        self.case_ids = np.arange(len(self.offsets) - 1) if case_ids is None else np.asarray(case_ids)
+        self.events = events
+        self.cases = cases
+
+    @classmethod
+    def from_dataframe(cls, df_event, case_key='case:concept:name', activity_key='concept:name',
+                       event_columns=(), case_columns=()):
+        """
+        add_node_and_preprocess 결과(DataFrame)에서 생성
+
+        Args:
+            df_event: case_key, activity_key 컬럼을 가진 event DataFrame
+                      (case별로 연속되어 있지 않으면 case_key 기준 stable 정렬)
+            event_columns: events에 보관할 event 단위 컬럼 (예: balls, strikes)
+            case_columns: cases에 보관할 case 단위 컬럼 (case 첫 event의 값)
+
+        Returns:
+            EncodedTraces
+        """
+        # [1] case별로 연속되도록 정렬 (이미 정렬되어 있으면 복사하지 않음)
+        case_values = df_event[case_key].to_numpy()
+        if len(case_values) > 1 and not df_event[case_key].is_monotonic_increasing:
+            order = np.argsort(case_values, kind='stable')
+            df_event = df_event.iloc[order]
+            case_values = case_values[order]
+
+        # [2] activity code (categorical이면 category code를 그대로 사용)
+        activity = df_event[activity_key]
+        if isinstance(activity.dtype, pd.CategoricalDtype):
+            codes = activity.cat.codes.to_numpy()
+            vocabulary = [str(c) for c in activity.cat.categories]
+        else:
+            codes, uniques = pd.factorize(activity)
+            vocabulary = [str(c) for c in uniques]
+
+        # [3] case 경계
+        if len(case_values):
+            starts = np.flatnonzero(np.r_[True, case_values[1:] != case_values[:-1]])
+        else:
+            starts = np.array([], dtype=np.int64)
+        offsets = np.r_[starts, len(case_values)]
+
+        events = df_event[list(event_columns)].reset_index(drop=True) if event_columns else None
+        cases = df_event[list(case_columns)].iloc[starts].reset_index(drop=True) if case_columns else None
+
+        return cls(codes, offsets, vocabulary, case_ids=case_values[starts], events=events, cases=cases)
+
+    def __len__(self):
+        return self.n_cases
+
+    @property
+    def n_cases(self):
+        return len(self.offsets) - 1
+
+    @property
+    def n_events(self):
+        return len(self.codes)
+
+    @property
+    def lengths(self):
+        """case별 event 수 (시작/종료 노드 포함)"""
+        return np.diff(self.offsets)
+
+    def case_index(self):
+        """event별 case 번호"""
+        return np.repeat(np.arange(self.n_cases), self.lengths)
+
+    def positions(self):
+        """event별 case 내 위치 (0부터)"""
+        return np.arange(self.n_events) - np.repeat(self.offsets[:-1], self.lengths)
+
+    def code_of(self, label):
+        """activity 라벨 → code (없으면 -1)"""
+        try:
+            return self.vocabulary.index(label)
+        except ValueError:
+            return -1
+
+    def labels(self, codes):
+        """code 배열 → activity 라벨 tuple"""
+        return tuple(self.vocabulary[c] for c in codes)
+
+    def transitions(self):
+        """
+        case 내부의 연속된 (from, to) 전이
+
+        Returns:
+            (src, dst, index): from code, to code, from event의 위치
+        """
+        is_last = np.zeros(self.n_events, dtype=bool)
+        is_last[self.offsets[1:] - 1] = True
+        index = np.flatnonzero(~is_last)
+        return self.codes[index], self.codes[index + 1], index
+
+    def context_rows(self, index):
+        """
+        전이(index → index+1)의 context(볼카운트 등)를 읽을 event 위치
+
+        - 다음 event 시점의 값 (그 투구 직전 상태)
+        - 종료 노드로의 전이는 종료 노드에 의미 있는 값이 없으므로 마지막 투구 시점의 값
+        """
+        is_last = np.zeros(self.n_events, dtype=bool)
+        is_last[self.offsets[1:] - 1] = True
+        return np.where(is_last[index + 1], index, index + 1)
+
+    def transition_counts(self, weights=None):
+        """
+        전이 빈도 행렬 (calc_translation의 counts와 같은 값)
+
+        Args:
+            weights: case별 가중치 (None이면 1)
+
+        Returns:
+            ndarray: (V, V) 행렬, [from, to] = 빈도
+        """
+        n = len(self.vocabulary)
+        src, dst, index = self.transitions()
+        w = None if weights is None else np.asarray(weights)[self.case_index()[index]]
+        counts = np.bincount(src.astype(np.int64) * n + dst, weights=w, minlength=n * n)
+        return counts.reshape(n, n)
+
+    def case_transition_matrix(self):
+        """
+        case × 전이 쌍 빈도 sparse 행렬
+
+        Returns:
+            (src, dst, matrix): 관측된 전이 쌍 (from 기준 정렬), (n_cases, 전이 쌍 수) CSR 빈도 행렬
+        """
+        from scipy import sparse
+
+        n = len(self.vocabulary)
+        src, dst, index = self.transitions()
+        keys, pair_of_transition = np.unique(src.astype(np.int64) * n + dst, return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(index)), (self.case_index()[index], pair_of_transition)), shape=(self.n_cases, len(keys))
+        )
+        return keys // n, keys % n, matrix
+
+    def padded(self, fill=-1):
+        """(n_cases, 최대 길이) 행렬로 변환 (빈 칸은 fill)"""
+        lengths = self.lengths
+        width = int(lengths.max()) if len(lengths) else 0
+        matrix = np.full((self.n_cases, width), fill, dtype=np.int32)
+        matrix[self.case_index(), self.positions()] = self.codes
+        return matrix
+
+    def variants(self):
+        """
+        variant(같은 activity 시퀀스) 집계
+
+        Returns:
+            (matrix, counts, inverse):
+                matrix  : variant별 padded code 행렬 (빈 칸 -1, 사전순 정렬)
+                counts  : variant별 case 수
+                inverse : case별 variant 번호
+        """
+        matrix, inverse, counts = np.unique(self.padded(), axis=0, return_inverse=True, return_counts=True)
+        return matrix, counts, inverse.reshape(-1)
+
+    def take(self, case_indices):
+        """
+        일부 case만 선택한 EncodedTraces
+
+        Args:
+            case_indices: case 번호 배열 또는 boolean mask
+        """
+        case_indices = np.asarray(case_indices)
+        if case_indices.dtype == bool:
+            case_indices = np.flatnonzero(case_indices)
+
+        lengths = self.lengths[case_indices]
+        starts = self.offsets[:-1][case_indices]
+        offsets = np.r_[0, np.cumsum(lengths)]
+        event_index = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+
+        events = None if self.events is None else self.events.iloc[event_index].reset_index(drop=True)
+        cases = None if self.cases is None else self.cases.iloc[case_indices].reset_index(drop=True)
+        return EncodedTraces(self.codes[event_index], offsets, self.vocabulary,
+                             case_ids=self.case_ids[case_indices], events=events, cases=cases)
+
+    def slice(self, start, stop):
+        """
+        연속된 case 구간 [start, stop) (codes / offsets는 복사 없는 view)
+        """
+        lo, hi = self.offsets[start], self.offsets[stop]
+        events = None if self.events is None else self.events.iloc[lo:hi].reset_index(drop=True)
+        cases = None if self.cases is None else self.cases.iloc[start:stop].reset_index(drop=True)
+        return EncodedTraces(self.codes[lo:hi], self.offsets[start:stop + 1] - lo, self.vocabulary,
+                             case_ids=self.case_ids[start:stop], events=events, cases=cases)
+
+    def length_groups(self):
+        """
+        투구 수(trace 길이 - 2)별로 case를 연속 구간에 모은 정렬 (한 번의 stable 정렬)
+
+        Returns:
+            (traces, lengths, bounds):
+                traces  : 길이 오름차순으로 정렬된 EncodedTraces (길이가 같으면 원래 순서)
+                lengths : 그룹별 투구 수
+                bounds  : 그룹 g = traces.slice(bounds[g], bounds[g + 1])
+        """
+        lengths = self.lengths - 2
+        order = np.argsort(lengths, kind='stable')
+        sorted_lengths = lengths[order]
+        starts = np.flatnonzero(np.r_[True, sorted_lengths[1:] != sorted_lengths[:-1]]) if len(order) else \
+            np.array([], dtype=np.int64)
+        return self.take(order), sorted_lengths[starts], np.r_[starts, len(order)]
+
+    def __repr__(self):
+        return f"EncodedTraces(cases={self.n_cases}, events={self.n_events}, vocabulary={len(self.vocabulary)})"
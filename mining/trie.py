@@ -0,0 +1,319 @@
+"""
+Variant prefix trie 모듈
+
+"SL → SL 로 시작한 타석은 어떻게 이어지고 어떻게 끝났나?" 같은 질의를 위해
+variant 표를 배열 기반 prefix trie로 색인합니다.
+
+- node 번호는 preorder(전위 순회) 순서 → 한 node의 subtree는 [node, node + size) 연속 구간
+- node별 통과 case 수(count), 그 node에서 끝나는 case 수(terminal), 결과(outcome) 누적합 보관
+- 자식 찾기는 정렬된 (부모, activity) edge key에 대한 searchsorted
+  → prefix 조회 / 다음 activity 분포 / subtree 결과 비율은 prefix 길이에 비례하는 시간
+
+사용 예:
+    trie = VariantTrie.from_dataframe(df_added, outcome='events')
+    trie.continuation(['SL', 'SL'])
+    trie.top_completions(['SL', 'SL'], k=5)
+    trie.outcomes(['SL', 'SL'])
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+
+
+class VariantTrie:
+    """
+    배열 기반 variant prefix trie (node 0은 빈 prefix인 root)
+
+    Attributes:
+        vocabulary: code → activity 라벨
+        parent, code, depth: node별 부모 node / 마지막 activity code / prefix 길이
+        size: subtree node 수 (자기 자신 포함)
+        count: node prefix를 가진 case 수
+        terminal: node에서 끝나는 case 수
+        outcome_labels: 결과 라벨 (outcome을 주지 않았으면 빈 리스트)
+    """
+
+    def __init__(self, vocabulary, parent, code, depth, size, count, terminal,
+                 outcome_labels=(), outcome_cumsum=None):
+        self.vocabulary = list(vocabulary)
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.code = np.asarray(code, dtype=np.int32)
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.size = np.asarray(size, dtype=np.int64)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.terminal = np.asarray(terminal, dtype=np.int64)
+        self.outcome_labels = list(outcome_labels)
+        self.outcome_cumsum = outcome_cumsum
+
+        # 자식 조회용 edge key (부모 * V + code) 정렬
+        keys = self.parent[1:] * len(self.vocabulary) + self.code[1:]
+        self._edge_order = np.argsort(keys, kind='stable')
+        self._edge_keys = keys[self._edge_order]
+        self._code = {label: i for i, label in enumerate(self.vocabulary)}
+
+    # ------------------------------------------------------------------
+    # 생성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_matrix(cls, matrix, counts, vocabulary, outcome_counts=None, outcome_labels=()):
+        """
+        사전순 정렬된 padded variant 행렬로 trie 생성
+
+        Args:
+            matrix: (n_variants, 최대 길이) code 행렬, 빈 칸은 -1, 행은 서로 다르고 사전순 정렬
+            counts: variant별 case 수
+            vocabulary: code → activity 라벨
+            outcome_counts: (n_variants, n_outcomes) variant별 결과 빈도 (선택)
+        """
+        matrix = np.asarray(matrix, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        n_variants, width = matrix.shape
+        lengths = (matrix >= 0).sum(axis=1)
+
+        # [1] 직전 variant와 공유하는 prefix 길이 (lcp) → 이 행에서 새로 생기는 node는 depth lcp ~ length-1
+        differs = matrix[1:] != matrix[:-1]
+        lcp = np.zeros(n_variants, dtype=np.int64)
+        if n_variants > 1:
+            lcp[1:] = np.where(differs.any(axis=1), differs.argmax(axis=1), width)
+        lcp = np.minimum(lcp, lengths)
+        n_new = lengths - lcp
+
+        # [2] preorder 번호 : 행 순서 → depth 순서 (root = 0)
+        first_id = 1 + np.r_[0, np.cumsum(n_new)[:-1]]
+        n_nodes = 1 + int(n_new.sum())
+
+        columns = np.arange(width)
+        is_new = (columns >= lcp[:, None]) & (columns < lengths[:, None])
+        node_at = np.where(is_new, first_id[:, None] + columns - lcp[:, None], -1)
+        # 이전 행에서 만들어진 조상 node는 같은 depth의 가장 최근 node (번호가 증가하므로 누적 최댓값)
+        node_at = np.maximum.accumulate(node_at, axis=0)
+        node_at[columns >= lengths[:, None]] = -1
+
+        rows, depths = np.nonzero(is_new)
+        nodes = node_at[rows, depths]
+
+        parent = np.full(n_nodes, -1, dtype=np.int64)
+        code = np.full(n_nodes, -1, dtype=np.int32)
+        depth = np.zeros(n_nodes, dtype=np.int32)
+        parent[nodes] = np.where(depths > 0, node_at[rows, np.maximum(depths - 1, 0)], 0)
+        code[nodes] = matrix[rows, depths]
+        depth[nodes] = depths + 1
+
+        # [3] 통과 case 수 / 종료 case 수 / subtree 크기
+        on_path = node_at >= 0
+        count = np.bincount(node_at[on_path], weights=np.broadcast_to(counts[:, None], node_at.shape)[on_path],
+                            minlength=n_nodes).astype(np.int64)
+        count[0] = counts.sum()
+
+        terminal_nodes = node_at[np.arange(n_variants), lengths - 1]
+        terminal = np.bincount(terminal_nodes, weights=counts, minlength=n_nodes).astype(np.int64)
+
+        # 행 r의 depth e 조상은 그 행에서 새로 생긴 node 중 depth >= e 인 것들을 subtree에 가짐
+        descendants = lengths[:, None] - np.maximum(lcp[:, None], columns)
+        size = np.bincount(node_at[on_path], weights=descendants[on_path], minlength=n_nodes).astype(np.int64)
+        size[0] = n_nodes
+
+        # [4] 결과 누적합 (preorder 순서) → subtree 결과 = 구간 차
+        outcome_cumsum = None
+        if outcome_counts is not None:
+            outcome_counts = np.asarray(outcome_counts, dtype=np.int64)
+            by_node = np.zeros((n_nodes, outcome_counts.shape[1]), dtype=np.int64)
+            np.add.at(by_node, terminal_nodes, outcome_counts)
+            outcome_cumsum = np.vstack([np.zeros((1, by_node.shape[1]), dtype=np.int64), np.cumsum(by_node, axis=0)])
+
+        return cls(vocabulary, parent, code, depth, size, count, terminal,
+                   outcome_labels=outcome_labels, outcome_cumsum=outcome_cumsum)
+
+    @classmethod
+    def from_traces(cls, traces, outcome=None):
+        """
+        EncodedTraces로 trie 생성
+
+        Args:
+            traces: EncodedTraces
+            outcome: case별 결과 배열 또는 traces.cases의 컬럼 이름 (예: 'events', 'case_result')
+        """
+        matrix, counts, inverse = traces.variants()
+
+        outcome_counts, outcome_labels = None, ()
+        if outcome is not None:
+            values = traces.cases[outcome] if isinstance(outcome, str) else outcome
+            outcome_codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=False)
+            outcome_labels = [None if pd.isna(u) else u for u in uniques.tolist()]
+            outcome_counts = np.zeros((len(counts), len(outcome_labels)), dtype=np.int64)
+            np.add.at(outcome_counts, (inverse, outcome_codes), 1)
+
+        return cls.from_matrix(matrix, counts, traces.vocabulary,
+                               outcome_counts=outcome_counts, outcome_labels=outcome_labels)
+
+    @classmethod
+    def from_dataframe(cls, df_event, outcome='events', case_key='case:concept:name', activity_key='concept:name'):
+        """
+        add_node_and_preprocess 결과로 trie 생성
+
+        Args:
+            outcome: case 결과 컬럼 (case 첫 row의 값 사용, 시작 노드 row는 마지막 투구의 복사본). None이면 결과 없음
+        """
+        case_columns = () if outcome is None else (outcome,)
+        traces = EncodedTraces.from_dataframe(df_event, case_key=case_key, activity_key=activity_key,
+                                              case_columns=case_columns)
+        return cls.from_traces(traces, outcome=outcome)
+
+    @classmethod
+    def from_variants(cls, variants):
+        """
+        BasedTraces.achieve_rawdata()['all'] 형식 [(activities, 빈도, 길이), ...] 으로 trie 생성
+        """
+        vocabulary = list(dict.fromkeys(label for activities, *_ in variants for label in activities))
+        code = {label: i for i, label in enumerate(vocabulary)}
+
+        width = max((len(activities) for activities, *_ in variants), default=0)
+        matrix = np.full((len(variants), width), -1, dtype=np.int64)
+        for i, (activities, *_) in enumerate(variants):
+            matrix[i, :len(activities)] = [code[label] for label in activities]
+        frequency = np.array([variant[1] for variant in variants], dtype=np.int64)
+
+        matrix, inverse = np.unique(matrix, axis=0, return_inverse=True)
+        counts = np.bincount(inverse.reshape(-1), weights=frequency, minlength=len(matrix)).astype(np.int64)
+        return cls.from_matrix(matrix, counts, vocabulary)
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return len(self.parent)
+
+    def _children(self, node):
+        """node의 자식 node 배열 (activity code 순서)"""
+        n = len(self.vocabulary)
+        lo, hi = np.searchsorted(self._edge_keys, [node * n, (node + 1) * n])
+        return self._edge_order[lo:hi] + 1
+
+    def child(self, node, label):
+        """node에서 activity label로 이어지는 자식 (없으면 -1)"""
+        code = self._code.get(label, -1)
+        if code < 0:
+            return -1
+        key = node * len(self.vocabulary) + code
+        i = np.searchsorted(self._edge_keys, key)
+        if i < len(self._edge_keys) and self._edge_keys[i] == key:
+            return int(self._edge_order[i]) + 1
+        return -1
+
+    def find(self, prefix):
+        """
+        prefix에 해당하는 node 번호 (없으면 -1)
+
+        - root 아래 node가 하나뿐(시작 노드)이고 prefix가 그 라벨로 시작하지 않으면 자동으로 붙여서 찾음
+        """
+        node = 0
+        prefix = list(prefix)
+        roots = self._children(0)
+        if len(roots) == 1 and (not prefix or prefix[0] != self.vocabulary[self.code[roots[0]]]):
+            node = int(roots[0])
+
+        for label in prefix:
+            node = self.child(node, label)
+            if node < 0:
+                return -1
+        return node
+
+    def path(self, node):
+        """node까지의 activity 라벨 tuple"""
+        labels = []
+        while node > 0:
+            labels.append(self.vocabulary[self.code[node]])
+            node = self.parent[node]
+        return tuple(labels[::-1])
+
+    def continuation(self, prefix):
+        """
+        prefix 다음 activity 분포
+
+        Returns:
+            DataFrame: activity, count, probability (빈도 내림차순).
+                       prefix에서 끝난 case는 activity=None으로 표시
+        """
+        node = self.find(prefix)
+        if node < 0:
+            return pd.DataFrame(columns=['activity', 'count', 'probability'])
+
+        children = self._children(node)
+        activity = [self.vocabulary[c] for c in self.code[children]]
+        counts = self.count[children].tolist()
+        if self.terminal[node] > 0:
+            activity.append(None)
+            counts.append(int(self.terminal[node]))
+
+        df = pd.DataFrame({'activity': activity, 'count': counts})
+        df['probability'] = df['count'] / self.count[node]
+        return df.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+    def top_completions(self, prefix, k=5):
+        """
+        prefix로 시작하는 가장 빈번한 완성 variant k개
+
+        Returns:
+            DataFrame: variant(라벨 tuple), count, probability(prefix case 중 비율)
+        """
+        node = self.find(prefix)
+        if node < 0:
+            return pd.DataFrame(columns=['variant', 'count', 'probability'])
+
+        # subtree는 연속 구간이므로 구간 안의 terminal 빈도만 비교
+        terminal = self.terminal[node:node + self.size[node]]
+        k = min(k, int((terminal > 0).sum()))
+        best = np.argpartition(-terminal, k - 1)[:k] if k else np.array([], dtype=np.int64)
+        best = best[np.argsort(-terminal[best], kind='stable')]
+
+        return pd.DataFrame({
+            'variant': [self.path(node + int(i)) for i in best],
+            'count': terminal[best],
+            'probability': terminal[best] / self.count[node],
+        })
+
+    def outcomes(self, prefix):
+        """
+        prefix로 시작한 case들의 결과 빈도 / 비율
+
+        Returns:
+            DataFrame: outcome, count, rate (빈도 내림차순)
+        """
+        if self.outcome_cumsum is None:
+            raise ValueError("outcome 없이 생성된 trie입니다. from_traces(outcome=...)로 생성하세요.")
+
+        node = self.find(prefix)
+        if node < 0:
+            return pd.DataFrame(columns=['outcome', 'count', 'rate'])
+
+        counts = self.outcome_cumsum[node + self.size[node]] - self.outcome_cumsum[node]
+        df = pd.DataFrame({'outcome': self.outcome_labels, 'count': counts})
+        df = df[df['count'] > 0]
+        df['rate'] = df['count'] / self.count[node]
+        return df.sort_values('count', ascending=False, kind='stable').reset_index(drop=True)
+
+    # ------------------------------------------------------------------
+    # 저장 / 로드
+    # ------------------------------------------------------------------
+    def save(self, path):
+        """npz 파일로 저장 (pickle 없이 로드 가능)"""
+        meta = {'vocabulary': self.vocabulary, 'outcome_labels': self.outcome_labels}
+        arrays = {'parent': self.parent, 'code': self.code, 'depth': self.depth, 'size': self.size,
+                  'count': self.count, 'terminal': self.terminal}
+        if self.outcome_cumsum is not None:
+            arrays['outcome_cumsum'] = self.outcome_cumsum
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(meta['vocabulary'], data['parent'], data['code'], data['depth'], data['size'],
+                       data['count'], data['terminal'], outcome_labels=meta['outcome_labels'],
+                       outcome_cumsum=data['outcome_cumsum'] if 'outcome_cumsum' in data else None)
+
+    def __repr__(self):
+        return f"VariantTrie(nodes={len(self)}, cases={int(self.count[0])}, vocabulary={len(self.vocabulary)})"
@@ -0,0 +1,208 @@
+"""
+전이확률 신뢰구간 모듈
+
+BasedTraces의 전이확률은 점추정값이라 관측이 적은 상태에서는 흔들림이 큽니다.
+모든 전이(from → to)에 대해 구간 추정을 한 번에 계산합니다.
+
+- dirichlet    : 행(from)별 Dirichlet(count + prior) 사후분포 (gamma 샘플 정규화)
+- multinomial  : 행별 Multinomial(total, p̂) parametric bootstrap
+- case         : 타석(case) 단위 재표본 bootstrap (replicate마다 재표본 횟수를 bincount로 세어 case × 전이 sparse 행렬에 곱함)
+
+replicate는 chunk 단위로 나누어 SeedSequence로 seed를 분기하므로 n_jobs와 무관하게 같은 결과가 나오고,
+n_jobs > 1이면 ProcessPoolExecutor로 chunk를 병렬 처리합니다.
+전이 쌍 배열과 case × 전이 행렬은 공유 메모리(SharedArrays)로 worker에 전달하므로 worker 수만큼 복사되지 않습니다.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .traces import EncodedTraces
+from .shared import SharedArrays, attach
+
+
+METHODS = ('dirichlet', 'multinomial', 'case')
+
+
+class _Sampler:
+    """
+    전이 (src, dst) 쌍 배열 기반 replicate 생성기 (worker에서는 공유 메모리 배열로 다시 생성)
+
+    Args:
+        src, dst, count: (from, to) 정렬된 전이 쌍과 빈도
+        n_states: 다음 상태가 될 수 있는 activity 수 (dirichlet의 관측되지 않은 전이 수 계산용, 시작 노드 제외)
+        case_pairs: (n_cases, n_pairs) case별 전이 빈도 sparse 행렬 (method='case'에서만 필요)
+    """
+
+    def __init__(self, method, src, dst, count, n_states, prior=0.5, case_pairs=None):
+        self.method = method
+        self.count = count.astype(np.float64)
+        self.prior = prior
+
+        self.row_starts = np.flatnonzero(np.r_[True, src[1:] != src[:-1]])
+        self.row_of_pair = np.repeat(np.arange(len(self.row_starts)), np.diff(np.r_[self.row_starts, len(src)]))
+        self.row_total = np.add.reduceat(self.count, self.row_starts)
+        self.row_observed = np.diff(np.r_[self.row_starts, len(src)])
+        self.n_states = n_states
+        self.case_pairs = case_pairs
+        self.pair_cases = None if case_pairs is None else case_pairs.T.tocsr()  # (n_pairs, n_cases)
+
+    def shared_arrays(self, src, dst, count):
+        """worker에 공유할 배열 (case_pairs는 CSR 구성 배열로 분해)"""
+        arrays = {'src': src, 'dst': dst, 'count': count}
+        if self.case_pairs is not None:
+            arrays.update(data=self.case_pairs.data, indices=self.case_pairs.indices, indptr=self.case_pairs.indptr)
+        return arrays
+
+    def _normalize(self, samples, extra=None):
+        totals = np.add.reduceat(samples, self.row_starts, axis=1)
+        if extra is not None:
+            totals = totals + extra
+        return samples / np.maximum(totals, 1e-300)[:, self.row_of_pair]
+
+    def sample(self, seed, size):
+        """
+        replicate size개의 전이확률 표본
+
+        Returns:
+            ndarray: (size, n_pairs) float32
+        """
+        rng = np.random.default_rng(seed)
+
+        if self.method == 'dirichlet':
+            # 관측되지 않은 전이들의 gamma 합은 Gamma((V - k) * prior) 하나로 샘플링 (gamma 가법성)
+            samples = rng.standard_gamma(self.count + self.prior, size=(size, len(self.count)))
+            unobserved = (self.n_states - self.row_observed) * self.prior
+            extra = rng.standard_gamma(np.maximum(unobserved, 1e-12), size=(size, len(unobserved)))
+            extra[:, unobserved == 0] = 0
+            return self._normalize(samples, extra).astype(np.float32)
+
+        if self.method == 'multinomial':
+            width = int(self.row_observed.max())
+            pvals = np.zeros((len(self.row_starts), width))
+            position = np.arange(len(self.count)) - self.row_starts[self.row_of_pair]
+            pvals[self.row_of_pair, position] = self.count / self.row_total[self.row_of_pair]
+            draws = rng.multinomial(self.row_total.astype(np.int64), pvals, size=(size, len(self.row_starts)))
+            samples = draws[:, self.row_of_pair, position].astype(np.float64)
+            return self._normalize(samples).astype(np.float32)
+
+        # case bootstrap : replicate 하나씩 case 재표본 횟수(bincount) @ case × 전이 빈도
+        # (메모리는 size × n_cases가 아니라 n_cases 하나 + 결과 (size, n_pairs))
+        n_cases = self.case_pairs.shape[0]
+        samples = np.empty((size, len(self.count)))
+        for r in range(size):
+            weights = np.bincount(rng.integers(0, n_cases, n_cases), minlength=n_cases)
+            samples[r] = self.pair_cases @ weights
+        return self._normalize(samples).astype(np.float32)
+
+
+_WORKER = {}
+
+
+def _init_worker(method, n_states, prior, handle, shape):
+    from scipy import sparse
+
+    arrays = attach(handle)
+    case_pairs = None
+    if 'data' in arrays:
+        case_pairs = sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=shape)
+    _WORKER['sampler'] = _Sampler(method, arrays['src'], arrays['dst'], arrays['count'], n_states,
+                                  prior=prior, case_pairs=case_pairs)
+
+
+def _sample_chunk(task):
+    seed, size = task
+    return _WORKER['sampler'].sample(seed, size)
+
+
+def _pairs_from_counts(counts):
+    """BasedTraces counts(중첩 dict) → vocabulary, src, dst, count"""
+    vocabulary = list(dict.fromkeys(
+        [label for label in counts] + [label for to_dict in counts.values() for label in to_dict]
+    ))
+    code = {label: i for i, label in enumerate(vocabulary)}
+    pairs = sorted((code[a], code[b], n) for a, to_dict in counts.items() for b, n in to_dict.items() if n > 0)
+    src, dst, count = (np.asarray(values, dtype=np.int64) for values in zip(*pairs)) if pairs else \
+        (np.array([], dtype=np.int64) for _ in range(3))
+    return vocabulary, src, dst, count
+
+
+def _pairs_from_traces(traces):
+    """EncodedTraces → vocabulary, src, dst, count, case × 전이 sparse 행렬"""
+    src, dst, case_pairs = traces.case_transition_matrix()
+    count = np.asarray(case_pairs.sum(axis=0)).ravel().astype(np.int64)
+    return traces.vocabulary, src, dst, count, case_pairs
+
+
+def transition_intervals(data, method='dirichlet', n_replicates=1000, level=0.95, prior=0.5,
+                         seed=0, n_jobs=1, chunk_size=100, start='start'):
+    """
+    모든 전이확률의 구간 추정
+
+    Args:
+        data: BasedTraces counts(중첩 dict, result['counts'] / result['layer']['counts']),
+              add_node_and_preprocess 결과 DataFrame 또는 EncodedTraces ('case'는 DataFrame / EncodedTraces만 가능)
+        method: 'dirichlet' / 'multinomial' / 'case'
+        n_replicates: 표본 수
+        level: 신뢰수준
+        prior: dirichlet의 대칭 prior (Jeffreys = 0.5)
+        seed: 난수 seed
+        n_jobs: 병렬 process 수
+        chunk_size: chunk당 replicate 수 (메모리 사용량 조절)
+        start: 시작 상태 라벨 (dirichlet prior를 분배할 다음 상태에서 제외)
+
+    Returns:
+        DataFrame: Source, Target, count, Variable(점추정), lower, upper, std (from 기준 정렬)
+    """
+    if method not in METHODS:
+        raise ValueError(f"method는 {METHODS} 중 하나여야 합니다: {method}")
+
+    # [1] 전이 쌍 배열
+    case_pairs = None
+    if isinstance(data, dict):
+        if method == 'case':
+            raise ValueError("case bootstrap은 case 정보가 필요합니다. DataFrame 또는 EncodedTraces를 넘겨주세요.")
+        vocabulary, src, dst, count = _pairs_from_counts(data)
+    else:
+        traces = data if isinstance(data, EncodedTraces) else EncodedTraces.from_dataframe(data)
+        vocabulary, src, dst, count, case_pairs = _pairs_from_traces(traces)
+        if method != 'case':
+            case_pairs = None
+
+    if len(src) == 0:
+        raise ValueError("구간을 추정할 전이가 없습니다. 빈도가 0보다 큰 전이가 있는 데이터를 넘겨주세요.")
+
+    # 시작 노드로 가는 전이는 없으므로 dirichlet prior는 시작 노드를 제외한 다음 상태에만 분배
+    n_targets = len(vocabulary) - (start in vocabulary)
+    sampler = _Sampler(method, src, dst, count, n_targets, prior=prior, case_pairs=case_pairs)
+
+    # [2] chunk별 seed (n_jobs와 무관하게 같은 표본)
+    sizes = [chunk_size] * (n_replicates // chunk_size)
+    if n_replicates % chunk_size:
+        sizes.append(n_replicates % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(seeds, sizes))
+
+    if n_jobs == 1:
+        chunks = [sampler.sample(s, size) for s, size in tasks]
+    else:
+        shape = None if case_pairs is None else case_pairs.shape
+        with SharedArrays(sampler.shared_arrays(src, dst, count)) as shared, \
+                ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                    initargs=(method, n_targets, prior, shared.handle, shape)) as executor:
+            chunks = list(executor.map(_sample_chunk, tasks))
+    samples = np.concatenate(chunks, axis=0)
+
+    # [3] 분위수 구간
+    alpha = (1 - level) / 2
+    lower, upper = np.quantile(samples, [alpha, 1 - alpha], axis=0)
+
+    return pd.DataFrame({
+        'Source': [vocabulary[i] for i in src],
+        'Target': [vocabulary[i] for i in dst],
+        'count': count,
+        'Variable': count / sampler.row_total[sampler.row_of_pair],
+        'lower': lower,
+        'upper': upper,
+        'std': samples.std(axis=0),
+    })
@@ -1,8 +1,8 @@
 import pandas as pd
-from google.cloud import bigquery
-from google.oauth2 import service_account
 import re
 
+from .memory import optimize_dtypes
+
 def extract_stage_number(state):
     """상태(state) 문자열에서 단계 번호를 추출합니다."""
     if state == 'start': 
@@ -16,41 +16,52 @@ def extract_stage_number(state):
 
 
 
-def load_data_from_bigquery(key_path="key.json", limit=None):
+# load_data_from_bigquery가 조회하는 Statcast 컬럼
+STATCAST_COLUMNS = (
+    'game_date',
+    'pitcher',
+    'batter',
+    'stand',
+    'p_throws',
+    'outs_when_up',
+    'on_1b', 'on_2b', 'on_3b',
+    'balls', 'strikes',
+    'type',
+    'hit_location', 'launch_speed', 'launch_angle', 'babip_value',
+    'pitch_type',
+    'release_speed',
+    'release_pos_x',
+    'release_pos_z',
+    'release_pos_y',
+    'plate_x',
+    'plate_z',
+    'description',
+    'events',
+)
+
+
+def load_data_from_bigquery(key_path="key.json", limit=None, lean=False):
     """
     BigQuery에서 Josh Hader의 투구 데이터 로드
     
     Args:
         key_path: 서비스 계정 키 파일 경로
         limit: 데이터 제한 (None이면 전체)
+        lean: True이면 문자열 컬럼을 categorical로, 숫자 컬럼을 downcast하여 반환
     
     Returns:
         DataFrame: 투구 데이터
     """
+    # google-cloud-bigquery는 BigQuery 로드 시에만 필요하므로 함수 안에서 import
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
     credentials = service_account.Credentials.from_service_account_file(key_path)
     client = bigquery.Client(credentials=credentials, project=credentials.project_id)
     
-    query = """
+    query = f"""
     SELECT
-      game_date,
-      pitcher,
-      batter,
-      stand,
-      p_throws,
-      outs_when_up,
-      on_1b, on_2b, on_3b,
-      balls, strikes,
-      type,
-      hit_location, launch_speed, launch_angle, babip_value,
-      pitch_type,
-      release_speed,
-      release_pos_x,
-      release_pos_z,
-      release_pos_y,
-      plate_x,
-      plate_z,
-      description,
-      events
+      {', '.join(STATCAST_COLUMNS)}
     FROM
       `helpful-kit-473614-g8.Dugtrio_1.josh_hader_pitch_by_pitch_5yr`
     """
@@ -60,6 +71,9 @@ def load_data_from_bigquery(key_path="key.json", limit=None):
     
     df = client.query(query).to_dataframe()
     df['game_date'] = pd.to_datetime(df['game_date'])
+
+    if lean:
+        df = optimize_dtypes(df, columns=None)
     
     return df
 
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 import webbrowser
 
@@ -6,65 +7,122 @@ import plotly.graph_objects as go
 import networkx as nx
 from pyvis.network import Network
 
-
-def sankey_visualizer(data, length):
-
-    # Visualization
-    all_nodes = list(pd.unique(data[['Source', 'Target']].values.ravel('K')))
-    node_map = {node: i for i, node in enumerate(all_nodes)}
-
-    node_colors = []
-    for node in all_nodes:
-        if 'SI' in node:
-            node_colors.append('rgba(40, 167, 69, 0.8)')  # Green for SI
-        elif 'SL' in node:
-            node_colors.append('rgba(0, 123, 255, 0.8)') # Blue for SL
-        else:
-            node_colors.append('rgba(108, 117, 125, 0.8)') # Gray for others
-
-    flow_values = {'start': 1.0}
-
-    source_indices = []
-    target_indices = []
-    link_values = []
-    link_colors = []
-
-    def get_link_color(target_node):
-        if 'SI' in target_node:
-            return 'rgba(40, 167, 69, 0.4)'  # Green for SI
-        elif 'SL' in target_node:
-            return 'rgba(0, 123, 255, 0.4)' # Blue for SL
-        return 'rgba(108, 117, 125, 0.4)' # Gray for others
-
-    for _, row in data.iterrows():
-        source = row['Source']
-        target = row['Target']
-        variable = row['Variable']
-        
-
-        current_flow = flow_values.get(source, 0)    
-        link_flow = current_flow * variable
-        flow_values[target] = flow_values.get(target, 0) + link_flow
-        
-        source_indices.append(node_map[source])
-        target_indices.append(node_map[target])
-        link_values.append(link_flow)
-        link_colors.append(get_link_color(target))
+from .absorbing import edge_flows
+from .report import edge_mask
+from .utils import extract_stage_number
+
+
+# 구종별 색상 (Statcast pitch_type 전체, 'SL_1' / 'SL_out'처럼 접미사가 붙은 라벨은 앞부분으로 조회)
+PITCH_TYPE_COLORS = {
+    'FF': (215, 25, 28),     # 4-Seam Fastball
+    'SI': (40, 167, 69),     # Sinker
+    'FC': (253, 126, 20),    # Cutter
+    'FA': (232, 62, 140),    # Fastball (기타)
+    'SL': (0, 123, 255),     # Slider
+    'ST': (111, 66, 193),    # Sweeper
+    'SV': (23, 162, 184),    # Slurve
+    'CU': (255, 193, 7),     # Curveball
+    'KC': (141, 110, 99),    # Knuckle Curve
+    'CS': (255, 128, 171),   # Slow Curve
+    'CH': (32, 201, 151),    # Changeup
+    'FS': (0, 105, 92),      # Splitter
+    'FO': (77, 182, 172),    # Forkball
+    'SC': (158, 157, 36),    # Screwball
+    'KN': (96, 125, 139),    # Knuckleball
+    'EP': (188, 170, 164),   # Eephus
+    'PO': (120, 144, 156),   # Pitch Out
+    'IN': (144, 164, 174),   # Intentional Ball
+    'AB': (176, 190, 197),   # Automatic Ball
+    'UN': (176, 190, 197),   # Unknown
+    'start': (52, 58, 64),
+    'end': (52, 58, 64),
+    'other': (173, 181, 189),
+}
+DEFAULT_COLOR = (108, 117, 125)
+
+
+def _rgba(labels, alpha):
+    """라벨 배열 → 'rgba(r, g, b, a)' 색상 배열 (구종 접두어로 palette 조회)"""
+    base = pd.Series(labels, dtype=object).str.split('_').str[0]
+    palette = {key: f"rgba({r}, {g}, {b}, {alpha})" for key, (r, g, b) in PITCH_TYPE_COLORS.items()}
+    return base.map(palette).fillna("rgba({}, {}, {}, {})".format(*DEFAULT_COLOR, alpha)).to_numpy()
+
+
+def aggregate_sankey_links(data, max_nodes_per_layer=8, min_flow=0.005, top_k=None, min_probability=None):
+    """
+    전이확률 표 → Sankey 링크 (흐름이 작은 node는 layer별 'other' node로 합침)
+
+    - 링크 값은 start에서 출발한 타석 하나의 전이별 기대 통과량 (edge_flows)
+    - layer(단계 번호)마다 흐름 상위 max_nodes_per_layer개 중 흐름이 min_flow 이상인 node만 유지,
+      나머지는 'other_{단계}' node로 합친 뒤 같은 (Source, Target) 링크를 합산 (흐름 보존)
+      → 데이터 크기와 무관하게 node는 layer당 최대 max_nodes_per_layer + 1개
+    - top_k / min_probability (edge_mask)는 전체 표로 흐름을 계산한 뒤 표시할 링크에만 적용
+
+    Returns:
+        DataFrame: Source, Target, flow
+    """
+    flow = edge_flows(data)
+    codes, labels = pd.factorize(np.concatenate([data['Source'].to_numpy(), data['Target'].to_numpy()]))
+    src, dst = codes[:len(data)], codes[len(data):]
+    n = len(labels)
+
+    # [1] node 흐름 = max(들어오는 흐름, 나가는 흐름)
+    node_flow = np.maximum(np.bincount(src, weights=flow, minlength=n), np.bincount(dst, weights=flow, minlength=n))
+    stage = np.array([extract_stage_number(label) for label in labels])
+
+    # [2] layer 안에서 흐름 순위
+    order = np.lexsort((-node_flow, stage))
+    first = np.r_[True, stage[order][1:] != stage[order][:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n) - group_start
+
+    fixed = np.isin(labels, ['start', 'end'])
+    keep = fixed | ((rank < max_nodes_per_layer) & (node_flow >= min_flow))
+    other = np.where(stage == 0, 'other', np.char.add('other_', stage.astype(str)))
+    mapped = np.where(keep, np.asarray(labels, dtype=object), other.astype(object))
+
+    shown = edge_mask(data, top_k, min_probability)
+    links = pd.DataFrame({'Source': mapped[src], 'Target': mapped[dst], 'flow': flow})[shown]
+    return links.groupby(['Source', 'Target'], sort=False, as_index=False)['flow'].sum()
+
+
+def sankey_figure(data, length, max_nodes_per_layer=8, min_flow=0.005, top_k=None, min_probability=None):
+    """
+    전이확률 표 (Source, Target, Variable) → plotly Sankey Figure
+
+    Args:
+        data: 필터하지 않은 전체 전이확률 표 (흐름 계산에 출발 상태별 모든 전이가 필요)
+        max_nodes_per_layer, min_flow: aggregate_sankey_links 기준 (max_nodes_per_layer=None이면 합치지 않음)
+        top_k, min_probability: 표시할 링크 필터 (edge_mask, 흐름 계산 후 적용)
+    """
+    if max_nodes_per_layer is None:
+        links = pd.DataFrame({'Source': data['Source'].to_numpy(), 'Target': data['Target'].to_numpy(),
+                              'flow': edge_flows(data)})[edge_mask(data, top_k, min_probability)]
+    else:
+        links = aggregate_sankey_links(data, max_nodes_per_layer=max_nodes_per_layer, min_flow=min_flow,
+                                       top_k=top_k, min_probability=min_probability)
+
+    # node / link 배열 : 라벨 → 번호 (factorize), 색상 palette 조회
+    codes, all_nodes = pd.factorize(np.concatenate([links['Source'].to_numpy(), links['Target'].to_numpy()]))
+    source_indices, target_indices = codes[:len(links)], codes[len(links):]
+    node_colors = _rgba(all_nodes, 0.8)
+    link_colors = _rgba(all_nodes, 0.4)[target_indices]
 
     fig = go.Figure(data=[go.Sankey(
         node=dict(
             pad=15,
             thickness=20,
             line=dict(color="black", width=0.5),
-            label=all_nodes,
-            color=node_colors,
+            label=list(all_nodes),
+            color=list(node_colors),
         ),
 
         link=dict(
-            source=source_indices,
-            target=target_indices,
-            value=link_values,
-            color=link_colors,
+            source=source_indices.tolist(),
+            target=target_indices.tolist(),
+            value=links['flow'].tolist(),
+            color=list(link_colors),
             hovertemplate='Source: %{source.label}<br>' +
                         'Target: %{target.label}<br>' +
                         'variable: %{value:.2%})'
@@ -77,10 +135,30 @@ def sankey_visualizer(data, length):
         height=1000
     )
 
-    fig.show()
+    return fig
+
+
+def sankey_visualizer(data, length, output=None, show=True):
+    """
+    Sankey 시각화
+
+    Args:
+        output: 저장 경로 ('.html'이면 HTML, 그 외 확장자는 정적 이미지 (kaleido 필요)), None이면 저장하지 않음
+        show: True이면 fig.show()
+    """
+    fig = sankey_figure(data, length)
+
+    if output is not None:
+        if output.endswith('.html'):
+            fig.write_html(output)
+        else:
+            fig.write_image(output)
+    if show:
+        fig.show()
+    return fig
 
 
-def interactive_graph(df_preprocessing):
+def interactive_graph(df_preprocessing, output_file='test.html', show=True):
 
     flow_values = {'start' : 1.0}
     all_node = list(pd.unique(df_preprocessing[['Source', 'Target']].values.ravel("K")))
@@ -194,14 +272,15 @@ def interactive_graph(df_preprocessing):
     """)
 
     # HTML 파일로 저장
-    output_file = 'test.html'
     file_path = os.path.abspath(output_file)
     net.save_graph(output_file)
 
     print(f"\n인터랙티브 그래프가 다음 위치에 저장되었습니다:")
     print(f"  {file_path}")
-    print(f"브라우저에서 열어보세요!")
 
     # 자동으로 브라우저 열기
-    webbrowser.open(f'file://{file_path}')
+    if show:
+        print(f"브라우저에서 열어보세요!")
+        webbrowser.open(f'file://{file_path}')
+    return file_path
 
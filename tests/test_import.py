@@ -0,0 +1,30 @@
+"""
+import 시간 회귀 테스트
+
+mining / clustering / metrics 패키지 import만으로 무거운 의존성(pm4py, plotly, pyvis, sklearn, BigQuery client)이
+로드되지 않는지 확인합니다 (공개 API는 __getattr__로 처음 사용할 때 import).
+"""
+import json
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pm4py', 'plotly', 'pyvis', 'sklearn', 'google.cloud.bigquery')
+
+
+def _loaded_after(statement):
+    """새 interpreter에서 statement 실행 후 로드된 무거운 모듈 목록"""
+    code = (f"import json, sys\n{statement}\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_is_lightweight():
+    assert _loaded_after("import mining, clustering, metrics") == []
+
+
+def test_lazy_attribute_loads_on_access():
+    assert 'pm4py' in _loaded_after("import mining\nmining.BasedTraces")
@@ -0,0 +1,52 @@
+"""
+다음 투구 확률 서비스 회귀 테스트
+
+asyncio 기본 stream limit(64 KiB)보다 긴 batch 요청 / 응답이 한 줄로 오가는지,
+limit을 넘는 요청에는 연결을 끊지 않고 오류 응답을 보내는지 확인합니다.
+"""
+import asyncio
+import json
+
+from mining.markov import CompiledMarkovModel
+from mining.service import start_server, query
+
+
+COUNTS = {'start': {'FF': 6, 'SL': 4}, 'FF': {'SL': 3, 'FF': 2, 'end': 5}, 'SL': {'FF': 4, 'end': 6}}
+
+
+def _run(coroutine_function, **server_options):
+    model = CompiledMarkovModel.from_transition_counts(COUNTS)
+
+    async def run():
+        server = await start_server(model, port=0, **server_options)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await coroutine_function(model, port)
+
+    return asyncio.run(run())
+
+
+def test_batch_larger_than_default_stream_limit():
+    items = [{'history': ['start'] + ['FF', 'SL'] * 20} for _ in range(1000)]
+    assert len(json.dumps({'batch': items})) > 64 * 1024
+
+    async def check(model, port):
+        response = await query({'batch': items}, port=port)
+        assert len(response['batch']) == len(items)
+        assert response['batch'][0] == model.to_dict(model.predict_one(items[0]['history']))
+
+    _run(check)
+
+
+def test_oversized_request_returns_error():
+    async def check(model, port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(json.dumps({'batch': [{'history': ['FF'] * 1000}]}).encode() + b'\n')
+        writer.write(json.dumps({'history': ['start']}).encode() + b'\n')
+        await writer.drain()
+        first, second = json.loads(await reader.readline()), json.loads(await reader.readline())
+        writer.close()
+        await writer.wait_closed()
+        assert 'error' in first and 'probs' in second
+
+    _run(check, limit=1024)